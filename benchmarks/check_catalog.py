@@ -0,0 +1,44 @@
+"""Fleet-sizing check for the problem-type catalog.
+
+    python benchmarks/check_catalog.py
+
+Sizes every catalog type's layers at its default DAU against its own P95
+latency target and cache hit rate, and fails (exit 1) if any type's target is
+at or below its request path's idle P95. Run it after editing
+``problem_types.json`` or ``LAYER_PROFILES``.
+"""
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from system_design_core.capacity import estimate_capacity  # noqa: E402
+from system_design_core.catalog import load_catalog  # noqa: E402
+from system_design_core.queueing import size_layers  # noqa: E402
+
+
+def main():
+    catalog = load_catalog()
+    failed = False
+    for name in catalog:
+        entry = catalog[name]
+        inputs = catalog.design_inputs(name)
+        capacity = estimate_capacity(
+            dau=inputs["dau"],
+            requests_per_user=inputs["requests_per_user"],
+            payload_size_kb=inputs["payload_size_kb"],
+            cache_hit_rate=inputs["cache_hit_rate"],
+        )
+        fleet = size_layers(capacity["peak_qps"], entry["layers"], inputs["p95_target_ms"], inputs["cache_hit_rate"])
+        ok = bool(fleet["feasible"])
+        failed |= not ok
+        print(
+            f"{'ok  ' if ok else 'FAIL'} {name:<30} target {inputs['p95_target_ms']:6,.0f} ms"
+            f"  idle P95 {float(fleet['p95_floor_ms']):6.1f} ms  bound {float(fleet['p95_bound_ms']):6.1f} ms"
+        )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Cold-start regression check for the calculation core.
+
+    python benchmarks/check_import_time.py [--runs 7] [--scale 1.0]
+
+Imports each target in a fresh interpreter several times and fails (exit 1)
+if the median import time exceeds its budget, or if the import pulled in
+Streamlit or pandas. Run it from the repository root or a pre-commit hook.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Module (plus an attribute to touch, which forces lazy loading) -> budget in ms.
+BUDGETS_MS = {
+    ("system_design_core", None): 20,
+    ("system_design_core.catalog", "load_catalog"): 40,
+    ("system_design_core", "estimate_capacity"): 250,
+    ("system_design_core", "build_design_graph"): 250,
+}
+FORBIDDEN_MODULES = ("streamlit", "pandas")
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+module = __import__({module!r}, fromlist=["_"])
+if {attribute!r} is not None:
+    getattr(module, {attribute!r})
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "forbidden": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module, attribute, runs):
+    """Median import time in ms across ``runs`` fresh interpreters, plus forbidden modules seen."""
+    code = _CHILD.format(module=module, attribute=attribute, forbidden=FORBIDDEN_MODULES)
+    timings, forbidden = [], set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd=REPO_ROOT, check=True, capture_output=True, text=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["ms"])
+        forbidden.update(result["forbidden"])
+    return statistics.median(timings), sorted(forbidden)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7, help="fresh interpreters per target")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow CI machines)")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for (module, attribute), budget in BUDGETS_MS.items():
+        target = module if attribute is None else f"{module}.{attribute}"
+        median_ms, forbidden = measure(module, attribute, args.runs)
+        limit = budget * args.scale
+        ok = median_ms <= limit and not forbidden
+        failed |= not ok
+        note = f" imported {', '.join(forbidden)}" if forbidden else ""
+        print(f"{'ok  ' if ok else 'FAIL'} {target:<45} {median_ms:7.1f} ms (budget {limit:.0f} ms){note}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+"""Throughput check for the HTTP/JSON API (``python -m system_design_core.server``).
+
+    python benchmarks/load_api.py [--connections 32] [--requests 20000] [--min-rps 0]
+
+Starts the server in a subprocess on a free port and drives it with
+keep-alive asyncio clients. Each scenario runs twice: "cold" with distinct
+DAU values (every request computed) and "cached" repeating the same bodies.
+Fails (exit 1) when a request errors or a scenario stays below ``--min-rps``.
+"""
+import argparse
+import asyncio
+import json
+import re
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _bodies(path, count, distinct, extra):
+    """Request bodies for ``path``: ``distinct`` different scenarios (plus ``extra`` keys), repeated up to ``count``."""
+    def scenario(i):
+        return {"dau": 100_000 + i, "use_cdn": i % 2 == 0}
+
+    if path == "/batch":
+        make = lambda i: {"scenarios": [scenario(i * 100 + j) for j in range(100)]}  # noqa: E731
+    else:
+        make = lambda i: {**scenario(i), **extra}  # noqa: E731
+    bodies = [json.dumps(make(i)).encode() for i in range(distinct)]
+    return [bodies[i % distinct] for i in range(count)]
+
+
+async def _client(port, path, bodies, latencies):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        for body in bodies:
+            start = time.perf_counter()
+            writer.write(
+                f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            head = await reader.readuntil(b"\r\n\r\n")
+            status = int(head.split(b" ", 2)[1])
+            length = int(re.search(rb"Content-Length: (\d+)", head).group(1))
+            payload = await reader.readexactly(length)
+            if status != 200:
+                raise RuntimeError(f"{path} answered {status}: {payload[:200]!r}")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def load(port, path, requests, connections, distinct, extra=None):
+    bodies = _bodies(path, requests, distinct, extra or {})
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(port, path, bodies[i::connections], latencies) for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--min-rps", type=float, default=0, help="fail below this many requests/sec")
+    args = parser.parse_args(argv)
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "system_design_core.server", "--port", "0", "--workers", str(args.workers)],
+        cwd=REPO_ROOT, stderr=subprocess.PIPE, text=True,
+    )
+    try:
+        port = int(re.search(r":(\d+)$", server.stderr.readline().strip()).group(1))
+        scenarios = (
+            # label, path, requests, distinct bodies when cold, extra body keys
+            ("/capacity", "/capacity", args.requests, args.requests, {}),
+            ("/design", "/design", args.requests, args.requests, {}),
+            ("/design +fleet", "/design", args.requests, 256, {"include": ["fleet"]}),  # worker pool
+            ("/batch x100", "/batch", args.requests // 100, args.requests // 100, {}),
+        )
+        failed = False
+        for label, path, requests, distinct, extra in scenarios:
+            for mode, count in (("cold", distinct), ("cached", 1)):
+                result = asyncio.run(load(port, path, requests, args.connections, count, extra))
+                ok = result["rps"] >= args.min_rps
+                failed |= not ok
+                print(
+                    f"{'ok  ' if ok else 'SLOW'} {label + f' ({mode})':24s} {result['rps']:9,.0f} req/s"
+                    f"  p50 {result['p50_ms']:6.2f} ms  p99 {result['p99_ms']:6.2f} ms"
+                )
+    finally:
+        server.send_signal(signal.SIGINT)  # lets the server shut its worker pool down
+        server.wait()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
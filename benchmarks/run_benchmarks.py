@@ -0,0 +1,287 @@
+"""Offline benchmark suite for the apps and the calculation core.
+
+    python benchmarks/run_benchmarks.py                      # compare against benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --save-baseline      # add new benchmarks to the baseline
+    python benchmarks/run_benchmarks.py --save-baseline --overwrite   # re-record it (new machine)
+    python benchmarks/run_benchmarks.py --only capacity --skip-apps
+
+Each app script is rendered headlessly with Streamlit's ``AppTest`` in fresh
+interpreters: "cold" is the first render (the script's own imports
+included), "warm" the median of the reruns that follow. ``AppTest`` compiles
+the script again on every run, where a server compiles it once, so warm times
+also grow with the script's length. The micro-benchmarks
+time the capacity math, the export path, the media, lifecycle, cache, sharding, feed and LLM serving models, the scenario store and the sweep/simulation engines at
+1, 10^3 and 10^6 scenarios. A benchmark fails (exit 1) when its median is
+more than ``--threshold`` slower than the baseline and the slowdown is above
+the ``--noise-ms`` floor. Baselines are machine specific: record one on the
+machine you compare on. ``--save-baseline`` keeps the recorded timings of
+benchmarks already in the baseline, so a change cannot re-record away its own
+slowdown; ``--overwrite`` replaces them.
+"""
+import argparse
+import fnmatch
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+APPS = (
+    "system_design_assistant_v1.py",
+    "system_design_tool_app.py",
+    "system_design_tool_app_v3.py",
+    "system_design_tool_app_v3.1.py",
+    "system_design_tool_app_v4.py",
+)
+SIZES = (1, 1_000, 1_000_000)
+
+_APP_CHILD = """
+import json, time
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({path!r}, default_timeout=120)
+start = time.perf_counter()
+at.run()
+cold = (time.perf_counter() - start) * 1000
+warm = []
+for _ in range({reruns}):
+    start = time.perf_counter()
+    at.run()
+    warm.append((time.perf_counter() - start) * 1000)
+errors = [str(e.value) for e in at.exception]
+print(json.dumps({{"cold_ms": cold, "warm_ms": warm, "errors": errors}}))
+"""
+
+
+def time_call(func, min_runs=3, max_seconds=2.0):
+    """Median and min wall time in ms; at least one run, more while under ``max_seconds``."""
+    timings = []
+    budget_end = time.perf_counter() + max_seconds
+    while len(timings) < min_runs and (not timings or time.perf_counter() < budget_end):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings), "runs": len(timings)}
+
+
+def bench_apps(runs, reruns):
+    results = {}
+    for app in APPS:
+        code = _APP_CHILD.format(path=str(REPO_ROOT / app), reruns=reruns)
+        cold, warm = [], []
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, "-c", code], cwd=REPO_ROOT, check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            if result["errors"]:
+                raise RuntimeError(f"{app} raised: {result['errors']}")
+            cold.append(result["cold_ms"])
+            warm.extend(result["warm_ms"])
+        results[f"app/{app}/cold"] = {"median_ms": statistics.median(cold), "min_ms": min(cold), "runs": len(cold)}
+        results[f"app/{app}/warm"] = {"median_ms": statistics.median(warm), "min_ms": min(warm), "runs": len(warm)}
+    return results
+
+
+def _scenario_frame(n, rng):
+    import pandas as pd
+
+    return pd.DataFrame({
+        "dau": rng.integers(1_000, 10_000_000, n),
+        "requests_per_user": rng.integers(1, 100, n),
+        "payload_size_kb": rng.uniform(1, 100, n),
+        "replication_factor": rng.integers(1, 5, n),
+        "use_cdn": rng.random(n) < 0.5,
+        "consistency": rng.choice(["Strong", "Eventual", "Quorum"], n),
+    })
+
+
+def micro_benchmarks(max_size):
+    """``{name: zero-argument callable}`` for every core benchmark up to ``max_size``."""
+    from system_design_core import (
+        estimate_capacity,
+        evaluate_topologies,
+        feed_model,
+        llm_serving,
+        media_pipeline,
+        model_hit_curve,
+        optimize_design,
+        plan_shards,
+        power_law_histogram,
+        simulate_capacity,
+        simulate_lifecycle,
+        simulate_traffic,
+        size_layers,
+        summary_csv,
+        trace_hit_curve,
+        triangular,
+    )
+    from system_design_core.batch import _ChunkWriter, evaluate_chunk
+    from system_design_core.design import summary_row
+    from system_design_core.store import ScenarioStore
+
+    rng = np.random.default_rng(0)
+    layers = ["API Gateway", "App Server", "Cache", "Primary DB", "Object Store"]
+    tmp = Path(tempfile.mkdtemp(prefix="sd-bench-"))
+    benches = {}
+    for n in (size for size in SIZES if size <= max_size):
+        dau = rng.uniform(1_000, 10_000_000, n)
+        benches[f"capacity/estimate_capacity/{n}"] = lambda dau=dau: estimate_capacity(dau=dau, requests_per_user=20)
+
+        rows = [summary_row({"peak_qps": 1.0, "storage_gb": 2.0, "egress_mb_per_sec": 3.0}, ["API Gateway"], ["x"],
+                            1, 2, 3, 4, 5, 6, "99.9%", "Strong")] * min(n, 10_000)
+        benches[f"export/summary_csv/{len(rows)}"] = lambda rows=rows: summary_csv(rows)
+
+        frame = _scenario_frame(n, rng)
+
+        def batch_export(frame=frame, n=n):
+            writer = _ChunkWriter(tmp / f"out-{n}.csv")
+            writer.write(evaluate_chunk(frame))
+            writer.close()
+
+        benches[f"export/batch_csv/{n}"] = batch_export
+        benches[f"monte_carlo/simulate_capacity/{n}"] = lambda n=n: simulate_capacity(
+            {"dau": triangular(5e5, 1e6, 2e6)}, samples=n
+        )
+        # Every peak QPS distinct: the worst case for the per-distinct-value queue solve.
+        peaks = rng.uniform(100, 100_000, n)
+        benches[f"queueing/size_layers/{n}"] = lambda peaks=peaks: size_layers(peaks, layers, 300, 80)
+        llm_dau = rng.choice(np.linspace(1e4, 1e7, min(n, 1_000)), n)
+        batches = rng.choice([8, 16, 32, 64], n)
+        benches[f"llm/llm_serving/{n}"] = lambda llm_dau=llm_dau, batches=batches: llm_serving(
+            dau=llm_dau, batch_size=batches
+        )
+        benches[f"traffic/simulate_traffic/{n}_dau"] = lambda n=n: simulate_traffic(n, 20)
+        spares = rng.integers(0, 3, (n, len(layers)))
+        zones = rng.integers(1, 4, (n, 1))
+        modes = rng.choice(np.array(["single", "active-passive", "active-active"], dtype=object), n)
+        resolutions = rng.choice(np.array([480, 720, 1080, 1440, 2160]), n)
+        benches[f"media/media_pipeline/{n}"] = lambda dau=dau, resolutions=resolutions: media_pipeline(
+            dau=dau, resolution=resolutions
+        )
+        if n <= 1_000:
+            # Five years of daily ingest per lifecycle policy.
+            warm = rng.integers(0, 180, n)
+            benches[f"lifecycle/simulate_lifecycle/{n}"] = lambda warm=warm: simulate_lifecycle(
+                1e6, warm, warm + 60, warm + 3650, monthly_growth_pct=5, horizon_years=5
+            )
+        # A Zipf trace over 10x as many requests as scenarios; 10^7 requests are sampled.
+        trace = rng.zipf(1.2, 10 * n) % 1_000_000
+        benches[f"cachesim/trace_hit_curve/{10 * n}"] = lambda trace=trace: trace_hit_curve(trace)
+        benches[f"availability/evaluate_topologies/{n}"] = lambda spares=spares, zones=zones, modes=modes: (
+            evaluate_topologies(layers, [2, 4, 1, 3, 1], spares, zones, modes, 10, 5)
+        )
+    # Five years of monthly growth to about 800 nodes.
+    growth = 1.1 ** np.arange(60)
+    benches["sharding/plan_shards/60"] = lambda: plan_shards(2_000 * growth, 20_000 * growth)
+    if max_size >= 1_000:
+        # A store of 10^4 historical designs: bulk save, an indexed search and a full re-evaluation.
+        store = ScenarioStore(tmp / "scenarios.db")
+        designs = [{"dau": float(d), "store_pii": bool(d % 3 == 0)} for d in rng.integers(1_000, 100_000_000, 10_000)]
+        store.save(designs)
+        appends = ScenarioStore(tmp / "appends.db")
+        benches["store/save/1000"] = lambda: appends.save(designs[:1_000])
+        benches["store/search/10000"] = lambda: store.search(ranges={"peak_qps": (20_000, None)}, store_pii=True)
+
+        def refresh_all(store=store, versions=iter(range(10**9))):
+            store.model_version = f"bench-{next(versions)}"  # as if the model changed
+            return store.refresh()
+
+        benches["store/refresh/10000"] = refresh_all
+    if max_size >= SIZES[-1]:
+        # A 10^7-user follow graph and the threshold sweep over its histogram.
+        benches["feed/power_law_histogram/10000000"] = lambda: power_law_histogram(10_000_000)
+        histogram = power_law_histogram(10_000_000)
+        benches["feed/feed_model/10000000"] = lambda: feed_model(*histogram, active_users=1_000_000)
+    benches["cachesim/model_hit_curve/1"] = lambda: model_hit_curve(keys=1e8, skew=0.9, ttl_s=600)
+    # Optimizer spaces of about 1, 10^3 and 10^6 configurations.
+    pinned = {"use_cdn": (True,), "enable_compression": (True,), "disaster_recovery": (True,),
+              "region_locking": (False,), "consistency": ("Eventual",), "replication_factor": (3,),
+              "cache_hit_rate": (80,), "max_utilization": (0.7,)}
+    spaces = {1: pinned, 1_000: {"cache_hit_rate": (0, 50, 80, 95), "max_utilization": (0.7,)},
+              1_000_000: {"cache_hit_rate": tuple(range(100)), "max_utilization": tuple(np.linspace(0.5, 0.9, 42))}}
+    for n, space in spaces.items():
+        if n <= max_size:
+            benches[f"optimizer/optimize_design/{n}"] = lambda space=space: optimize_design(sla="99.9%", space=space)
+    return benches
+
+
+def compare(results, baseline, threshold, noise_ms):
+    """Print a comparison table; return the names that regressed."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        median = result["median_ms"]
+        if base is None:
+            print(f"new  {name:<55} {median:10.2f} ms")
+            continue
+        ratio = median / base["median_ms"] if base["median_ms"] else float("inf")
+        regressed = ratio > 1 + threshold and median - base["median_ms"] > noise_ms
+        regressions += [name] if regressed else []
+        print(f"{'FAIL' if regressed else 'ok  '} {name:<55} {median:10.2f} ms  (baseline {base['median_ms']:.2f} ms, {ratio:5.2f}x)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="add results missing from the baseline to it")
+    parser.add_argument("--overwrite", action="store_true", help="with --save-baseline, also replace existing results")
+    parser.add_argument("--output", type=Path, help="also write the results here")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--noise-ms", type=float, default=2.0, help="ignore slowdowns smaller than this")
+    parser.add_argument("--only", help="glob over benchmark names, e.g. 'queueing/*'")
+    parser.add_argument("--skip-apps", action="store_true", help="skip the AppTest renders")
+    parser.add_argument("--app-runs", type=int, default=3, help="fresh interpreters per app")
+    parser.add_argument("--app-reruns", type=int, default=5, help="warm reruns per interpreter")
+    parser.add_argument("--max-size", type=float, default=SIZES[-1], help="largest scenario count to run")
+    args = parser.parse_args(argv)
+
+    def selected(name):
+        return args.only is None or fnmatch.fnmatch(name, args.only) or args.only in name
+
+    results = {}
+    for name, func in micro_benchmarks(args.max_size).items():
+        if selected(name):
+            results[name] = time_call(func)
+    if not args.skip_apps and (args.only is None or "app" in args.only):
+        results.update({k: v for k, v in bench_apps(args.app_runs, args.app_reruns).items() if selected(k)})
+
+    import streamlit
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "streamlit": streamlit.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    baseline = json.loads(args.baseline.read_text())["results"] if args.baseline.exists() else {}
+    regressions = compare(results, baseline, args.threshold, args.noise_ms)
+    if args.save_baseline:
+        saved = results if args.overwrite else {k: v for k, v in results.items() if k not in baseline}
+        merged = {**baseline, **saved}
+        args.baseline.write_text(json.dumps({"meta": report["meta"], "results": merged}, indent=2) + "\n")
+        print(f"Saved {len(saved)} results to {args.baseline}")
+        return 0
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -51,6 +51,90 @@ if enable_photos or enable_videos:
     adaptive_streaming = st.selectbox("Adaptive Bitrate Streaming Needed?", ["Yes", "No"])
     retention_policy = st.text_input("Media Retention Policy", "User-controlled, default 90 days")
 
+    # Imported here: the media models need NumPy, which the default form never loads.
+    from system_design_core.lifecycle import parse_days, simulate_lifecycle
+    from system_design_core.media import ladder_table, media_pipeline
+
+    col5, col6 = st.columns(2)
+    with col5:
+        if enable_photos and enable_videos:
+            video_share = st.slider("Share of Uploads that are Video (%)", 0, 100, 50)
+        else:
+            video_share = 100 if enable_videos else 0
+        views_per_upload = st.number_input("Views per Upload", min_value=0, value=20)
+    with col6:
+        watch_fraction = st.slider("Average Share of a Video Watched (%)", 0, 100, 60)
+        keep_original = st.checkbox("Keep Original Uploads", value=True)
+    col7, col8 = st.columns(2)
+    with col7:
+        warm_after = st.number_input("Move Media to Warm Storage After (days)", min_value=0, value=30)
+    with col8:
+        cold_after = st.number_input("Move Media to Cold Storage After (days)", min_value=0, value=60)
+
+    media = media_pipeline(
+        dau=users,
+        uploads_per_user=uploads_per_user,
+        video_share=video_share / 100,
+        photo_size_mb=avg_photo_size,
+        video_duration_min=avg_video_duration,
+        video_bitrate_mbps=avg_video_bitrate,
+        resolution=resolution,
+        peak_upload_qps=peak_upload_qps,
+        transcoding=transcoding == "Yes",
+        adaptive_streaming=adaptive_streaming == "Yes",
+        thumbnails=preview == "Yes",
+        keep_original=keep_original,
+        views_per_upload=views_per_upload,
+        watch_fraction=watch_fraction / 100,
+    )
+
+    st.subheader("Media Pipeline Capacity")
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Peak Ingest", f"{media['peak_ingest_gbps']:,.1f} Gbps")
+    m2.metric("Storage Growth", f"{media['storage_gb_per_day'] / 1024:,.2f} TB/day")
+    m3.metric("Transcode Workers", f"{media['transcode_workers']:,.0f}")
+    m4.metric("CDN Egress", f"{media['cdn_egress_gbps']:,.2f} Gbps")
+    m5, m6, m7, m8 = st.columns(4)
+    m5.metric("Transcode CPU", f"{media['transcode_cpu_hours_per_day']:,.0f} core-h/day")
+    m6.metric("Ready After", f"{media['ready_after_s']:,.0f} s")
+    m7.metric("Thumbnails", f"{media['thumbnails_per_day']:,.0f}/day")
+    m8.metric("Peak Thumbnail Writes", f"{media['peak_thumbnail_writes_per_sec']:,.0f}/s")
+    ladder = ladder_table(media)
+    if enable_videos and ladder:
+        st.markdown("**Rendition Ladder**")
+        st.table(ladder)
+    st.caption(
+        f"Monthly: CDN ${media['cdn_monthly_cost']:,.0f}, origin egress ${media['origin_monthly_cost']:,.0f}, "
+        f"transcode fleet ${media['transcode_monthly_cost']:,.0f}, each month of uploads adds "
+        f"${media['storage_added_monthly_cost']:,.0f}/month of storage."
+    )
+
+    # The free-text policy gives the deletion age ("default 90 days"); no duration keeps media forever.
+    media_retention = parse_days(retention_policy)
+    warm_age = warm_after if media_retention is None else min(warm_after, media_retention)
+    cold_age = max(cold_after if media_retention is None else min(cold_after, media_retention), warm_age)
+    lifecycle = simulate_lifecycle(
+        media["storage_gb_per_day"],
+        warm_after_days=warm_age,
+        cold_after_days=cold_age,
+        delete_after_days=media_retention,
+        horizon_years=1,
+    )
+    steady = lifecycle["steady_state"]
+    st.subheader("Media Storage Lifecycle")
+    t1, t2, t3, t4 = st.columns(4)
+    for column, tier in zip((t1, t2, t3), ("hot", "warm", "cold")):
+        column.metric(f"{tier.title()} Tier", f"{lifecycle['stored_gb'][tier][-1] / 1024:,.1f} TB")
+    t4.metric("Storage Cost After a Year", f"${lifecycle['monthly']['total_cost'][-1]:,.0f}/month")
+    if media_retention is None:
+        st.caption("No duration in the retention policy, so media is never deleted and cold storage keeps growing.")
+    else:
+        st.caption(
+            f"Deleting after {media_retention} days, the steady state is "
+            f"{sum(steady['stored_gb'][tier] for tier in ('hot', 'warm', 'cold')) / 1024:,.1f} TB "
+            f"at ${float(steady['monthly_cost']):,.0f}/month."
+        )
+
 st.header("4. Output")
 
 if st.button("Generate Design Summary"):
@@ -87,6 +171,19 @@ if st.button("Generate Design Summary"):
         st.markdown(f"- Storage Tiering: {storage_tiering}")
         st.markdown(f"- Adaptive Streaming: {adaptive_streaming}")
         st.markdown(f"- Media Retention Policy: {retention_policy}")
+        st.markdown("### Media Pipeline Capacity")
+        st.markdown(f"- Ingest: {media['ingest_mb_per_sec']:,.1f} MB/s average, {media['peak_ingest_gbps']:,.1f} Gbps at peak")
+        st.markdown(f"- Storage Growth: {media['storage_gb_per_day']:,.0f} GB/day")
+        st.markdown(
+            f"- Transcoding: {media['transcode_cpu_hours_per_day']:,.0f} core-hours/day, "
+            f"{media['transcode_workers']:,.0f} workers to keep up with peak uploads"
+        )
+        st.markdown(f"- Thumbnails: {media['thumbnails_per_upload']:,.1f} per upload")
+        st.markdown(f"- CDN Egress: {media['cdn_egress_gb_per_day']:,.0f} GB/day ({media['cdn_egress_gbps']:,.2f} Gbps)")
+        st.markdown(
+            f"- Storage Lifecycle: hot for {warm_age} days, warm until day {cold_age}, then cold; "
+            f"${lifecycle['monthly']['total_cost'][-1]:,.0f}/month after a year"
+        )
 
     st.markdown("---")
     st.markdown("Now use these assumptions to structure your system design, explain trade-offs, and walk through your architecture confidently.")
@@ -0,0 +1,112 @@
+"""Shared calculation core for the System Design Assistant apps.
+
+Importable without Streamlit or pandas: the core needs only the standard
+library and NumPy, and pandas is imported inside the export/batch functions
+that use it. Submodules load on first attribute access, so
+``from system_design_core import load_catalog`` does not pay for the rest.
+"""
+import importlib
+
+# Public name -> submodule that defines it.
+_EXPORTS = {
+    "assess_availability": "availability",
+    "cheapest_redundancy": "availability",
+    "evaluate_topologies": "availability",
+    "CACHE_SIM_DEFAULTS": "cachesim",
+    "hit_rate_at": "cachesim",
+    "load_trace": "cachesim",
+    "memory_for_hit_rate": "cachesim",
+    "model_hit_curve": "cachesim",
+    "stack_distances": "cachesim",
+    "trace_hit_curve": "cachesim",
+    "zipf_trace": "cachesim",
+    "ResultCache": "cache",
+    "canonical_key": "cache",
+    "memoize": "cache",
+    "shared_cache": "cache",
+    "CAPACITY_DEFAULTS": "capacity",
+    "CAPACITY_METRICS": "capacity",
+    "capacity_columns": "capacity",
+    "estimate_capacity": "capacity",
+    "estimate_capacity_frame": "capacity",
+    "SHARD_DEFAULTS": "sharding",
+    "plan_shards": "sharding",
+    "shard_count": "sharding",
+    "simulate_ring": "sharding",
+    "vnode_skew": "sharding",
+    "FEED_DEFAULTS": "feed",
+    "fanout_costs": "feed",
+    "feed_model": "feed",
+    "load_degree_histogram": "feed",
+    "power_law_followers": "feed",
+    "power_law_histogram": "feed",
+    "LLM_DEFAULTS": "llm",
+    "MODEL_PRESETS": "llm",
+    "llm_serving": "llm",
+    "llm_serving_frame": "llm",
+    "GrowthProjection": "projection",
+    "project_growth": "projection",
+    "ComputationGraph": "graph",
+    "same_value": "graph",
+    "DESIGN_DEFAULTS": "design",
+    "architecture_column": "design",
+    "architecture_layers": "design",
+    "build_design_graph": "design",
+    "design_tradeoffs": "design",
+    "summary_csv": "design",
+    "summary_row": "design",
+    "tradeoffs_column": "design",
+    "Distribution": "montecarlo",
+    "lognormal": "montecarlo",
+    "percentile_table": "montecarlo",
+    "simulate_capacity": "montecarlo",
+    "triangular": "montecarlo",
+    "uniform_range": "montecarlo",
+    "LIFECYCLE_DEFAULTS": "lifecycle",
+    "STORAGE_TIERS": "lifecycle",
+    "parse_days": "lifecycle",
+    "simulate_lifecycle": "lifecycle",
+    "LADDER_NAMES": "media",
+    "MEDIA_DEFAULTS": "media",
+    "ladder_table": "media",
+    "media_pipeline": "media",
+    "end_to_end_p95_ms": "queueing",
+    "erlang_c": "queueing",
+    "layer_profile": "queueing",
+    "min_servers": "queueing",
+    "min_servers_for_wait": "queueing",
+    "response_time_quantile": "queueing",
+    "size_layers": "queueing",
+    "COST_RATES": "costs",
+    "MODEL_ASSUMPTIONS": "costs",
+    "SEARCH_SPACE": "optimizer",
+    "optimize_design": "optimizer",
+    "pareto_front": "optimizer",
+    "RerunProfiler": "profiler",
+    "profiling_requested": "profiler",
+    "QuantileSketch": "sketch",
+    "TRAFFIC_DEFAULTS": "traffic",
+    "burst_distribution": "traffic",
+    "simulate_traffic": "traffic",
+    "ScenarioStore": "store",
+    "EstimationServer": "server",
+    "serve_in_thread": "server",
+    "CatalogError": "catalog",
+    "ProblemCatalog": "catalog",
+    "load_catalog": "catalog",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,30 @@
+"""One-off capacity estimate from the command line.
+
+    python -m system_design_core --dau 1000000 --requests-per-user 20
+
+Prints every capacity metric as JSON. Only the standard library and NumPy are
+imported, so this is cheap enough for short-lived jobs and pre-commit hooks.
+"""
+import argparse
+import json
+import sys
+
+from .capacity import CAPACITY_DEFAULTS, estimate_capacity
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m system_design_core",
+        description="Print capacity metrics for one scenario as JSON.",
+    )
+    for name, default in CAPACITY_DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=float, default=default)
+    args = parser.parse_args(argv)
+    metrics = estimate_capacity(**vars(args))
+    json.dump({name: float(value) for name, value in metrics.items()}, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
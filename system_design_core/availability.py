@@ -0,0 +1,315 @@
+"""Composite availability of a layered topology, with redundancy and RPO/RTO.
+
+Every synchronous layer is a tier of ``N + k`` instances (``N`` carry the
+load, ``k`` are spares) spread evenly over ``zones``; the request path is the
+tiers in series, inside one or more regions. Zone outages are correlated
+failures: the number of zones down follows a continuous-time Markov chain in
+which a share ``correlation`` of zone failures takes the whole tier's zones
+down at once, and given the zones up, instances fail independently. Failovers
+add a short outage per failure. Everything is batched over a leading
+"topology" axis, so thousands of candidates are scored in one call.
+"""
+import numpy as np
+
+from .costs import COST_RATES, MODEL_ASSUMPTIONS, parse_sla
+
+MINUTES_PER_YEAR = 525_960
+HOURS_PER_YEAR = MINUTES_PER_YEAR / 60
+REGION_MODES = ("single", "active-passive", "active-active")
+
+# Keyword in a layer name -> per-instance availability, repair time and failover
+# time; first match wins, like queueing.LAYER_PROFILES.
+RELIABILITY_PROFILES = (
+    ("Cache", {"availability": 0.999, "mttr_h": 0.5, "failover_s": 10.0}),
+    ("Gateway", {"availability": 0.9995, "mttr_h": 0.5, "failover_s": 5.0}),
+    ("Load Balancer", {"availability": 0.9999, "mttr_h": 0.5, "failover_s": 5.0}),
+    ("LLM", {"availability": 0.995, "mttr_h": 1.0, "failover_s": 30.0}),
+    ("Object Store", {"availability": 0.9999, "mttr_h": 1.0, "failover_s": 0.0}),
+    ("DB", {"availability": 0.999, "mttr_h": 2.0, "failover_s": 30.0}),
+    ("Store", {"availability": 0.999, "mttr_h": 2.0, "failover_s": 30.0}),
+    ("Index", {"availability": 0.999, "mttr_h": 2.0, "failover_s": 30.0}),
+)
+DEFAULT_RELIABILITY = {"availability": 0.999, "mttr_h": 0.5, "failover_s": 10.0}
+
+ZONE = {"availability": 0.9999, "mttr_h": 2.0}
+REGION = {
+    "availability": 0.9995,
+    "mttr_h": 6.0,
+    "failover_s": {"active-passive": 300.0, "active-active": 30.0},
+    "replication_lag_s": 1.0,
+    "backup_interval_min": 24 * 60,
+}
+# Regional compute relative to one region: a hot standby runs scaled down.
+REGION_COST = {
+    "single": 1.0,
+    "active-passive": 1 + MODEL_ASSUMPTIONS["standby_fraction"],
+    "active-active": 2.0,
+}
+
+
+def reliability_profile(layer, overrides=None):
+    if overrides and layer in overrides:
+        return {**DEFAULT_RELIABILITY, **overrides[layer]}
+    for keyword, profile in RELIABILITY_PROFILES:
+        if keyword in layer:
+            return profile
+    return DEFAULT_RELIABILITY
+
+
+def failure_rate_per_hour(availability, mttr_h):
+    """Failures per hour of a component with this steady-state availability and repair time."""
+    availability = np.asarray(availability, dtype=np.float64)
+    return (1 - availability) / (availability * mttr_h)
+
+
+def zone_outage_distribution(zones, correlation=0.0, zone=ZONE):
+    """Steady-state ``P(z zones down)`` for ``z = 0..zones``, from the zone Markov chain.
+
+    Each up zone fails at the zone failure rate; with probability
+    ``correlation`` a failure is common-cause and takes every zone down. Down
+    zones are repaired independently. Returns an array of length ``zones + 1``.
+    """
+    lam = float(failure_rate_per_hour(zone["availability"], zone["mttr_h"]))
+    mu = 1 / zone["mttr_h"]
+    q = np.zeros((zones + 1, zones + 1))
+    for down in range(zones):
+        up = zones - down
+        q[down, down + 1] += up * lam * (1 - correlation)
+        q[down, zones] += up * lam * correlation
+    for down in range(1, zones + 1):
+        q[down, down - 1] += down * mu
+    q -= np.diag(q.sum(axis=1))
+    # pi Q = 0 with sum(pi) = 1: replace one balance equation by the normalisation.
+    a = q.T.copy()
+    a[-1] = 1
+    b = np.zeros(zones + 1)
+    b[-1] = 1
+    return np.linalg.solve(a, b)
+
+
+def at_least_up(total, needed, availability):
+    """``P(at least needed of total independent instances are up)``, batched."""
+    total, needed, availability = np.broadcast_arrays(
+        np.asarray(total, dtype=np.int64), np.asarray(needed, dtype=np.int64), np.asarray(availability, dtype=np.float64)
+    )
+    slack = total - needed
+    result = np.zeros(total.shape)
+    ok = slack >= 0
+    term = np.where(ok, availability ** total, 0.0)
+    ratio = (1 - availability) / availability
+    for failed in range(int(slack.max(initial=-1)) + 1):
+        result += np.where(failed <= slack, term, 0.0)
+        term = term * (total - failed) / (failed + 1) * ratio
+    return result
+
+
+def tier_availability(required, spares, zones, instance_availability, correlation=0.0):
+    """Availability of tiers of ``required + spares`` instances over ``zones``, batched.
+
+    Instances are spread evenly, so each zone holds ``ceil((N + k) / zones)``.
+    """
+    required, spares, zones = np.broadcast_arrays(
+        np.asarray(required, dtype=np.int64), np.asarray(spares, dtype=np.int64), np.asarray(zones, dtype=np.int64)
+    )
+    per_zone = -(-(required + spares) // zones)
+    result = np.zeros(required.shape)
+    for zone_count in np.unique(zones):
+        mask = zones == zone_count
+        outage = zone_outage_distribution(int(zone_count), correlation)
+        for down, probability in enumerate(outage):
+            surviving = per_zone[mask] * (zone_count - down)
+            result[mask] += probability * at_least_up(
+                surviving, required[mask], np.broadcast_to(instance_availability, required.shape)[mask]
+            )
+    return result
+
+
+def region_availability(region_mode):
+    """Availability of the region setup alone, per mode; a second region adds its failover outage."""
+    region_mode = np.atleast_1d(np.asarray(region_mode, dtype=object))
+    region_q = 1 - REGION["availability"]
+    region_rate = float(failure_rate_per_hour(REGION["availability"], REGION["mttr_h"]))
+    failover = np.array([REGION["failover_s"].get(mode, 0.0) for mode in region_mode])
+    return np.where(region_mode == "single", 1 - region_q, 1 - region_q ** 2 - region_rate * failover / 3600)
+
+
+def evaluate_topologies(
+    layers,
+    required,
+    spares,
+    zones,
+    region_mode,
+    rto_min,
+    rpo_min,
+    correlation=0.0,
+    profiles=None,
+    instance_cost=COST_RATES["instance_month"],
+):
+    """Score candidate topologies; arrays have a leading topology axis.
+
+    ``required`` is the load-carrying instance count per layer (shape ``(L,)``
+    or ``(T, L)``), ``spares`` and ``zones`` are ``(T, L)`` or broadcastable,
+    ``region_mode`` is ``(T,)``. Returns availability, expected downtime, the
+    per-layer availability, RPO/RTO checks and monthly instance cost per topology.
+    """
+    profiles = [reliability_profile(layer, profiles) for layer in layers]
+    instance_a = np.array([p["availability"] for p in profiles])
+    failover_s = np.array([p["failover_s"] for p in profiles])
+    instance_rate = failure_rate_per_hour(instance_a, np.array([p["mttr_h"] for p in profiles]))
+    region_mode = np.atleast_1d(np.asarray(region_mode, dtype=object))
+    shape = np.broadcast_shapes(np.shape(required), np.shape(spares), np.shape(zones), (region_mode.size, len(layers)))
+    required, spares, zones = (np.broadcast_to(np.maximum(np.asarray(x), v), shape) for x, v in ((required, 1), (spares, 0), (zones, 1)))
+
+    layer_a = tier_availability(required, spares, zones, instance_a, correlation)
+    # A tier with redundancy still drops the failed instance's share of traffic until failover.
+    redundant = (spares > 0) | (zones > 1)
+    zone_rate = float(failure_rate_per_hour(ZONE["availability"], ZONE["mttr_h"]))
+    blips = np.where(redundant, (instance_rate + np.where(zones > 1, zone_rate, 0)) * failover_s / 3600, 0)
+    layer_a = np.clip(layer_a - blips, 0, 1)
+
+    region_rate = float(failure_rate_per_hour(REGION["availability"], REGION["mttr_h"]))
+    single = region_mode == "single"
+    failover = np.array([REGION["failover_s"].get(mode, 0.0) for mode in region_mode])
+    availability = layer_a.prod(axis=1) * region_availability(region_mode)
+
+    recovery_min = np.where(single, REGION["mttr_h"] * 60, failover / 60)
+    loss_window_min = np.where(single, REGION["backup_interval_min"], REGION["replication_lag_s"] / 60)
+    instances = (-(-(required + spares) // zones) * zones).sum(axis=1)
+    cost = instances * np.array([REGION_COST[mode] for mode in region_mode]) * instance_cost
+    return {
+        "availability": availability,
+        "downtime_min_per_year": (1 - availability) * MINUTES_PER_YEAR,
+        "layer_availability": layer_a,
+        "recovery_min": recovery_min,
+        "meets_rto": recovery_min <= rto_min,
+        "data_loss_min_per_year": region_rate * HOURS_PER_YEAR * loss_window_min,
+        "meets_rpo": loss_window_min <= rpo_min,
+        "instances": instances,
+        "monthly_cost": cost,
+    }
+
+
+def _cheapest_spares(costs, log_availability, log_target):
+    """Per-layer option indices minimizing total cost with summed log availability >= ``log_target``.
+
+    ``costs`` and ``log_availability`` are ``(L, K)``: layer by spare option.
+    Both add up across layers, so a cost/availability Pareto frontier is
+    carried layer by layer; it never holds more points than distinct total
+    costs. Returns None when even the most available choice falls short.
+    """
+    frontier = [(0, 0.0, ())]
+    for layer_costs, layer_logs in zip(costs, log_availability):
+        merged = sorted(
+            ((cost + c, log_a + a, choice + (k,))
+             for cost, log_a, choice in frontier
+             for k, (c, a) in enumerate(zip(layer_costs.tolist(), layer_logs.tolist()))),
+            key=lambda point: (point[0], -point[1]),
+        )
+        frontier, best = [], -np.inf
+        for point in merged:
+            if point[1] > best:
+                frontier.append(point)
+                best = point[1]
+    for cost, log_a, choice in frontier:
+        if log_a >= log_target:
+            return choice
+    return None
+
+
+def cheapest_redundancy(
+    layers,
+    required,
+    sla,
+    rto_min,
+    rpo_min,
+    max_spares=2,
+    zone_options=(1, 2, 3),
+    region_modes=REGION_MODES,
+    correlation=0.0,
+    profiles=None,
+):
+    """Cheapest per-layer spares, zone spread and region mode that meet the SLA, RTO and RPO.
+
+    Layer availabilities multiply and instance costs add, so for each zone
+    spread and region mode the spares are chosen layer by layer
+    (:func:`_cheapest_spares`) instead of enumerating all ``(max_spares + 1) ** L``
+    combinations. The winners are scored in one batch. Returns the winning
+    topology as a dict, or None when no candidate qualifies.
+    """
+    required = np.broadcast_to(np.maximum(np.asarray(required, dtype=np.int64), 1), (len(layers),))
+    spare_options = np.arange(max_spares + 1)
+    target = parse_sla(sla)
+    region_a = region_availability(list(region_modes)).tolist()
+    chosen = []
+    for zones in zone_options:
+        # Every layer at k spares, for each k: per-layer availability and instance count.
+        per_k = evaluate_topologies(
+            layers, required, spare_options[:, None], zones, ["single"] * spare_options.size,
+            rto_min, rpo_min, correlation, profiles,
+        )
+        with np.errstate(divide="ignore"):
+            log_availability = np.log(per_k["layer_availability"]).T
+        costs = (-(-(required[:, None] + spare_options[None, :]) // zones) * zones)
+        for mode, mode_a in zip(region_modes, region_a):
+            spares = _cheapest_spares(costs, log_availability, np.log(target / mode_a))
+            if spares is not None:
+                chosen.append((spare_options[list(spares)], zones, mode))
+    if not chosen:
+        return None
+    result = evaluate_topologies(
+        layers,
+        required,
+        np.array([spares for spares, _, _ in chosen]),
+        np.array([zones for _, zones, _ in chosen])[:, None],
+        np.array([mode for _, _, mode in chosen], dtype=object),
+        rto_min,
+        rpo_min,
+        correlation,
+        profiles,
+    )
+    ok = (result["availability"] >= target) & result["meets_rto"] & result["meets_rpo"]
+    if not ok.any():
+        return None
+    # Cheapest first; among equal cost prefer the more available.
+    candidates = np.flatnonzero(ok)
+    best = candidates[np.lexsort((-result["availability"][candidates], result["monthly_cost"][candidates]))[0]]
+    spares, zones, mode = chosen[best]
+    return {
+        "spares": dict(zip(layers, spares.tolist())),
+        "zones": int(zones),
+        "region_mode": mode,
+        "candidates": (max_spares + 1) ** len(layers) * len(zone_options) * len(region_modes),
+        **_topology_row(result, best, layers),
+    }
+
+
+def _topology_row(result, index, layers):
+    """One topology's results as plain Python values."""
+    row = {name: values[index].item() for name, values in result.items() if name != "layer_availability"}
+    row["layer_availability"] = dict(zip(layers, result["layer_availability"][index].tolist()))
+    return row
+
+
+def assess_availability(
+    layers,
+    required,
+    sla,
+    rto_min,
+    rpo_min,
+    region_mode="single",
+    spares=1,
+    zones=2,
+    correlation=0.0,
+):
+    """Score the topology as designed and find the cheapest one that meets the targets.
+
+    ``required`` is the load-carrying instance count per layer, e.g. from the
+    fleet sizing. Returns ``{"current": {...}, "meets_sla": bool, "cheapest": {...} or None}``.
+    """
+    result = evaluate_topologies(layers, required, spares, zones, [region_mode], rto_min, rpo_min, correlation)
+    current = _topology_row(result, 0, layers)
+    return {
+        "current": current,
+        "meets_sla": current["availability"] >= parse_sla(sla),
+        "cheapest": cheapest_redundancy(layers, required, sla, rto_min, rpo_min, correlation=correlation),
+    }
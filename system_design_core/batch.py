@@ -0,0 +1,329 @@
+"""Headless batch mode: stream a scenario file through the calculator.
+
+    python -m system_design_core.batch scenarios.csv -o results.csv
+
+Scenarios are read and written in bounded chunks (CSV, JSONL or Parquet, picked
+by file extension), so memory stays flat however many rows the file holds.
+Columns may use the input names from ``DESIGN_DEFAULTS`` or the export headers
+("DAU", "Requests/User/Day", ...). Missing inputs come from the row's
+``problem_type`` catalog entry when that column is present, else from the
+defaults; any other column (a service name, say) is passed through untouched.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .capacity import CAPACITY_DEFAULTS, estimate_capacity
+from .catalog import load_catalog
+from .design import (
+    ARCHITECTURE_INPUTS,
+    DESIGN_DEFAULTS,
+    TRADEOFF_INPUTS,
+    architecture_column,
+    tradeoffs_column,
+)
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Export header -> input name, so a downloaded summary CSV can be fed straight back in.
+COLUMN_ALIASES = {
+    "DAU": "dau",
+    "Requests/User/Day": "requests_per_user",
+    "Payload Size (KB)": "payload_size_kb",
+    "Object Size (KB)": "object_size_kb",
+    "Replication": "replication_factor",
+    "Retention (days)": "retention_days",
+    "SLA": "sla",
+    "Consistency": "consistency",
+    "Problem Type": "problem_type",
+}
+TOGGLE_INPUTS = tuple(dict.fromkeys(ARCHITECTURE_INPUTS + TRADEOFF_INPUTS[1:]))
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+_TRUE_STRINGS = np.array(["true", "1", "yes", "y", "on"])
+_FALSE_STRINGS = np.array(["false", "0", "no", "n", "off"])
+
+
+def file_format(path):
+    if str(path) == "-":
+        return "csv"
+    fmt = FORMATS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported scenario file type: {path} (expected one of {sorted(FORMATS)})")
+    return fmt
+
+
+def iter_scenario_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield DataFrames of at most ``chunk_size`` scenarios from a CSV/JSONL/Parquet file."""
+    import pandas as pd
+
+    fmt = file_format(path)
+    if fmt == "csv":
+        yield from pd.read_csv(sys.stdin if str(path) == "-" else path, chunksize=chunk_size)
+    elif fmt == "jsonl":
+        yield from pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+def _as_bool(values):
+    """Toggle values as booleans: true/false, yes/no, y/n, on/off or 1/0, else ``ValueError``."""
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    if values.dtype.kind in "iuf":
+        truth, known = values == 1, (values == 0) | (values == 1)
+    else:
+        words = np.char.lower(values.astype(str))
+        truth = np.isin(words, _TRUE_STRINGS)
+        known = truth | np.isin(words, _FALSE_STRINGS)
+        # JSON records mix numbers in with the words, and 1.0 prints as "1.0".
+        for index in np.flatnonzero(~known):
+            value = values.flat[index]
+            if isinstance(value, (int, float)) and value in (0, 1):
+                truth.flat[index], known.flat[index] = value == 1, True
+    if not known.all():
+        bad = sorted({str(value) for value in values[~known].tolist()})
+        raise ValueError(f"expected true/false, yes/no, on/off or 1/0, got {bad[:5]}")
+    return truth
+
+
+def _problem_type_inputs(problem_types):
+    """Per-row catalog inputs: the distinct types plus each row's index into them.
+
+    Blank cells (None, NaN or an empty string) have no problem type; their
+    inputs are empty, so those rows fall back to ``DESIGN_DEFAULTS``.
+    """
+    catalog = load_catalog()
+    values = np.asarray(problem_types, dtype=object).ravel()
+    blank = np.fromiter(
+        (value is None or value != value or (isinstance(value, str) and not value.strip()) for value in values),
+        dtype=bool,
+        count=values.size,
+    )
+    names, inverse = np.unique(np.where(blank, "", values.astype(str)), return_inverse=True)
+    unknown = [str(name) for name in names if name and name not in catalog]
+    if unknown:
+        raise ValueError(f"Unknown problem types: {unknown}")
+    return [catalog.design_inputs(name) if name else {} for name in names], inverse
+
+
+def _resolve_inputs(columns, rows, problem_types=None):
+    """Full-length input arrays from ``{name: (values, missing)}`` columns.
+
+    Missing columns and cells fall back to the row's problem type, else to ``DESIGN_DEFAULTS``.
+    """
+    per_type = _problem_type_inputs(problem_types) if problem_types is not None else None
+    inputs = {}
+    for name, default in DESIGN_DEFAULTS.items():
+        dtype = object if isinstance(default, str) else None
+        if per_type is not None:
+            type_inputs, inverse = per_type
+            fallback = np.array([defaults.get(name, default) for defaults in type_inputs], dtype=dtype)[inverse]
+        else:
+            fallback = np.full(rows, default, dtype=dtype)
+        if name in columns:
+            # Blank cells fall back like a missing column would.
+            values, missing = columns[name]
+            if missing.any():
+                values = np.where(missing, fallback, values)
+        else:
+            values = fallback
+        if name in TOGGLE_INPUTS:
+            try:
+                values = _as_bool(values)
+            except ValueError as exc:
+                raise ValueError(f"{name}: {exc}") from None
+        inputs[name] = values
+    return inputs
+
+
+def scenario_inputs(frame):
+    """Resolve one chunk's columns to full-length input arrays."""
+    frame = frame.rename(columns=COLUMN_ALIASES)
+    columns = {
+        name: (frame[name].to_numpy(), frame[name].isna().to_numpy()) for name in DESIGN_DEFAULTS if name in frame
+    }
+    return _resolve_inputs(columns, len(frame), frame["problem_type"] if "problem_type" in frame else None)
+
+
+def records_inputs(records):
+    """Resolve a list of scenario dicts (e.g. parsed JSON) like :func:`scenario_inputs` resolves a chunk.
+
+    Unknown keys, lists or objects as values, non-strings for string inputs,
+    toggles outside the true/false words and non-finite numbers (NaN,
+    infinity) raise ``ValueError``.
+    """
+    records = [{COLUMN_ALIASES.get(key, key): value for key, value in record.items()} for record in records]
+    unknown = sorted({key for record in records for key in record} - set(DESIGN_DEFAULTS) - {"problem_type"})
+    if unknown:
+        raise ValueError(f"Unknown scenario inputs: {unknown}")
+    strings = {name for name, default in DESIGN_DEFAULTS.items() if isinstance(default, str)} | {"problem_type"}
+    for record in records:
+        for name, value in record.items():
+            if value is None:
+                continue
+            if name in strings and not isinstance(value, str):
+                raise ValueError(f"{name} must be a string, got {value!r}")
+            if not isinstance(value, (str, int, float)):
+                raise ValueError(f"{name} must be a single value, got {value!r}")
+    problem_types = None
+    if any(record.get("problem_type") is not None for record in records):
+        problem_types = [record.get("problem_type") for record in records]
+    columns = {}
+    for name in DESIGN_DEFAULTS:
+        if any(name in record for record in records):
+            values = np.array([record.get(name) for record in records], dtype=object)
+            missing = np.array([record.get(name) is None for record in records])
+            columns[name] = (values, missing)
+    inputs = _resolve_inputs(columns, len(records), problem_types)
+    for name, default in DESIGN_DEFAULTS.items():
+        if name not in TOGGLE_INPUTS and not isinstance(default, str):
+            inputs[name] = inputs[name].astype(np.float64)
+            if not np.isfinite(inputs[name]).all():
+                raise ValueError(f"{name} must be a finite number")
+    return inputs
+
+
+def export_columns(inputs, capacity):
+    """The export summary fields for arrays of resolved inputs and their capacity metrics."""
+    return {
+        "DAU": inputs["dau"],
+        "Requests/User/Day": inputs["requests_per_user"],
+        "Payload Size (KB)": inputs["payload_size_kb"],
+        "Object Size (KB)": inputs["object_size_kb"],
+        "Replication": inputs["replication_factor"],
+        "Retention (days)": inputs["retention_days"],
+        "Peak QPS": capacity["peak_qps"],
+        "Storage Estimate (GB)": capacity["storage_gb"],
+        "Egress MB/sec": capacity["egress_mb_per_sec"],
+        "SLA": inputs["sla"],
+        "Consistency": inputs["consistency"],
+        "Architecture": architecture_column(*(inputs[name] for name in ARCHITECTURE_INPUTS)),
+        "Trade-offs": tradeoffs_column(*(inputs[name] for name in TRADEOFF_INPUTS)),
+    }
+
+
+def evaluate_chunk(frame):
+    """Return the export fields for every scenario in ``frame``."""
+    import pandas as pd
+
+    inputs = scenario_inputs(frame)
+    capacity = estimate_capacity(**{name: inputs[name] for name in CAPACITY_DEFAULTS if name in inputs})
+    passthrough = [
+        column for column in frame.columns
+        if column not in DESIGN_DEFAULTS and COLUMN_ALIASES.get(column) not in DESIGN_DEFAULTS
+    ]
+    result = {column: frame[column].to_numpy() for column in passthrough}
+    result.update(export_columns(inputs, capacity))
+    return pd.DataFrame(result, index=frame.index)
+
+
+class _ChunkWriter:
+    """Append result chunks to a CSV, JSONL or Parquet file.
+
+    CSV goes through pyarrow's writer when it is installed (an order of
+    magnitude faster than ``DataFrame.to_csv`` on float columns).
+    """
+
+    def __init__(self, path):
+        self.fmt = file_format(path)
+        self.path = path
+        self._arrow_writer = None
+        self._schema = None
+        self._first = True
+        if self.fmt == "parquet":
+            self._handle = None
+        elif str(path) == "-":
+            self._handle = sys.stdout
+        else:
+            self._handle = open(path, "w" if self.fmt == "jsonl" else "wb")
+        self._use_arrow = self.fmt == "parquet" or (self.fmt == "csv" and _has_pyarrow())
+
+    def write(self, chunk):
+        if self._use_arrow:
+            self._write_arrow(chunk)
+        elif self.fmt == "csv":
+            chunk.to_csv(self._handle, header=self._first, index=False)
+        else:
+            # pandas escapes every "/" as "\/"; unescaping keeps headers like "Requests/User/Day" readable.
+            lines = chunk.to_json(orient="records", lines=True).replace("\\/", "/")
+            self._handle.write(lines.rstrip("\n") + "\n")
+        self._first = False
+
+    def _write_arrow(self, chunk):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._arrow_writer is None:
+            self._schema = table.schema
+            if self.fmt == "parquet":
+                import pyarrow.parquet as pq
+
+                self._arrow_writer = pq.ParquetWriter(self.path, table.schema)
+            else:
+                import pyarrow.csv as pa_csv
+
+                sink = sys.stdout.buffer if self._handle is sys.stdout else self._handle
+                self._arrow_writer = pa_csv.CSVWriter(sink, table.schema)
+        else:
+            # Later chunks may infer a narrower type (int vs float) for a passthrough column.
+            table = table.cast(self._schema)
+        self._arrow_writer.write_table(table)
+
+    def close(self):
+        if self._arrow_writer is not None:
+            self._arrow_writer.close()
+        if self._handle is sys.stdout:
+            sys.stdout.flush()
+        elif self._handle is not None:
+            self._handle.close()
+
+
+def _has_pyarrow():
+    try:
+        import pyarrow.csv  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def run_batch(input_path, output_path="-", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream ``input_path`` through the calculator into ``output_path``; returns the row count."""
+    writer = _ChunkWriter(output_path)
+    rows = 0
+    try:
+        for chunk in iter_scenario_chunks(input_path, chunk_size):
+            writer.write(evaluate_chunk(chunk))
+            rows += len(chunk)
+    finally:
+        writer.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m system_design_core.batch",
+        description="Evaluate a CSV/JSONL/Parquet file of scenarios and write the design summary fields.",
+    )
+    parser.add_argument("input", help="scenario file, or - for CSV on stdin")
+    parser.add_argument("-o", "--output", default="-", help="result file (.csv/.jsonl/.parquet), default CSV on stdout")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="rows held in memory at once")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        rows = run_batch(args.input, args.output, args.chunk_size)
+    except (OSError, ValueError, ImportError) as exc:
+        parser.exit(1, f"error: {exc}\n")
+    print(f"Processed {rows:,} scenarios in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+"""Process-wide, memory-bounded LRU cache for computed scenario results.
+
+Every Streamlit session runs in the same process, so results cached here are
+shared between browser tabs: the second engineer to open a template gets the
+first one's Monte Carlo run, traffic simulation or optimizer front. Keys are
+a SHA-256 over a canonical encoding of the inputs (dict order, int/float
+scalars from NumPy and array contents all normalised), so equal scenarios hit
+no matter how they were built. Cached values are shared, so callers must
+treat them as read-only.
+"""
+import hashlib
+import os
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import numpy as np
+
+CACHE_SIZE_ENV = "SYSTEM_DESIGN_CACHE_MB"
+DEFAULT_MAX_MB = 256
+
+
+def _encode(value, digest):
+    """Feed a type-tagged, order-independent encoding of ``value`` into ``digest``."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, bool):
+        digest.update(f"<{value}>".encode())
+    elif isinstance(value, int):
+        digest.update(b"i%d;" % value)
+    elif isinstance(value, float):
+        digest.update(b"f" + struct.pack("<d", value))
+    elif isinstance(value, str):
+        data = value.encode()
+        digest.update(b"s%d:" % len(data) + data)
+    elif isinstance(value, bytes):
+        digest.update(b"b%d:" % len(value) + value)
+    elif isinstance(value, np.ndarray):
+        if value.dtype == object:
+            digest.update(b"O%r" % (value.shape,))
+            for item in value.ravel():
+                _encode(item, digest)
+        else:
+            digest.update(f"a{value.dtype.str}{value.shape}".encode() + np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        items = sorted((canonical_key(k), v) for k, v in value.items())
+        digest.update(b"d%d{" % len(items))
+        for key, item in items:
+            digest.update(key.encode())
+            _encode(item, digest)
+        digest.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"l%d[" % len(value))
+        for item in value:
+            _encode(item, digest)
+        digest.update(b"]")
+    elif isinstance(value, (set, frozenset)):
+        _encode(sorted(canonical_key(item) for item in value), digest)
+    else:
+        # Plain objects (e.g. Monte Carlo Distributions) hash by type and attributes.
+        state = getattr(value, "__dict__", None)
+        if state is None and hasattr(value, "__slots__"):
+            state = {name: getattr(value, name) for name in value.__slots__}
+        if state is None:
+            raise TypeError(f"Cannot build a cache key from {type(value).__name__}")
+        digest.update(f"o{type(value).__module__}.{type(value).__qualname__}".encode())
+        _encode(state, digest)
+
+
+def canonical_key(*args, **kwargs):
+    """Stable hex key for any mix of scalars, strings, arrays, dicts and lists."""
+    digest = hashlib.sha256()
+    _encode([args, kwargs], digest)
+    return digest.hexdigest()
+
+
+def estimate_size(value, _seen=None):
+    """Approximate bytes held by ``value``, counting NumPy buffers and containers."""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(item, seen) for item in value)
+    state = getattr(value, "__dict__", None)
+    if state is not None and not isinstance(value, type):
+        return sys.getsizeof(value) + estimate_size(state, seen)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """Thread-safe LRU cache bounded by the estimated size of its values.
+
+    ``get_or_compute`` runs a missing computation once even when several
+    script threads ask for the same key at the same moment; the others wait
+    for its result instead of recomputing it.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """Store ``value``, evicting least recently used entries to stay under the bound."""
+        size = estimate_size(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if size > self.max_bytes:
+                return value
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def get_or_compute(self, key, func):
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                pending = self._pending.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self._pending[key] = threading.Event()
+                    break
+            # Another thread is computing this key; wait, then look again.
+            pending.wait()
+        try:
+            return self.put(key, func())
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_SHARED = None
+_SHARED_LOCK = threading.Lock()
+
+
+def shared_cache():
+    """The process-wide cache; its size comes from ``SYSTEM_DESIGN_CACHE_MB`` (default 256)."""
+    global _SHARED
+    if _SHARED is None:
+        with _SHARED_LOCK:
+            if _SHARED is None:
+                max_mb = float(os.environ.get(CACHE_SIZE_ENV, DEFAULT_MAX_MB))
+                _SHARED = ResultCache(int(max_mb * 1024 * 1024))
+    return _SHARED
+
+
+def memoize(func=None, cache=None, ignore=()):
+    """Cache ``func``'s results in ``cache`` (the shared one by default), keyed by its arguments.
+
+    Keyword arguments named in ``ignore`` (worker counts, say) do not change
+    the result, so they are left out of the key.
+    """
+    if func is None:
+        return lambda f: memoize(f, cache, ignore)
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        store = cache if cache is not None else shared_cache()
+        keyed = {key: value for key, value in kwargs.items() if key not in ignore} if ignore else kwargs
+        return store.get_or_compute(canonical_key(name, *args, **keyed), lambda: func(*args, **kwargs))
+
+    wrapper.uncached = func
+    return wrapper
@@ -0,0 +1,367 @@
+"""Cache hit rate as a function of cache memory, from a popularity model or a key trace.
+
+Two paths produce the same hit-rate-vs-memory curves for LRU, LFU and TTL
+caches:
+
+* the **model** path takes a Zipf popularity (working-set size, skew) and
+  uses Che's approximation: an LRU cache of ``C`` entries behaves like a TTL
+  cache whose characteristic time ``T_C`` keeps ``C`` keys alive on average.
+  Ranks are grouped into log-spaced bins, so 10^9 keys cost the same as 10^4.
+* the **trace** path replays real keys. LRU stack distances for every request
+  come from one merge pass over the trace (counting, per request, earlier
+  requests whose previous access is older), so every cache size is answered
+  at once. Traces larger than ``sample_limit`` are spatially sampled by key
+  hash (SHARDS), which keeps 10^8-request traces to a few seconds.
+
+TTLs expire an entry when it has gone ``ttl_s`` seconds without an access.
+The TTL curve is a size-unbounded TTL cache: each point is the TTL whose
+average live entries fit in that much memory. LFU on a trace is the
+in-hindsight ideal: the most requested keys are kept, and first accesses miss.
+"""
+import io
+
+import numpy as np
+
+from .capacity import KB_PER_GB
+
+POLICIES = ("lru", "lfu", "ttl")
+ENTRY_OVERHEAD_KB = 0.1      # key, pointers and allocator slack per cached entry
+DEFAULT_SAMPLE_LIMIT = 1 << 20
+DEFAULT_POINTS = 40
+
+CACHE_SIM_DEFAULTS = {
+    "keys": 10_000_000,
+    "skew": 0.9,
+    "object_size_kb": 10,
+    "ttl_s": None,
+}
+
+_HASH_CHUNK = 1 << 22
+_EXACT_RANKS = 1024
+_BIN_RATIO = 1.02
+
+
+def cache_sizes(max_entries, points=DEFAULT_POINTS, min_entries=None):
+    """Log-spaced cache sizes in entries, from ``max_entries / 10^4`` (or ``min_entries``) up."""
+    max_entries = max(float(max_entries), 1.0)
+    low = max(min_entries if min_entries is not None else max_entries / 1e4, 1.0)
+    return np.unique(np.round(np.geomspace(low, max_entries, points)))
+
+
+def entries_to_gb(entries, object_size_kb, overhead_kb=ENTRY_OVERHEAD_KB):
+    return np.asarray(entries, dtype=np.float64) * (object_size_kb + overhead_kb) / KB_PER_GB
+
+
+def hit_rate_at(curve, memory_gb, policy="lru"):
+    """Hit rate (0-1) of ``policy`` at ``memory_gb``, interpolated on the curve in log memory."""
+    memory = np.log(np.maximum(curve["memory_gb"], 1e-12))
+    target = np.log(np.maximum(np.asarray(memory_gb, dtype=np.float64), 1e-12))
+    return np.interp(target, memory, curve["hit_rate"][policy], left=0.0)
+
+
+def memory_for_hit_rate(curve, hit_rate, policy="lru"):
+    """Smallest memory (GB) on the curve reaching ``hit_rate`` (0-1), or inf."""
+    reached = np.flatnonzero(curve["hit_rate"][policy] >= hit_rate)
+    return float(curve["memory_gb"][reached[0]]) if reached.size else float("inf")
+
+
+# --- Zipf model (Che's approximation) ---
+
+
+def zipf_bins(keys, skew):
+    """``(keys_per_bin, probability_per_key)`` for a Zipf(``skew``) popularity over ``keys`` ranks.
+
+    The first ranks are exact; the tail is grouped into bins whose ranks
+    differ by at most 2%, with each bin's mass from the integral of
+    ``x ** -skew`` over it.
+    """
+    keys = int(max(keys, 1))
+    exact = np.arange(1, min(keys, _EXACT_RANKS) + 1, dtype=np.float64)
+    counts, mass = [np.ones_like(exact)], [exact ** -skew]
+    if keys > _EXACT_RANKS:
+        edges = np.unique(np.round(np.geomspace(_EXACT_RANKS + 1, keys + 1, int(
+            np.log(keys / _EXACT_RANKS) / np.log(_BIN_RATIO)) + 2)))
+        lo, hi = edges[:-1] - 0.5, edges[1:] - 0.5
+        if skew == 1:
+            tail = np.log(hi / lo)
+        else:
+            tail = (hi ** (1 - skew) - lo ** (1 - skew)) / (1 - skew)
+        counts.append(edges[1:] - edges[:-1])
+        mass.append(tail)
+    counts, mass = np.concatenate(counts), np.concatenate(mass)
+    return counts, mass / mass.sum() / counts
+
+
+def _characteristic_time(counts, prob, sizes):
+    """Che's ``T_C`` (in requests) for each size: expected live keys at ``T_C`` equal the size."""
+    sizes = np.asarray(sizes, dtype=np.float64)
+    total = counts.sum()
+    # Live keys never exceed the window length, so T_C >= size.
+    low = np.log(np.maximum(sizes, 1.0))
+    high = np.full(sizes.shape, np.log(1e3 * total / prob.min()))
+    for _ in range(64):
+        mid = (low + high) / 2
+        live = (counts * -np.expm1(-prob * np.exp(mid)[..., None])).sum(axis=-1)
+        below = live < sizes
+        low, high = np.where(below, mid, low), np.where(below, high, mid)
+    return np.where(sizes >= total, np.inf, np.exp((low + high) / 2))
+
+
+def model_hit_curve(
+    sizes=None,
+    keys=CACHE_SIM_DEFAULTS["keys"],
+    skew=CACHE_SIM_DEFAULTS["skew"],
+    request_rate=None,
+    ttl_s=CACHE_SIM_DEFAULTS["ttl_s"],
+    object_size_kb=CACHE_SIM_DEFAULTS["object_size_kb"],
+    overhead_kb=ENTRY_OVERHEAD_KB,
+):
+    """Steady-state hit rate of LRU, LFU and TTL caches of ``sizes`` entries under Zipf popularity.
+
+    ``request_rate`` (requests/s) is only needed to apply ``ttl_s`` and to
+    report the TTL curve in seconds.
+    """
+    sizes = cache_sizes(keys) if sizes is None else np.asarray(sizes, dtype=np.float64)
+    counts, prob = zipf_bins(keys, skew)
+    t_c = _characteristic_time(counts, prob, sizes)
+    ttl_requests = np.inf if ttl_s is None or not request_rate else ttl_s * request_rate
+
+    def che_hits(window):
+        # Share of requests whose key was requested within the last ``window`` requests.
+        window = np.asarray(window, dtype=np.float64)
+        finite = np.where(np.isinf(window), 0.0, window)[..., None]
+        return np.where(np.isinf(window), 1.0, (counts * prob * -np.expm1(-prob * finite)).sum(axis=-1))
+
+    # LFU keeps the ``size`` most popular keys: interpolate the cumulative mass over the bins.
+    key_edges = np.r_[0.0, np.cumsum(counts)]
+    live = -np.expm1(-prob * ttl_requests) if np.isfinite(ttl_requests) else np.ones_like(prob)
+    mass_edges = np.r_[0.0, np.cumsum(counts * prob * live)]
+    lfu = np.interp(sizes, key_edges, mass_edges)
+    lru = che_hits(np.minimum(t_c, ttl_requests))
+    return {
+        "entries": sizes,
+        "memory_gb": entries_to_gb(sizes, object_size_kb, overhead_kb),
+        "hit_rate": {"lru": lru, "lfu": lfu, "ttl": che_hits(t_c)},
+        "ttl_s": t_c / request_rate if request_rate else t_c,
+        "source": "model",
+    }
+
+
+def zipf_trace(requests, keys=CACHE_SIM_DEFAULTS["keys"], skew=CACHE_SIM_DEFAULTS["skew"], seed=0):
+    """Synthetic trace of ``requests`` key ids (0 = most popular) drawn from Zipf(``skew``)."""
+    rng = np.random.default_rng(seed)
+    cdf = np.cumsum(np.arange(1, int(keys) + 1, dtype=np.float64) ** -skew)
+    cdf /= cdf[-1]
+    trace = np.empty(int(requests), dtype=np.int64)
+    for start in range(0, len(trace), _HASH_CHUNK):
+        chunk = trace[start:start + _HASH_CHUNK]
+        chunk[:] = np.searchsorted(cdf, rng.random(len(chunk)), side="right")
+    return np.minimum(trace, int(keys) - 1)
+
+
+# --- Trace replay (LRU stack distances) ---
+
+
+def previous_access(keys):
+    """Index of each request's previous request for the same key, -1 for first requests."""
+    keys = np.asarray(keys)
+    order = np.argsort(keys, kind="stable")
+    repeat = keys[order][1:] == keys[order][:-1]
+    prev = np.full(len(keys), -1, dtype=np.int64)
+    prev[order[1:][repeat]] = order[:-1][repeat]
+    return prev
+
+
+def _count_earlier_smaller(values, block=16):
+    """``counts[i] = #{j < i : values[j] < values[i]}`` for distinct integer ``values``.
+
+    A bottom-up merge sort over rows: each level merges pairs of sorted runs
+    with a row-wise stable argsort (two presorted runs merge in linear time)
+    and credits every right-run element with the left-run elements that sort
+    before it. The original index rides in the low bits of the sort key.
+    """
+    m = len(values)
+    if m == 0:
+        return np.zeros(0, dtype=np.int64)
+    size = max(block, 1 << int(np.ceil(np.log2(m))))
+    pad = np.iinfo(np.int64).max
+    packed = np.full(size, pad, dtype=np.int64)
+    packed[:m] = (values - values.min()) * size + np.arange(m)
+    rows = packed.reshape(-1, block)
+    # Within the first blocks, compare every pair directly.
+    earlier = np.tri(block, k=-1, dtype=bool)
+    counts = np.empty((len(rows), block), dtype=np.int64)
+    step = 1 << 14
+    for start in range(0, len(rows), step):
+        chunk = rows[start:start + step]
+        counts[start:start + step] = ((chunk[:, None, :] < chunk[:, :, None]) & earlier).sum(axis=-1)
+    order = np.argsort(rows, axis=-1, kind="stable")
+    packed = np.take_along_axis(rows, order, -1).ravel()
+    counts = np.take_along_axis(counts, order, -1).ravel()
+    width = block
+    while width < size:
+        rows = packed.reshape(-1, 2 * width)
+        order = np.argsort(rows, axis=-1, kind="stable")
+        from_left = order < width
+        merged = np.take_along_axis(counts.reshape(-1, 2 * width), order, -1)
+        merged += np.where(from_left, 0, np.cumsum(from_left, axis=-1))
+        packed = np.take_along_axis(rows, order, -1).ravel()
+        counts = merged.ravel()
+        width *= 2
+    real = packed != pad
+    result = np.empty(m, dtype=np.int64)
+    result[packed[real] % size] = counts[real]
+    return result
+
+
+def stack_distances(keys, prev=None):
+    """LRU stack distance of every request (distinct keys since its previous access), -1 if first.
+
+    A request hits an LRU cache of ``C`` entries exactly when its distance is
+    below ``C``. The distance is the number of requests between the previous
+    access ``p`` and now whose own previous access is older than ``p``.
+    """
+    prev = previous_access(keys) if prev is None else prev
+    m = len(prev)
+    # First accesses get distinct negative values so every value is unique.
+    values = np.where(prev >= 0, prev, np.arange(m) - m)
+    older = _count_earlier_smaller(values)
+    return np.where(prev >= 0, older - prev - 1, -1)
+
+
+def splitmix64(keys):
+    """splitmix64 of integer keys as uint64 (wrapping arithmetic)."""
+    z = keys.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _integer_keys(keys):
+    keys = np.asarray(keys)
+    if keys.dtype.kind in "iub":
+        return keys.astype(np.int64, copy=False)
+    return np.unique(keys, return_inverse=True)[1].astype(np.int64).ravel()
+
+
+def sample_trace(keys, sample_limit=DEFAULT_SAMPLE_LIMIT):
+    """Indices of the requests whose key hashes into a ``rate`` share of key space, and ``rate``.
+
+    Keeps every request when the trace fits in ``sample_limit``.
+    """
+    n = len(keys)
+    if n <= sample_limit:
+        return np.arange(n), 1.0
+    rate = sample_limit / n
+    threshold = np.uint64(int(rate * 2 ** 53))
+    kept = [
+        start + np.flatnonzero(splitmix64(keys[start:start + _HASH_CHUNK]) >> np.uint64(11) < threshold)
+        for start in range(0, n, _HASH_CHUNK)
+    ]
+    return np.concatenate(kept), rate
+
+
+def trace_hit_curve(
+    keys,
+    sizes=None,
+    timestamps=None,
+    request_rate=None,
+    ttl_s=CACHE_SIM_DEFAULTS["ttl_s"],
+    object_size_kb=CACHE_SIM_DEFAULTS["object_size_kb"],
+    overhead_kb=ENTRY_OVERHEAD_KB,
+    sample_limit=DEFAULT_SAMPLE_LIMIT,
+):
+    """Replay a key trace through LRU, LFU and TTL caches of every size in ``sizes``.
+
+    ``keys`` is any array of keys (integers are fastest). Times come from
+    ``timestamps`` (seconds) or, without them, from uniform arrivals at
+    ``request_rate`` (default one per second); they only matter for TTLs.
+    The curve includes cold-start misses, as the trace does.
+    """
+    keys = _integer_keys(keys)
+    n = len(keys)
+    if n == 0:
+        raise ValueError("The key trace is empty")
+    index, rate = sample_trace(keys, sample_limit)
+    sampled = keys[index]
+    if timestamps is not None:
+        times = np.asarray(timestamps, dtype=np.float64)[index]
+    else:
+        times = index / float(request_rate or 1.0)
+    prev = previous_access(sampled)
+    distance = stack_distances(sampled, prev)
+    repeat = prev >= 0
+    gap = np.where(repeat, times - times[np.maximum(prev, 0)], np.inf)
+    fresh = repeat & (gap < (np.inf if ttl_s is None else ttl_s))
+    unique_sampled = int((~repeat).sum())
+    if sizes is None:
+        sizes = cache_sizes(unique_sampled / rate)
+    sizes = np.asarray(sizes, dtype=np.float64)
+    # SHARDS: distances scale by 1/rate, and the sample's size error counts as hits at distance 0.
+    expected = rate * n
+    adjust = expected - len(sampled)
+
+    def hit_rate(hits):
+        return np.clip((hits + adjust * (rate < 1)) / expected, 0, 1)
+
+    lru_distance = np.sort(distance[fresh] / rate)
+    lru = hit_rate(np.searchsorted(lru_distance, sizes, side="left"))
+
+    _, key_index, requests_per_key = np.unique(sampled, return_inverse=True, return_counts=True)
+    fresh_per_key = np.bincount(key_index.ravel(), weights=fresh, minlength=len(requests_per_key))
+    by_popularity = np.argsort(-requests_per_key, kind="stable")
+    kept_hits = np.r_[0.0, np.cumsum(fresh_per_key[by_popularity])]
+    lfu = hit_rate(np.interp(sizes * rate, np.arange(len(kept_hits)), kept_hits))
+
+    # TTL cache: a request hits when its gap is under the TTL; an entry lives
+    # until its next access or for the TTL, whichever comes first.
+    end = times.max()
+    span = max(end - times.min(), 1e-9)
+    next_gap = np.full(len(sampled), np.inf)
+    next_gap[prev[repeat]] = gap[repeat]
+    live_until = np.minimum(next_gap, end - times)
+    finite_gaps = np.sort(gap[repeat])
+    ttls = np.unique(np.r_[np.geomspace(max(finite_gaps[0] if finite_gaps.size else 1.0, 1e-6), span, 200), span])
+    ttl_hits = np.searchsorted(finite_gaps, ttls, side="left")
+    sorted_live = np.sort(live_until)
+    cumulative_live = np.r_[0.0, np.cumsum(sorted_live)]
+    capped = np.searchsorted(sorted_live, ttls)
+    occupancy = (cumulative_live[capped] + ttls * (len(sorted_live) - capped)) / span / rate
+    ttl_rate = hit_rate(ttl_hits)
+    return {
+        "entries": sizes,
+        "memory_gb": entries_to_gb(sizes, object_size_kb, overhead_kb),
+        "hit_rate": {
+            "lru": lru,
+            "lfu": lfu,
+            "ttl": np.interp(sizes, occupancy, ttl_rate, left=0.0),
+        },
+        "ttl_s": np.interp(sizes, occupancy, ttls),
+        "source": "trace",
+        "requests": n,
+        "unique_keys": unique_sampled / rate,
+        "sample_rate": rate,
+    }
+
+
+def load_trace(source):
+    """Read a key trace from CSV/text: a ``key`` column (or the first column) and optional ``timestamp``.
+
+    ``source`` is a path, a file object or the file's bytes.
+    """
+    import pandas as pd
+
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    frame = pd.read_csv(source, header=None, dtype=str, keep_default_na=False)
+    header = [str(value).strip().lower() for value in frame.iloc[0]]
+    if "key" in header:
+        frame = frame.iloc[1:]
+        frame.columns = header
+    else:
+        frame.columns = ["key", "timestamp"][:frame.shape[1]] + list(frame.columns[2:])
+    keys = frame["key"].to_numpy()
+    if np.char.isdigit(keys.astype(str)).all():
+        keys = keys.astype(np.int64)
+    timestamps = pd.to_numeric(frame["timestamp"]).to_numpy(dtype=np.float64) if "timestamp" in frame else None
+    return keys, timestamps
@@ -0,0 +1,93 @@
+"""Vectorized capacity math shared by every app version.
+
+Every input may be a scalar or a NumPy array; arrays are broadcast against
+each other so a single call evaluates a whole parameter sweep.
+"""
+import numpy as np
+
+SECONDS_PER_DAY = 86_400
+KB_PER_MB = 1024
+KB_PER_GB = 1024 * 1024
+MB_PER_GB = 1024
+BYTES_PER_GB = 1024 ** 3
+
+# Input name -> default used when a caller (or a DataFrame column) omits it.
+CAPACITY_DEFAULTS = {
+    "dau": 1_000_000,
+    "requests_per_user": 20,
+    "peak_multiplier": 2.0,
+    "payload_size_kb": 10,
+    "object_size_kb": None,      # falls back to payload_size_kb
+    "replication_factor": 3,
+    "cache_hit_rate": 80,        # percent, like the sidebar slider
+    "read_percent": None,        # falls back to cache_hit_rate
+    "ingress_overhead": 1.0,
+    "egress_overhead": 1.0,
+}
+
+CAPACITY_METRICS = (
+    "total_requests",
+    "qps",
+    "peak_qps",
+    "read_qps",
+    "write_qps",
+    "storage_gb",
+    "ingress_mb_per_sec",
+    "egress_mb_per_sec",
+)
+
+
+def estimate_capacity(
+    dau=CAPACITY_DEFAULTS["dau"],
+    requests_per_user=CAPACITY_DEFAULTS["requests_per_user"],
+    peak_multiplier=CAPACITY_DEFAULTS["peak_multiplier"],
+    payload_size_kb=CAPACITY_DEFAULTS["payload_size_kb"],
+    object_size_kb=None,
+    replication_factor=CAPACITY_DEFAULTS["replication_factor"],
+    cache_hit_rate=CAPACITY_DEFAULTS["cache_hit_rate"],
+    read_percent=None,
+    ingress_overhead=CAPACITY_DEFAULTS["ingress_overhead"],
+    egress_overhead=CAPACITY_DEFAULTS["egress_overhead"],
+):
+    """Return every derived capacity metric as a dict of arrays (or scalars)."""
+    if object_size_kb is None:
+        object_size_kb = payload_size_kb
+    if read_percent is None:
+        read_percent = cache_hit_rate
+
+    dau = np.asarray(dau, dtype=np.float64)
+    requests_per_user = np.asarray(requests_per_user, dtype=np.float64)
+    payload_size_kb = np.asarray(payload_size_kb, dtype=np.float64)
+
+    total_requests = dau * requests_per_user
+    qps = total_requests / SECONDS_PER_DAY
+    read_fraction = np.asarray(read_percent, dtype=np.float64) / 100
+    miss_fraction = 1 - np.asarray(cache_hit_rate, dtype=np.float64) / 100
+    payload_mb_per_sec = qps * payload_size_kb / KB_PER_MB
+
+    return {
+        "total_requests": total_requests,
+        "qps": qps,
+        "peak_qps": qps * peak_multiplier,
+        "read_qps": qps * read_fraction,
+        "write_qps": qps * (1 - read_fraction),
+        "storage_gb": total_requests * object_size_kb * replication_factor / KB_PER_GB,
+        "ingress_mb_per_sec": payload_mb_per_sec * ingress_overhead,
+        "egress_mb_per_sec": payload_mb_per_sec * miss_fraction * egress_overhead,
+    }
+
+
+def capacity_columns(frame):
+    """Pull the capacity inputs out of a DataFrame-like mapping of columns.
+
+    Missing columns fall back to ``CAPACITY_DEFAULTS``.
+    """
+    return {
+        name: np.asarray(frame[name]) if name in frame else default
+        for name, default in CAPACITY_DEFAULTS.items()
+    }
+
+
+def estimate_capacity_frame(frame):
+    """Evaluate a pandas DataFrame of scenarios and return it with metric columns added."""
+    return frame.assign(**estimate_capacity(**capacity_columns(frame)))
@@ -0,0 +1,231 @@
+"""Problem-type catalog shared by every app version and the batch job.
+
+The built-in types live in ``problem_types.json``. :func:`load_catalog` reads,
+validates and indexes them once per process, so every rerun and batch chunk
+looks types up by name, tag or enabled toggle in O(1).
+
+Extra types (internal templates, say) come from extension directories, either
+passed to :func:`load_catalog` or listed in ``SYSTEM_DESIGN_CATALOG_PATH``
+(``os.pathsep``-separated). Each directory holds an ``index.json`` manifest::
+
+    {"Ad Server": {"file": "ad_server.json", "tags": ["adtech"], "toggles": ["Use CDN"]}}
+
+The manifest is enough to list and index a type; its full entry file is only
+read and validated the first time the type is looked up.
+"""
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+CATALOG_FILE = Path(__file__).with_name("problem_types.json")
+CATALOG_PATH_ENV = "SYSTEM_DESIGN_CATALOG_PATH"
+MANIFEST_NAME = "index.json"
+
+TOGGLES = (
+    "Use CDN",
+    "Multi-Region",
+    "Compression",
+    "Adaptive Bitrate",
+    "Lifecycle Policies",
+    "Stores PII",
+    "Region Locking",
+)
+REQUIRED_PARAMS = (
+    "Data Retention (days)",
+    "Target Uptime (%)",
+    "P95 Latency Target (ms)",
+    "Cache Hit Rate (%)",
+)
+PARAM_DEFAULTS = {
+    "Growth Rate (%/mo)": 10,
+    "Payload Size (KB)": 10,
+}
+# An entry's "defaults" are the sizing prefills v4 shows; where a param also
+# sets an input (retention, say), the param wins in design_inputs.
+SIZING_DEFAULTS = {
+    "dau": 100_000,
+    "requests_per_user": 10,
+    "object_size_kb": 10,
+}
+REQUIRED_FIELDS = ("toggles", "params", "layers", "tradeoffs", "failure_modeling")
+OPTIONAL_FIELDS = {"tags": (), "db": "", "reason": "", "defaults": {}}
+
+# Catalog toggle -> v3.1 design input it switches.
+TOGGLE_INPUTS = {
+    "Use CDN": "use_cdn",
+    "Compression": "enable_compression",
+    "Stores PII": "store_pii",
+    "Region Locking": "region_locking",
+    "Multi-Region": "disaster_recovery",
+}
+
+
+class CatalogError(ValueError):
+    """A problem-type entry or manifest is malformed."""
+
+
+def validate_entry(name, entry):
+    """Return a normalized copy of ``entry`` or raise :class:`CatalogError`."""
+    if not isinstance(entry, dict):
+        raise CatalogError(f"{name}: entry must be an object")
+    missing = [field for field in REQUIRED_FIELDS if field not in entry]
+    if missing:
+        raise CatalogError(f"{name}: missing fields {missing}")
+
+    toggles = entry["toggles"]
+    unknown = sorted(set(toggles) - set(TOGGLES))
+    if unknown:
+        raise CatalogError(f"{name}: unknown toggles {unknown}")
+    if not all(isinstance(value, bool) for value in toggles.values()):
+        raise CatalogError(f"{name}: toggle values must be true/false")
+
+    params = entry["params"]
+    missing = [param for param in REQUIRED_PARAMS if param not in params]
+    if missing:
+        raise CatalogError(f"{name}: missing params {missing}")
+    if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in params.values()):
+        raise CatalogError(f"{name}: param values must be numbers")
+    if not 0 <= params["Cache Hit Rate (%)"] <= 100:
+        raise CatalogError(f"{name}: Cache Hit Rate (%) must be between 0 and 100")
+
+    layers = entry["layers"]
+    if not layers or not all(isinstance(layer, str) for layer in layers):
+        raise CatalogError(f"{name}: layers must be a non-empty list of names")
+
+    normalized = {field: entry.get(field, default) for field, default in OPTIONAL_FIELDS.items()}
+    normalized.update(entry)
+    normalized["tags"] = tuple(normalized["tags"])
+    normalized["toggles"] = {toggle: toggles.get(toggle, False) for toggle in TOGGLES}
+    normalized["params"] = {**params, **{k: v for k, v in PARAM_DEFAULTS.items() if k not in params}}
+    normalized["defaults"] = {**SIZING_DEFAULTS, **normalized["defaults"]}
+    normalized["layers"] = list(layers)
+    return normalized
+
+
+class ProblemCatalog:
+    """Validated problem types indexed by name, tag and enabled toggle.
+
+    Entries are shared by every session in the process; treat them as read-only.
+    """
+
+    def __init__(self, entries, lazy_entries=None):
+        self._entries = {name: validate_entry(name, entry) for name, entry in entries.items()}
+        # name -> (entry file, tags, enabled toggles) for extension types not read yet
+        self._lazy = dict(lazy_entries or {})
+        overlap = sorted(set(self._entries) & set(self._lazy))
+        if overlap:
+            raise CatalogError(f"Problem types defined twice: {overlap}")
+        self._names = tuple(self._entries) + tuple(self._lazy)
+        self._by_tag = {}
+        self._by_toggle = {}
+        for name, entry in self._entries.items():
+            self._index(name, entry["tags"], [t for t, on in entry["toggles"].items() if on])
+        for name, (_, tags, toggles) in self._lazy.items():
+            self._index(name, tags, toggles)
+        self._design_inputs = {}
+        # The catalog is shared by every session and server thread; one lazy load at a time.
+        self._load_lock = threading.Lock()
+
+    def _index(self, name, tags, toggles):
+        for tag in tags:
+            self._by_tag.setdefault(tag, []).append(name)
+        for toggle in toggles:
+            if toggle not in TOGGLES:
+                raise CatalogError(f"{name}: unknown toggle {toggle!r}")
+            self._by_toggle.setdefault(toggle, []).append(name)
+
+    def names(self):
+        return self._names
+
+    def __len__(self):
+        return len(self._names)
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __contains__(self, name):
+        return name in self._entries or name in self._lazy
+
+    def get(self, name):
+        entry = self._entries.get(name)
+        if entry is None:
+            with self._load_lock:
+                entry = self._entries.get(name)
+                if entry is None:
+                    lazy = self._lazy.get(name)
+                    if lazy is None:
+                        raise KeyError(f"Unknown problem type: {name!r}")
+                    with open(lazy[0], encoding="utf-8") as handle:
+                        entry = self._entries[name] = validate_entry(name, json.load(handle))
+                    del self._lazy[name]
+        return entry
+
+    __getitem__ = get
+
+    def with_tag(self, tag):
+        return tuple(self._by_tag.get(tag, ()))
+
+    def with_toggle(self, toggle):
+        """Problem types that turn ``toggle`` on by default."""
+        return tuple(self._by_toggle.get(toggle, ()))
+
+    def tags(self):
+        return tuple(self._by_tag)
+
+    def design_inputs(self, name):
+        """The v3.1 design inputs (see ``DESIGN_DEFAULTS``) a problem type implies."""
+        inputs = self._design_inputs.get(name)
+        if inputs is None:
+            entry = self.get(name)
+            params = entry["params"]
+            inputs = {
+                **entry["defaults"],
+                "payload_size_kb": params["Payload Size (KB)"],
+                "cache_hit_rate": params["Cache Hit Rate (%)"],
+                "retention_days": params["Data Retention (days)"],
+                "sla": f"{params['Target Uptime (%)']}%",
+                "p95_target_ms": params["P95 Latency Target (ms)"],
+                **{design: entry["toggles"][toggle] for toggle, design in TOGGLE_INPUTS.items()},
+            }
+            if "strong-consistency" in entry["tags"]:
+                inputs["consistency"] = "Strong"
+            self._design_inputs[name] = inputs
+        return inputs
+
+
+def read_manifest(directory):
+    """Lazy entries from an extension directory's ``index.json``."""
+    directory = Path(directory)
+    with open(directory / MANIFEST_NAME, encoding="utf-8") as handle:
+        manifest = json.load(handle)
+    lazy = {}
+    for name, meta in manifest.items():
+        if "file" not in meta:
+            raise CatalogError(f"{directory / MANIFEST_NAME}: {name} has no 'file'")
+        lazy[name] = (directory / meta["file"], tuple(meta.get("tags", ())), tuple(meta.get("toggles", ())))
+    return lazy
+
+
+def load_catalog(extension_dirs=None):
+    """The process-wide catalog: built-in types plus any extension directories.
+
+    ``extension_dirs`` is any iterable of paths; each distinct set is loaded once.
+    """
+    if extension_dirs is None:
+        extension_dirs = tuple(d for d in os.environ.get(CATALOG_PATH_ENV, "").split(os.pathsep) if d)
+    return _load_catalog(tuple(str(directory) for directory in extension_dirs))
+
+
+@lru_cache(maxsize=None)
+def _load_catalog(extension_dirs):
+    with open(CATALOG_FILE, encoding="utf-8") as handle:
+        entries = json.load(handle)
+    lazy = {}
+    for directory in extension_dirs:
+        for name, meta in read_manifest(directory).items():
+            if name in entries or name in lazy:
+                raise CatalogError(f"{directory}: problem type {name!r} is already defined")
+            lazy[name] = meta
+    return ProblemCatalog(entries, lazy)
@@ -0,0 +1,33 @@
+"""Prices and modelling assumptions shared by the optimizer and availability engine."""
+from .capacity import SECONDS_PER_DAY
+
+SECONDS_PER_MONTH = SECONDS_PER_DAY * 365.25 / 12
+
+# Monthly list prices in USD; override any of them through ``rates``.
+COST_RATES = {
+    "instance_month": 70.0,
+    "storage_gb_month": 0.10,
+    "cache_gb_month": 6.0,
+    "egress_gb": 0.09,
+    "cdn_egress_gb": 0.03,
+    "accelerator_month": 1_800.0,      # one 80 GB data-centre GPU
+    "embedding_1k_tokens": 0.0001,
+}
+
+MODEL_ASSUMPTIONS = {
+    "node_availability": 0.999,          # one database replica
+    "stateless_availability": 0.99995,   # the redundant stateless tiers together
+    "region_availability": 0.9995,
+    "cdn_offload": 0.8,                  # share of egress bytes the CDN serves
+    "compression_ratio": 0.6,
+    "compression_cpu": 1.15,             # app-tier service time multiplier
+    "db_write_factor": {"Strong": 1.5, "Quorum": 1.25, "Eventual": 1.0},
+    "cross_region_rtt_ms": 40.0,         # paid by Strong writes with a hot standby
+    "standby_fraction": 0.5,             # standby compute and cache as a share of primary
+    "geo_shard_overhead": 0.2,           # extra storage for geo-partitioned copies
+}
+
+
+def parse_sla(sla):
+    """``"99.99%"`` or ``99.99`` -> ``0.9999``."""
+    return float(str(sla).rstrip("%")) / 100
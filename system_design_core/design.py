@@ -0,0 +1,260 @@
+"""Architecture layers, trade-offs and export payloads for the v3.1 design flow."""
+import csv
+import io
+
+import numpy as np
+
+from .availability import assess_availability
+from .cache import memoize
+from .capacity import CAPACITY_DEFAULTS, CAPACITY_METRICS, estimate_capacity
+from .graph import ComputationGraph
+from .montecarlo import DEFAULT_SAMPLES, simulate_capacity
+from .queueing import size_layers
+from .traffic import TRAFFIC_DEFAULTS, simulate_traffic
+
+BASE_LAYERS = ("API Gateway", "App Server", "Cache", "Primary DB", "Object Store", "Async Queue", "Observability")
+
+# Widget name -> default, mirroring the v3.1 sidebar.
+DESIGN_DEFAULTS = {
+    **{name: default for name, default in CAPACITY_DEFAULTS.items() if name != "read_percent"},
+    "object_size_kb": 10,
+    "session_length_min": TRAFFIC_DEFAULTS["session_length_min"],
+    "think_time_s": TRAFFIC_DEFAULTS["think_time_s"],
+    "retention_days": 180,
+    "sla": "99.99%",
+    "consistency": "Strong",
+    "rpo": 5,
+    "rto": 10,
+    "p95_target_ms": 300,
+    "zone_failure_correlation": 0.0,
+    "use_cdn": True,
+    "enable_compression": True,
+    "store_pii": False,
+    "region_locking": False,
+    "disaster_recovery": True,
+}
+
+ARCHITECTURE_INPUTS = ("use_cdn", "region_locking", "disaster_recovery", "store_pii")
+TRADEOFF_INPUTS = ("consistency", "enable_compression", "store_pii", "region_locking", "disaster_recovery")
+CAPACITY_INPUTS = tuple(name for name in CAPACITY_DEFAULTS if name in DESIGN_DEFAULTS)
+SUMMARY_INPUTS = (
+    "dau",
+    "requests_per_user",
+    "payload_size_kb",
+    "object_size_kb",
+    "replication_factor",
+    "retention_days",
+    "sla",
+    "consistency",
+)
+
+
+def architecture_layers(use_cdn=False, region_locking=False, disaster_recovery=False, store_pii=False):
+    layers = list(BASE_LAYERS)
+    if use_cdn:
+        layers.insert(0, "CDN")
+    if region_locking:
+        layers.append("Geo-Sharded DB")
+    if disaster_recovery:
+        layers.append("Hot Standby Cluster")
+    if store_pii:
+        layers.append("Vault/KMS")
+    return layers
+
+
+def design_tradeoffs(
+    consistency="Strong",
+    enable_compression=False,
+    store_pii=False,
+    region_locking=False,
+    disaster_recovery=False,
+):
+    tradeoffs = []
+    if consistency == "Strong":
+        tradeoffs.append("Lower availability under partition")
+    if enable_compression:
+        tradeoffs.append("Saves bandwidth, increases CPU usage")
+    if store_pii:
+        tradeoffs.append("Must implement strict access controls and audit logging")
+    if region_locking:
+        tradeoffs.append("Increased complexity due to geo-partitioning")
+    if disaster_recovery:
+        tradeoffs.append("Higher infra cost but faster recovery")
+    return tradeoffs
+
+
+def _flag_codes(*flags):
+    """Pack boolean arrays into one integer code per row, first flag lowest bit."""
+    codes = 0
+    for bit, flag in enumerate(flags):
+        codes = codes | (np.asarray(flag, dtype=bool).astype(np.int64) << bit)
+    return np.asarray(codes)
+
+
+# Every toggle combination is precomputed once, so a column of scenarios is a table lookup.
+_ARCHITECTURE_TABLE = np.array(
+    [
+        ", ".join(architecture_layers(*(bool(code >> bit & 1) for bit in range(len(ARCHITECTURE_INPUTS)))))
+        for code in range(2 ** len(ARCHITECTURE_INPUTS))
+    ],
+    dtype=object,
+)
+_TRADEOFF_TABLE = np.array(
+    [
+        "; ".join(design_tradeoffs(
+            "Strong" if code & 1 else "Eventual",
+            *(bool(code >> bit & 1) for bit in range(1, len(TRADEOFF_INPUTS))),
+        ))
+        for code in range(2 ** len(TRADEOFF_INPUTS))
+    ],
+    dtype=object,
+)
+
+
+def architecture_column(use_cdn, region_locking, disaster_recovery, store_pii):
+    """Joined architecture layers for arrays of toggles."""
+    return _ARCHITECTURE_TABLE[_flag_codes(use_cdn, region_locking, disaster_recovery, store_pii)]
+
+
+def tradeoffs_column(consistency, enable_compression, store_pii, region_locking, disaster_recovery):
+    """Joined trade-offs for arrays of consistency models and toggles."""
+    strong = np.asarray(consistency, dtype=object) == "Strong"
+    return _TRADEOFF_TABLE[_flag_codes(strong, enable_compression, store_pii, region_locking, disaster_recovery)]
+
+
+def evaluate_inputs(inputs):
+    """Capacity metrics, architecture and trade-offs columns for arrays of resolved inputs.
+
+    ``inputs`` holds every ``DESIGN_DEFAULTS`` name, as from ``records_inputs``.
+    """
+    capacity = estimate_capacity(**{name: inputs[name] for name in CAPACITY_INPUTS})
+    rows = len(inputs["dau"])
+    outputs = {name: np.broadcast_to(capacity[name], (rows,)) for name in CAPACITY_METRICS}
+    outputs["architecture"] = architecture_column(*(inputs[name] for name in ARCHITECTURE_INPUTS))
+    outputs["tradeoffs"] = tradeoffs_column(*(inputs[name] for name in TRADEOFF_INPUTS))
+    return outputs
+
+
+def summary_row(
+    capacity,
+    arch_layers,
+    tradeoffs,
+    dau,
+    requests_per_user,
+    payload_size_kb,
+    object_size_kb,
+    replication_factor,
+    retention_days,
+    sla,
+    consistency,
+):
+    """The "Export Design Summary" row, keyed by its CSV column names."""
+    return {
+        "DAU": dau,
+        "Requests/User/Day": requests_per_user,
+        "Payload Size (KB)": payload_size_kb,
+        "Object Size (KB)": object_size_kb,
+        "Replication": replication_factor,
+        "Retention (days)": retention_days,
+        "Peak QPS": capacity["peak_qps"],
+        "Storage Estimate (GB)": capacity["storage_gb"],
+        "Egress MB/sec": capacity["egress_mb_per_sec"],
+        "SLA": sla,
+        "Consistency": consistency,
+        "Architecture": ", ".join(arch_layers),
+        "Trade-offs": "; ".join(tradeoffs),
+    }
+
+
+def summary_csv(rows):
+    """Encode summary rows as UTF-8 CSV bytes without building a DataFrame."""
+    rows = list(rows)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(rows[0]), lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+@memoize
+def monte_carlo_sketches(uncertainty, monte_carlo_samples, **capacity_inputs):
+    """Quantile sketches per metric, or None when no input is uncertain."""
+    if not uncertainty:
+        return None
+    return simulate_capacity({**capacity_inputs, **uncertainty}, samples=monte_carlo_samples)
+
+
+@memoize
+def simulated_traffic(traffic_model, dau, requests_per_user, session_length_min, think_time_s):
+    """One simulated day of traffic, or None when simulation mode is off."""
+    if traffic_model is None:
+        return None
+    return simulate_traffic(dau, requests_per_user, session_length_min, think_time_s, **traffic_model)
+
+
+@memoize
+def fleet_sizing(capacity, traffic, arch_layers, p95_target_ms, cache_hit_rate):
+    """Per-layer instance counts that meet the P95 latency target at peak QPS.
+
+    The simulated peak second replaces the flat peak multiplier when there is one.
+    """
+    peak_qps = capacity["peak_qps"] if traffic is None else traffic["peak_qps"]
+    return size_layers(peak_qps, arch_layers, p95_target_ms, cache_hit_rate)
+
+
+@memoize
+def availability_assessment(fleet, arch_layers, sla, rpo, rto, zone_failure_correlation):
+    """Availability of the sized fleet (N+1 over two zones) and the cheapest redundancy meeting the SLA.
+
+    None when the fleet sizing is infeasible: there is no fleet to assess.
+    """
+    if not fleet["feasible"]:
+        return None
+    layers = list(fleet["layers"])
+    required = [max(int(fleet["layers"][layer]["instances"]), 1) for layer in layers]
+    region_mode = "active-passive" if "Hot Standby Cluster" in arch_layers else "single"
+    return assess_availability(
+        layers, required, sla, rto, rpo, region_mode, correlation=zone_failure_correlation
+    )
+
+
+@memoize
+def summary_csv_bytes(summary):
+    """The one-row export CSV, shared by every session showing the same design."""
+    return summary_csv([summary])
+
+
+def build_design_graph(**inputs):
+    """Wire the v3.1 outputs as memoized nodes over the sidebar inputs.
+
+    The graph is per session; the heavier nodes also go through the
+    process-wide result cache, so other sessions with the same inputs reuse them.
+
+    ``uncertainty`` maps capacity inputs to Monte Carlo Distributions;
+    ``traffic_model`` holds the :func:`simulate_traffic` shape parameters
+    (diurnal swing, burstiness, ...) and turns on the traffic simulation.
+    """
+    graph = ComputationGraph()
+    for name, default in DESIGN_DEFAULTS.items():
+        graph.add_input(name, inputs.get(name, default))
+    graph.add_input("uncertainty", inputs.get("uncertainty"))
+    graph.add_input("monte_carlo_samples", inputs.get("monte_carlo_samples", DEFAULT_SAMPLES))
+    graph.add_input("traffic_model", inputs.get("traffic_model"))
+    graph.add_node("capacity", estimate_capacity, CAPACITY_INPUTS)
+    graph.add_node("monte_carlo", monte_carlo_sketches, ("uncertainty", "monte_carlo_samples") + CAPACITY_INPUTS)
+    graph.add_node("arch_layers", architecture_layers, ARCHITECTURE_INPUTS)
+    graph.add_node("tradeoffs", design_tradeoffs, TRADEOFF_INPUTS)
+    graph.add_node(
+        "traffic",
+        simulated_traffic,
+        ("traffic_model", "dau", "requests_per_user", "session_length_min", "think_time_s"),
+    )
+    graph.add_node("fleet", fleet_sizing, ("capacity", "traffic", "arch_layers", "p95_target_ms", "cache_hit_rate"))
+    graph.add_node(
+        "availability",
+        availability_assessment,
+        ("fleet", "arch_layers", "sla", "rpo", "rto", "zone_failure_correlation"),
+    )
+    graph.add_node("summary", summary_row, ("capacity", "arch_layers", "tradeoffs") + SUMMARY_INPUTS)
+    graph.add_node("summary_csv", summary_csv_bytes, ("summary",))
+    return graph
@@ -0,0 +1,211 @@
+"""Feed fan-out: push (fan-out-on-write), pull (fan-out-on-read) and hybrid.
+
+The follow graph enters only through its follower-count histogram: a
+synthetic power law (one draw per user, so 10^7 users is one vectorized
+call) or an uploaded histogram. A hybrid with celebrity threshold ``T``
+pushes posts from authors with fewer than ``T`` followers into each
+follower's cached timeline and pulls the rest at read time. Push is
+``T = inf`` and pull is ``T = 0``. Every metric is a prefix sum over the
+degree-sorted histogram, so a sweep over thousands of thresholds costs one
+``searchsorted``.
+
+Posts and feed reads come from the active users, and an author posts and is
+followed independently of its degree. A post is pushed to every follower,
+active or not. Each active user's cached timeline holds up to
+``timeline_length`` entries from the last ``timeline_days``. Each pulled
+author keeps a recent-posts list of the same size, and a pull read fetches
+one list per celebrity followed.
+"""
+import io
+
+import numpy as np
+
+from .capacity import BYTES_PER_GB, SECONDS_PER_DAY
+from .costs import COST_RATES
+
+FEED_DEFAULTS = {
+    "users": 10_000_000,
+    "alpha": 2.1,                   # power-law exponent of follower counts
+    "min_followers": 10,
+    "max_followers": None,          # capped at users - 1
+    "posts_per_user": 0.5,          # per active user per day
+    "reads_per_user": 20,           # feed loads per active user per day
+    "timeline_length": 800,
+    "timeline_days": 7,
+    "entry_bytes": 16,              # post id + author id
+    "peak_multiplier": 2.0,
+    "writes_per_instance": 20_000,  # timeline inserts/s per fan-out worker
+    "fanout_deadline_s": 30,        # time to deliver the largest pushed post
+    "fetches_per_instance": 20_000, # timeline reads/s per feed server
+}
+MAX_SWEEP_POINTS = 1024
+
+_DENSE_DEGREES = 1 << 16
+
+
+def power_law_followers(
+    users=FEED_DEFAULTS["users"],
+    alpha=FEED_DEFAULTS["alpha"],
+    min_followers=FEED_DEFAULTS["min_followers"],
+    max_followers=FEED_DEFAULTS["max_followers"],
+    seed=0,
+):
+    """Follower count of each of ``users`` users, with ``P(f >= x) ~ x ** (1 - alpha)``."""
+    if alpha <= 1:
+        raise ValueError("alpha must be above 1")
+    cap = users - 1 if max_followers is None else min(max_followers, users - 1)
+    draws = np.random.default_rng(seed).random(int(users))
+    followers = np.floor(min_followers * (1 - draws) ** (-1 / (alpha - 1)))
+    return np.minimum(followers, cap).astype(np.int64)
+
+
+def degree_histogram(followers):
+    """Sorted distinct follower counts and the number of users with each."""
+    followers = np.asarray(followers, dtype=np.int64)
+    # Nearly every user is in the dense head, so only the tail needs sorting.
+    head = np.bincount(followers[followers < _DENSE_DEGREES], minlength=_DENSE_DEGREES)
+    tail_degrees, tail_counts = np.unique(followers[followers >= _DENSE_DEGREES], return_counts=True)
+    present = np.flatnonzero(head)
+    return np.r_[present, tail_degrees], np.r_[head[present], tail_counts]
+
+
+def power_law_histogram(
+    users=FEED_DEFAULTS["users"],
+    alpha=FEED_DEFAULTS["alpha"],
+    min_followers=FEED_DEFAULTS["min_followers"],
+    max_followers=FEED_DEFAULTS["max_followers"],
+    seed=0,
+):
+    """:func:`degree_histogram` of a :func:`power_law_followers` draw (small enough to cache)."""
+    return degree_histogram(power_law_followers(users, alpha, min_followers, max_followers, seed))
+
+
+def load_degree_histogram(source):
+    """Read ``followers,users`` rows, or one follower count per user, from CSV/text.
+
+    ``source`` is a path, a file object or the file's bytes.
+    """
+    import pandas as pd
+
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    frame = pd.read_csv(source, header=None)
+    if not pd.api.types.is_numeric_dtype(frame.iloc[:, 0]):
+        frame = frame.iloc[1:].apply(pd.to_numeric)
+    values = frame.to_numpy(dtype=np.float64)
+    if np.any(values < 0):
+        raise ValueError("Follower counts and user counts must be non-negative")
+    if values.shape[1] == 1:
+        return degree_histogram(values[:, 0])
+    degrees, inverse = np.unique(values[:, 0].astype(np.int64), return_inverse=True)
+    return degrees, np.bincount(inverse.ravel(), weights=values[:, 1]).astype(np.int64)
+
+
+def sweep_thresholds(degrees, points=MAX_SWEEP_POINTS):
+    """Candidate celebrity thresholds: the distinct degrees (log-spaced when many) and ``inf``."""
+    degrees = np.asarray(degrees)
+    candidates = degrees[degrees > 0]
+    if len(candidates) > points:
+        targets = np.geomspace(candidates[0], candidates[-1], points)
+        candidates = np.unique(candidates[np.minimum(np.searchsorted(candidates, targets), len(candidates) - 1)])
+    return np.r_[0.0, candidates, np.inf]
+
+
+def fanout_costs(
+    degrees,
+    counts,
+    thresholds,
+    active_users=None,
+    posts_per_user=FEED_DEFAULTS["posts_per_user"],
+    reads_per_user=FEED_DEFAULTS["reads_per_user"],
+    timeline_length=FEED_DEFAULTS["timeline_length"],
+    timeline_days=FEED_DEFAULTS["timeline_days"],
+    entry_bytes=FEED_DEFAULTS["entry_bytes"],
+    peak_multiplier=FEED_DEFAULTS["peak_multiplier"],
+    writes_per_instance=FEED_DEFAULTS["writes_per_instance"],
+    fanout_deadline_s=FEED_DEFAULTS["fanout_deadline_s"],
+    fetches_per_instance=FEED_DEFAULTS["fetches_per_instance"],
+    rates=None,
+):
+    """Write amplification, timeline memory, read fan-in and monthly cost per threshold.
+
+    Authors with at least ``thresholds`` followers are pulled. ``active_users``
+    defaults to every user in the histogram. The fan-out pool covers the peak
+    insert rate. It must also deliver the biggest pushed post within
+    ``fanout_deadline_s``, and that is the cost a celebrity threshold removes.
+    """
+    rates = {**COST_RATES, **(rates or {})}
+    degrees = np.asarray(degrees, dtype=np.float64)
+    counts = np.asarray(counts, dtype=np.float64)
+    users = counts.sum()
+    active = users if active_users is None else float(active_users)
+    user_edges = np.r_[0.0, np.cumsum(counts)]
+    edge_edges = np.r_[0.0, np.cumsum(degrees * counts)]
+
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    pushed_below = np.searchsorted(degrees, thresholds, side="left")
+    pushed_edges = edge_edges[pushed_below]
+    pulled_edges = edge_edges[-1] - pushed_edges
+    # Authors nobody follows need no recent-posts list.
+    celebrities = users - user_edges[np.searchsorted(degrees, np.maximum(thresholds, 1), side="left")]
+
+    posts_per_s = active * posts_per_user / SECONDS_PER_DAY
+    reads_per_s = active * reads_per_user / SECONDS_PER_DAY
+    write_amplification = pushed_edges / users
+    timeline_writes = posts_per_s * write_amplification
+    # A read fetches the user's own timeline when anything is pushed, plus one list per celebrity followed.
+    fetches_per_read = (pushed_edges > 0) + pulled_edges / users
+    read_fetches = reads_per_s * fetches_per_read
+
+    inbound_per_day = active * posts_per_user * write_amplification / users
+    timeline_entries = active * np.minimum(timeline_length, inbound_per_day * timeline_days)
+    author_entries = celebrities * min(timeline_length, posts_per_user * timeline_days)
+    memory_gb = (timeline_entries + author_entries) * entry_bytes / BYTES_PER_GB
+
+    max_push_fanout = np.where(pushed_below > 0, degrees[np.maximum(pushed_below - 1, 0)], 0.0)
+    fanout_rate = np.maximum(timeline_writes * peak_multiplier, max_push_fanout / fanout_deadline_s)
+    fanout_workers = np.ceil(fanout_rate / writes_per_instance)
+    feed_servers = np.ceil(read_fetches * peak_multiplier / fetches_per_instance)
+    cost = (fanout_workers + feed_servers) * rates["instance_month"] + memory_gb * rates["cache_gb_month"]
+    return {
+        "threshold": thresholds,
+        "celebrities": celebrities,
+        "write_amplification": write_amplification,
+        "timeline_writes_per_s": timeline_writes,
+        "read_fetches_per_s": read_fetches,
+        "fetches_per_read": fetches_per_read,
+        "timeline_memory_gb": memory_gb,
+        "fanout_workers": fanout_workers,
+        "feed_servers": feed_servers,
+        "max_push_fanout": max_push_fanout,
+        "monthly_cost": cost,
+    }
+
+
+def feed_model(degrees, counts=None, thresholds=None, **options):
+    """Push, pull and the cheapest hybrid, plus the whole threshold sweep.
+
+    ``degrees`` is either one follower count per user (``counts=None``) or
+    the distinct counts of a histogram. ``options`` are passed to
+    :func:`fanout_costs`. Strategies are dicts of scalars. The sweep holds
+    arrays over ``thresholds``, which defaults to :func:`sweep_thresholds`.
+    """
+    if counts is None:
+        degrees, counts = degree_histogram(degrees)
+    degrees = np.asarray(degrees)
+    thresholds = sweep_thresholds(degrees) if thresholds is None else np.asarray(thresholds, dtype=np.float64)
+    sweep = fanout_costs(degrees, counts, np.r_[np.inf, 0.0, thresholds], **options)
+    best = 2 + int(np.argmin(sweep["monthly_cost"][2:]))
+    strategies = {
+        name: {metric: float(values[i]) for metric, values in sweep.items()}
+        for name, i in (("push", 0), ("pull", 1), ("hybrid", best))
+    }
+    counts = np.asarray(counts, dtype=np.float64)
+    return {
+        "users": float(counts.sum()),
+        "mean_followers": float((degrees * counts).sum() / counts.sum()),
+        "max_followers": float(degrees[-1]),
+        "strategies": strategies,
+        "best_threshold": strategies["hybrid"]["threshold"],
+        "sweep": {metric: values[2:] for metric, values in sweep.items()},
+    }
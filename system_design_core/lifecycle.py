@@ -0,0 +1,160 @@
+"""Tiered storage lifecycle: hot -> warm -> cold -> delete, with costs.
+
+Every day's ingest is a cohort that moves down the tiers as it ages: it
+lands hot, moves to warm at ``warm_after_days``, to cold at
+``cold_after_days`` and is deleted at ``delete_after_days``. The bytes
+resident in a tier on day ``t`` are therefore the ingest of a trailing
+window of days, and the bytes crossing a boundary are one day's cohort.
+Both come from a single cumulative sum over the daily ingest, so the cost
+is linear in the horizon whatever the ages. Ages and ingest may be arrays
+of policies/scenarios; daily series get a trailing day axis.
+"""
+import re
+
+import numpy as np
+
+from .costs import COST_RATES
+from .projection import DAYS_PER_MONTH, DAYS_PER_YEAR, growth_curve, horizon_days, month_starts
+
+TIER_NAMES = ("hot", "warm", "cold")
+
+# Per tier: price per stored GB-month, copies kept (replicas or erasure-coding
+# overhead) and price per logical GB moved into the tier.
+STORAGE_TIERS = {
+    "hot": {"price_gb_month": COST_RATES["storage_gb_month"], "replication": 3.0, "transition_gb": 0.0},
+    "warm": {"price_gb_month": 0.0125, "replication": 2.0, "transition_gb": 0.01},
+    "cold": {"price_gb_month": 0.004, "replication": 1.4, "transition_gb": 0.02},
+}
+
+LIFECYCLE_DEFAULTS = {
+    "warm_after_days": 30,
+    "cold_after_days": 90,
+    "delete_after_days": 365,
+}
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)\s*(day|week|month|year|d\b|w\b|m\b|y\b)", re.IGNORECASE)
+_UNIT_DAYS = {"d": 1, "w": 7, "m": DAYS_PER_MONTH, "y": DAYS_PER_YEAR}
+
+
+def parse_days(text):
+    """First duration in free text (``"default 90 days"``, ``"1 year"``) in days, or None."""
+    match = _DURATION.search(str(text))
+    if match is None:
+        return None
+    return int(round(float(match.group(1)) * _UNIT_DAYS[match.group(2)[0].lower()]))
+
+
+def tier_bounds(warm_after_days, cold_after_days, delete_after_days=None):
+    """``{tier: (first_age, end_age)}`` in days; ``delete_after_days=None`` keeps data forever.
+
+    A tier whose bounds coincide is skipped, so ``warm == cold`` moves data
+    straight from hot to cold. Ages out of order raise ``ValueError``.
+    """
+    warm = np.asarray(warm_after_days, dtype=np.float64)
+    cold = np.asarray(cold_after_days, dtype=np.float64)
+    delete = np.asarray(np.inf if delete_after_days is None else delete_after_days, dtype=np.float64)
+    if np.any(warm < 0) or np.any(cold < warm) or np.any(delete < cold):
+        raise ValueError("Lifecycle ages must satisfy 0 <= warm <= cold <= delete")
+    return {"hot": (np.zeros_like(warm), warm), "warm": (warm, cold), "cold": (cold, delete)}
+
+
+def _window(cumulative, first_age, end_age):
+    """Sum of each day's ingest aged ``[first_age, end_age)`` days, for every day.
+
+    ``cumulative`` has a leading zero: ``cumulative[..., k]`` is the ingest of
+    days ``0..k-1``. Infinite ``end_age`` reaches back to day 0.
+    """
+    days = cumulative.shape[-1] - 1
+    today = np.arange(days)
+    first = np.asarray(first_age, dtype=np.float64)[..., None]
+    end = np.asarray(end_age, dtype=np.float64)[..., None]
+    upper = np.clip(today + 1 - first, 0, days).astype(np.int64)
+    lower = np.clip(today + 1 - np.minimum(end, days + 1), 0, days).astype(np.int64)
+    shape = np.broadcast_shapes(cumulative.shape[:-1] + (days,), upper.shape, lower.shape)
+    cumulative = np.broadcast_to(cumulative, shape[:-1] + (days + 1,))
+    return (
+        np.take_along_axis(cumulative, np.broadcast_to(upper, shape), axis=-1)
+        - np.take_along_axis(cumulative, np.broadcast_to(lower, shape), axis=-1)
+    )
+
+
+def simulate_lifecycle(
+    daily_ingest_gb,
+    warm_after_days=LIFECYCLE_DEFAULTS["warm_after_days"],
+    cold_after_days=LIFECYCLE_DEFAULTS["cold_after_days"],
+    delete_after_days=LIFECYCLE_DEFAULTS["delete_after_days"],
+    monthly_growth_pct=0.0,
+    horizon_years=2,
+    tiers=None,
+):
+    """Daily and monthly bytes, transitions and cost per tier over the horizon.
+
+    ``daily_ingest_gb`` is the logical (unreplicated) ingest on day 0; it
+    compounds at ``monthly_growth_pct``. ``tiers`` overrides entries of
+    ``STORAGE_TIERS``, e.g. ``{"hot": {"replication": 2}}``. Returns daily
+    series, per-month reductions (end-of-month bytes, summed costs and
+    transitions) and the steady state at the day-0 ingest rate, which is
+    infinite for the last tier when nothing is deleted.
+    """
+    tiers = {name: {**STORAGE_TIERS[name], **((tiers or {}).get(name, {}))} for name in TIER_NAMES}
+    bounds = tier_bounds(warm_after_days, cold_after_days, delete_after_days)
+    days = horizon_days(horizon_years)
+    ingest = np.asarray(daily_ingest_gb, dtype=np.float64)[..., None] * growth_curve(monthly_growth_pct, days)
+    cumulative = np.concatenate([np.zeros(ingest.shape[:-1] + (1,)), np.cumsum(ingest, axis=-1)], axis=-1)
+
+    resident, stored, moved_in, storage_cost, transition_cost = {}, {}, {}, {}, {}
+    for name in TIER_NAMES:
+        first, end = bounds[name]
+        tier = tiers[name]
+        resident[name] = _window(cumulative, first, end)
+        stored[name] = resident[name] * tier["replication"]
+        # The cohort reaching ``first`` moves in, unless it is new ingest or the tier is empty.
+        moves = (first > 0) & (end > first)
+        moved_in[name] = np.where(np.asarray(moves)[..., None], _window(cumulative, first, first + 1), 0.0)
+        storage_cost[name] = stored[name] * tier["price_gb_month"] / DAYS_PER_MONTH
+        transition_cost[name] = moved_in[name] * tier["transition_gb"]
+    _, delete_age = bounds["cold"]
+    deleted = _window(cumulative, delete_age, delete_age + 1)
+
+    starts = month_starts(days)
+    ends = np.append(starts[1:], days) - 1
+    monthly_total = sum(np.add.reduceat(storage_cost[n] + transition_cost[n], starts, axis=-1) for n in TIER_NAMES)
+    monthly = {
+        "month": np.arange(1, len(starts) + 1),
+        "stored_gb": {name: stored[name][..., ends] for name in TIER_NAMES},
+        "transition_gb": {name: np.add.reduceat(moved_in[name], starts, axis=-1) for name in TIER_NAMES},
+        "deleted_gb": np.add.reduceat(deleted, starts, axis=-1),
+        "storage_cost": {name: np.add.reduceat(storage_cost[name], starts, axis=-1) for name in TIER_NAMES},
+        "transition_cost": sum(np.add.reduceat(transition_cost[n], starts, axis=-1) for n in TIER_NAMES),
+        "total_cost": monthly_total,
+    }
+    return {
+        "ingest_gb": ingest,
+        "resident_gb": resident,
+        "stored_gb": stored,
+        "transition_gb": moved_in,
+        "deleted_gb": deleted,
+        "daily_cost": sum(storage_cost[n] + transition_cost[n] for n in TIER_NAMES),
+        "monthly": monthly,
+        "steady_state": steady_state(daily_ingest_gb, bounds, tiers),
+    }
+
+
+def steady_state(daily_ingest_gb, bounds, tiers):
+    """Resident and stored GB per tier and monthly cost once every tier has filled."""
+    ingest = np.asarray(daily_ingest_gb, dtype=np.float64)
+    result = {"resident_gb": {}, "stored_gb": {}, "monthly_cost": 0.0}
+    for name in TIER_NAMES:
+        first, end = bounds[name]
+        tier = tiers[name]
+        width = end - first
+        resident = np.where((width > 0) & (ingest > 0), ingest * width, 0.0)
+        moved_gb_month = np.where((first > 0) & (width > 0), ingest * DAYS_PER_MONTH, 0.0)
+        result["resident_gb"][name] = resident
+        result["stored_gb"][name] = resident * tier["replication"]
+        result["monthly_cost"] = (
+            result["monthly_cost"]
+            + resident * tier["replication"] * tier["price_gb_month"]
+            + moved_gb_month * tier["transition_gb"]
+        )
+    return result
@@ -0,0 +1,195 @@
+"""LLM serving capacity: tokens, KV cache, replicas for a P95 TTFT, retrieval memory.
+
+A replica is ``accelerators_per_replica`` accelerators holding one copy of
+the weights. Whatever memory is left holds the KV cache of up to
+``batch_size`` sequences decoding together. A request holds one batch slot
+for its prefill and its decode. The batch slots of the whole fleet form an
+M/M/c queue, and the fleet is the smallest one whose P95 time to first token
+(queueing delay plus prefill) meets the target. Prefill is assumed chunked
+into the decode steps, so it does not stall the batch. A decode step slows
+by ``batch_step_overhead`` for each extra sequence in the batch.
+
+Each request also embeds ``embedding_tokens`` of query text for retrieval,
+except when the embedding cache hits. The corpus is chunked into vectors
+held in an HNSW index (``hnsw_links`` neighbours per vector).
+
+Every input may be a scalar or an array of scenarios, so a whole sweep is
+sized in one call. :func:`llm_serving_frame` takes a DataFrame of scenarios.
+"""
+import numpy as np
+
+from .capacity import BYTES_PER_GB, SECONDS_PER_DAY
+from .costs import COST_RATES
+from .projection import DAYS_PER_MONTH
+from .queueing import DEFAULT_QUANTILE, min_servers_for_wait, on_unique
+
+LLM_DEFAULTS = {
+    "dau": 500_000,
+    "requests_per_user": 20,
+    "peak_multiplier": 2.0,
+    "prompt_tokens": 1_500,          # system prompt, history and retrieved context
+    "completion_tokens": 400,
+    "model_params_b": 70,
+    "layers": 80,
+    "kv_dim": 1_024,                 # KV heads x head dimension (grouped-query attention)
+    "bytes_per_param": 2,            # bf16 weights
+    "kv_bytes": 2,                   # bf16 KV cache
+    "accelerator_memory_gb": 80,
+    "accelerators_per_replica": None,  # smallest power of two that fits the weights
+    "memory_utilization": 0.9,
+    "batch_size": 32,                # max sequences decoding together per replica
+    "prefill_tokens_per_s": 10_000,  # per replica
+    "decode_step_ms": 30,            # one decode step at batch size 1
+    "batch_step_overhead": 0.015,    # extra step time per additional sequence
+    "p95_ttft_ms": 1_000,
+    "embedding_tokens": 200,         # query text embedded per request
+    "embedding_hit_rate": 0.5,
+    "corpus_docs": 1_000_000,
+    "chunks_per_doc": 20,
+    "embedding_dim": 1_024,
+    "vector_bytes": 4,               # float32; 1 for int8 quantization
+    "hnsw_links": 32,
+}
+# Architecture of common open-weight sizes; pass one with ``**MODEL_PRESETS[name]``.
+MODEL_PRESETS = {
+    "8B": {"model_params_b": 8, "layers": 32, "kv_dim": 1_024},
+    "70B": {"model_params_b": 70, "layers": 80, "kv_dim": 1_024},
+    "405B": {"model_params_b": 405, "layers": 126, "kv_dim": 1_024},
+}
+_WEIGHT_SHARE = 0.8  # of accelerator memory, when choosing the replica size
+
+
+def kv_cache_gb_per_token(layers=LLM_DEFAULTS["layers"], kv_dim=LLM_DEFAULTS["kv_dim"], kv_bytes=LLM_DEFAULTS["kv_bytes"]):
+    """Keys and values for one token across every layer, in GB."""
+    return 2 * np.asarray(layers, dtype=np.float64) * np.asarray(kv_dim) * np.asarray(kv_bytes) / BYTES_PER_GB
+
+
+def replica_size(weights_gb, accelerator_memory_gb=LLM_DEFAULTS["accelerator_memory_gb"]):
+    """Smallest power-of-two accelerator count whose memory fits the weights with room for KV cache."""
+    needed = np.asarray(weights_gb, dtype=np.float64) / (np.asarray(accelerator_memory_gb) * _WEIGHT_SHARE)
+    return 2 ** np.ceil(np.log2(np.maximum(needed, 1)))
+
+
+def llm_serving(
+    dau=LLM_DEFAULTS["dau"],
+    requests_per_user=LLM_DEFAULTS["requests_per_user"],
+    peak_multiplier=LLM_DEFAULTS["peak_multiplier"],
+    prompt_tokens=LLM_DEFAULTS["prompt_tokens"],
+    completion_tokens=LLM_DEFAULTS["completion_tokens"],
+    model_params_b=LLM_DEFAULTS["model_params_b"],
+    layers=LLM_DEFAULTS["layers"],
+    kv_dim=LLM_DEFAULTS["kv_dim"],
+    bytes_per_param=LLM_DEFAULTS["bytes_per_param"],
+    kv_bytes=LLM_DEFAULTS["kv_bytes"],
+    accelerator_memory_gb=LLM_DEFAULTS["accelerator_memory_gb"],
+    accelerators_per_replica=LLM_DEFAULTS["accelerators_per_replica"],
+    memory_utilization=LLM_DEFAULTS["memory_utilization"],
+    batch_size=LLM_DEFAULTS["batch_size"],
+    prefill_tokens_per_s=LLM_DEFAULTS["prefill_tokens_per_s"],
+    decode_step_ms=LLM_DEFAULTS["decode_step_ms"],
+    batch_step_overhead=LLM_DEFAULTS["batch_step_overhead"],
+    p95_ttft_ms=LLM_DEFAULTS["p95_ttft_ms"],
+    embedding_tokens=LLM_DEFAULTS["embedding_tokens"],
+    embedding_hit_rate=LLM_DEFAULTS["embedding_hit_rate"],
+    corpus_docs=LLM_DEFAULTS["corpus_docs"],
+    chunks_per_doc=LLM_DEFAULTS["chunks_per_doc"],
+    embedding_dim=LLM_DEFAULTS["embedding_dim"],
+    vector_bytes=LLM_DEFAULTS["vector_bytes"],
+    hnsw_links=LLM_DEFAULTS["hnsw_links"],
+    quantile=DEFAULT_QUANTILE,
+    rates=None,
+):
+    """Return token rates, memory, the replica fleet, latency and monthly costs.
+
+    Scalars come back as arrays of the broadcast scenario shape. Scenarios
+    whose weights leave no room for one request's KV cache, or whose prefill
+    alone misses the TTFT target, get ``feasible = False`` and no replica count.
+    """
+    rates = {**COST_RATES, **(rates or {})}
+    as_float = lambda x: np.asarray(x, dtype=np.float64)  # noqa: E731
+    requests_per_day = as_float(dau) * as_float(requests_per_user)
+    peak_rps = requests_per_day / SECONDS_PER_DAY * as_float(peak_multiplier)
+    prompt, completion = as_float(prompt_tokens), as_float(completion_tokens)
+
+    weights_gb = as_float(model_params_b) * 1e9 * as_float(bytes_per_param) / BYTES_PER_GB
+    per_replica = (
+        replica_size(weights_gb, accelerator_memory_gb)
+        if accelerators_per_replica is None
+        else as_float(accelerators_per_replica)
+    )
+    kv_gb_per_request = (prompt + completion) * kv_cache_gb_per_token(layers, kv_dim, kv_bytes)
+    kv_budget_gb = per_replica * as_float(accelerator_memory_gb) * as_float(memory_utilization) - weights_gb
+    batch = np.minimum(as_float(batch_size), np.floor(np.maximum(kv_budget_gb, 0) / kv_gb_per_request))
+
+    step_ms = as_float(decode_step_ms) * (1 + as_float(batch_step_overhead) * np.maximum(batch - 1, 0))
+    prefill_s = prompt / as_float(prefill_tokens_per_s)
+    decode_s = completion * step_ms / 1000
+    slot_s = prefill_s + decode_s
+    wait_target_s = as_float(p95_ttft_ms) / 1000 - prefill_s
+    feasible = (batch >= 1) & (wait_target_s >= 0)
+
+    # Distinct (rate, service, target) triples only: sweeps repeat them a lot.
+    slots = on_unique(
+        lambda lam, mu, target: min_servers_for_wait(lam, mu, target, quantile),
+        peak_rps, 1 / slot_s, np.where(feasible, wait_target_s, -1.0),
+    )
+    feasible = feasible & (slots >= 0)
+    # Enough batch slots for the TTFT target, and enough prefill throughput for the peak prompts.
+    needed = np.maximum(np.maximum(slots, 0) / np.maximum(batch, 1), peak_rps * prompt / as_float(prefill_tokens_per_s))
+    replicas = np.where(feasible, np.ceil(needed), np.nan)
+    accelerators = replicas * per_replica
+
+    embedding_tokens_per_day = requests_per_day * as_float(embedding_tokens)
+    hit_rate = np.clip(as_float(embedding_hit_rate), 0, 1)
+    vectors = as_float(corpus_docs) * as_float(chunks_per_doc)
+    # Each HNSW vector keeps about 2 x links neighbour ids (4 bytes) on its base layer.
+    bytes_per_vector = as_float(embedding_dim) * as_float(vector_bytes) + 2 * as_float(hnsw_links) * 4
+    vector_index_gb = vectors * bytes_per_vector / BYTES_PER_GB
+    embedding_price = rates["embedding_1k_tokens"] * DAYS_PER_MONTH / 1000
+    return {
+        "requests_per_day": requests_per_day,
+        "peak_rps": peak_rps,
+        "prompt_tokens_per_s": peak_rps * prompt,
+        "completion_tokens_per_s": peak_rps * completion,
+        "tokens_per_s": peak_rps * (prompt + completion),
+        "tokens_per_day": requests_per_day * (prompt + completion),
+        "weights_gb": weights_gb,
+        "accelerators_per_replica": per_replica,
+        "kv_gb_per_request": kv_gb_per_request,
+        "kv_budget_gb": kv_budget_gb,
+        "batch_size": batch,
+        "concurrent_requests": peak_rps * slot_s,
+        "batch_slots": np.where(feasible, slots, -1),
+        "replicas": replicas,
+        "accelerators": accelerators,
+        "feasible": feasible,
+        "prefill_ms": prefill_s * 1000,
+        "ms_per_output_token": step_ms,
+        "decode_s": decode_s,
+        "completion_s": slot_s,
+        "decode_tokens_per_s_per_replica": batch * 1000 / step_ms,
+        "embedding_tokens_per_day": embedding_tokens_per_day,
+        "embedding_peak_rps": peak_rps * (1 - hit_rate),
+        "vectors": vectors,
+        "vector_index_gb": vector_index_gb,
+        "accelerator_monthly_cost": accelerators * rates["accelerator_month"],
+        "embedding_monthly_cost": embedding_tokens_per_day * (1 - hit_rate) * embedding_price,
+        "embedding_cache_savings": embedding_tokens_per_day * hit_rate * embedding_price,
+        "vector_index_monthly_cost": vector_index_gb * rates["cache_gb_month"],
+    }
+
+
+def llm_serving_frame(frame):
+    """Size every scenario in a pandas DataFrame and return it with the result columns added.
+
+    Columns named like :data:`LLM_DEFAULTS` keys are inputs; missing ones use the defaults.
+    Results named like an input (the KV-limited ``batch_size``, the resolved
+    ``accelerators_per_replica``) are added with an ``effective_`` prefix, so
+    the input columns are left as they were.
+    """
+    inputs = {name: np.asarray(frame[name]) for name in LLM_DEFAULTS if name in frame}
+    result = llm_serving(**inputs)
+    return frame.assign(**{
+        f"effective_{name}" if name in LLM_DEFAULTS else name: np.broadcast_to(values, (len(frame),))
+        for name, values in result.items()
+    })
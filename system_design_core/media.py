@@ -0,0 +1,222 @@
+"""Media pipeline capacity: ingest, ABR ladder storage, transcode compute and CDN egress.
+
+Uploads are a mix of photos and videos. Every video is transcoded into the
+rungs of an adaptive-bitrate ladder up to its source resolution (or only
+its source rung without ABR), and thumbnails are cut for every upload.
+Every input may be a scalar or an array of scenarios. Per-rendition results
+add a trailing ladder axis, so a whole sweep is scored in one call without
+looping over resolutions.
+"""
+import numpy as np
+
+from .capacity import KB_PER_MB, MB_PER_GB, SECONDS_PER_DAY
+from .costs import COST_RATES, MODEL_ASSUMPTIONS
+from .projection import DAYS_PER_MONTH
+
+# The reference ladder: rung height, bitrate at that height and x264 "medium"
+# transcode cost in core-seconds per second of video.
+LADDER_NAMES = ("240p", "360p", "480p", "720p", "1080p", "1440p", "2160p")
+LADDER_HEIGHTS = np.array([240, 360, 480, 720, 1080, 1440, 2160])
+LADDER_MBPS = np.array([0.4, 0.8, 1.4, 2.8, 5.0, 9.0, 16.0])
+LADDER_CPU = np.array([0.15, 0.3, 0.5, 1.0, 2.2, 4.0, 8.5])
+# Relative share of playback per rung, renormalised over the rungs a video has.
+PLAYBACK_WEIGHT = np.array([1.0, 2.0, 4.0, 8.0, 8.0, 3.0, 2.0])
+
+MEDIA_DEFAULTS = {
+    "dau": 100_000,
+    "uploads_per_user": 2,
+    "video_share": 0.5,            # share of uploads that are videos
+    "photo_size_mb": 3.0,
+    "video_duration_min": 2.0,
+    "video_bitrate_mbps": 5.0,     # source bitrate, at the source resolution
+    "resolution": "1080p",
+    "peak_upload_qps": 500,
+    "transcoding": True,
+    "adaptive_streaming": True,
+    "thumbnails": True,
+    "keep_original": True,
+    "views_per_upload": 20,
+    "watch_fraction": 0.6,         # share of a video an average view plays
+    "photo_thumbnails": 3,         # sizes cut per photo
+    "poster_frames": 3,            # poster candidates per video
+    "sprite_interval_s": 10,       # one scrubbing sprite frame every N seconds
+    "thumbnail_kb": 30,
+    "photo_cpu_s": 0.2,            # core-seconds to decode and resize one photo
+    "cores_per_worker": 8,
+    "max_utilization": 0.7,
+}
+
+
+def resolution_height(resolution):
+    """``"1080p"``, ``"2160p (4K)"`` or a pixel height, scalar or array -> height in pixels."""
+    values = np.asarray(resolution)
+    if values.dtype.kind in "iuf":
+        return values.astype(np.int64)
+    labels, inverse = np.unique(values.astype(str), return_inverse=True)
+    heights = np.array([int(label.strip().split("p")[0]) for label in labels])
+    return heights[inverse].reshape(values.shape)
+
+
+def _source_rung(resolution):
+    """Index of the highest ladder rung at or below each source height (the lowest for tiny sources)."""
+    return np.maximum(np.searchsorted(LADDER_HEIGHTS, resolution_height(resolution), side="right") - 1, 0)
+
+
+def _ladder_scale(resolution, video_bitrate_mbps):
+    """Factor that rescales the reference ladder so the source height gets the source bitrate."""
+    height = np.maximum(resolution_height(resolution), LADDER_HEIGHTS[0])
+    return np.asarray(video_bitrate_mbps, dtype=np.float64) / np.interp(height, LADDER_HEIGHTS, LADDER_MBPS)
+
+
+def ladder_rungs(resolution, adaptive_streaming=True):
+    """Boolean ``(..., rungs)`` mask of the renditions produced for each scenario.
+
+    ABR produces every rung up to the source height; without it only the
+    highest rung at or below the source.
+    """
+    top = _source_rung(resolution)[..., None]
+    rung = np.arange(len(LADDER_HEIGHTS))
+    return np.where(np.asarray(adaptive_streaming, dtype=bool)[..., None], rung <= top, rung == top)
+
+
+def rendition_bitrates(resolution, video_bitrate_mbps, adaptive_streaming=True):
+    """``(..., rungs)`` bitrate in Mbps of each rendition, 0 where the rung is not produced.
+
+    Rungs are the reference ladder rescaled to the source bitrate, so no
+    rendition exceeds it.
+    """
+    scale = _ladder_scale(resolution, video_bitrate_mbps)
+    return np.where(ladder_rungs(resolution, adaptive_streaming), LADDER_MBPS * scale[..., None], 0.0)
+
+
+def media_pipeline(
+    dau=MEDIA_DEFAULTS["dau"],
+    uploads_per_user=MEDIA_DEFAULTS["uploads_per_user"],
+    video_share=MEDIA_DEFAULTS["video_share"],
+    photo_size_mb=MEDIA_DEFAULTS["photo_size_mb"],
+    video_duration_min=MEDIA_DEFAULTS["video_duration_min"],
+    video_bitrate_mbps=MEDIA_DEFAULTS["video_bitrate_mbps"],
+    resolution=MEDIA_DEFAULTS["resolution"],
+    peak_upload_qps=MEDIA_DEFAULTS["peak_upload_qps"],
+    transcoding=MEDIA_DEFAULTS["transcoding"],
+    adaptive_streaming=MEDIA_DEFAULTS["adaptive_streaming"],
+    thumbnails=MEDIA_DEFAULTS["thumbnails"],
+    keep_original=MEDIA_DEFAULTS["keep_original"],
+    views_per_upload=MEDIA_DEFAULTS["views_per_upload"],
+    watch_fraction=MEDIA_DEFAULTS["watch_fraction"],
+    photo_thumbnails=MEDIA_DEFAULTS["photo_thumbnails"],
+    poster_frames=MEDIA_DEFAULTS["poster_frames"],
+    sprite_interval_s=MEDIA_DEFAULTS["sprite_interval_s"],
+    thumbnail_kb=MEDIA_DEFAULTS["thumbnail_kb"],
+    photo_cpu_s=MEDIA_DEFAULTS["photo_cpu_s"],
+    cores_per_worker=MEDIA_DEFAULTS["cores_per_worker"],
+    max_utilization=MEDIA_DEFAULTS["max_utilization"],
+    rates=None,
+    assumptions=None,
+):
+    """Return the media pipeline's daily volumes, peak rates, worker pool and costs.
+
+    Scalars come back as arrays of the broadcast scenario shape; the
+    ``rendition_*`` entries have an extra trailing axis over ``LADDER_NAMES``.
+    Without transcoding the original is stored and served as is. Worker pool
+    size covers transcoding and thumbnailing at ``peak_upload_qps``.
+    """
+    rates = {**COST_RATES, **(rates or {})}
+    assumptions = {**MODEL_ASSUMPTIONS, **(assumptions or {})}
+    as_float = lambda x: np.asarray(x, dtype=np.float64)  # noqa: E731
+    uploads = as_float(dau) * as_float(uploads_per_user)
+    video_share = np.clip(as_float(video_share), 0, 1)
+    duration_s = as_float(video_duration_min) * 60
+    source_mbps = as_float(video_bitrate_mbps)
+    peak_qps = as_float(peak_upload_qps)
+    transcoding = np.asarray(transcoding, dtype=bool)
+    thumbnails = np.asarray(thumbnails, dtype=bool)
+    keep_original = np.asarray(keep_original, dtype=bool)
+
+    videos = uploads * video_share
+    photos = uploads - videos
+    video_mb = duration_s * source_mbps / 8
+    upload_mb = video_share * video_mb + (1 - video_share) * as_float(photo_size_mb)
+
+    # Renditions exist only when transcoding; otherwise the original is the one copy.
+    top = _source_rung(resolution)
+    abr = np.asarray(adaptive_streaming, dtype=bool)
+    scale = _ladder_scale(resolution, source_mbps)
+    rungs = ladder_rungs(resolution, abr) & transcoding[..., None]
+    bitrates = np.where(rungs, LADDER_MBPS * scale[..., None], 0.0)
+    rendition_gb = videos[..., None] * duration_s[..., None] * bitrates / 8 / MB_PER_GB
+
+    def ladder_total(values):
+        # Per-scenario sums over the produced rungs, from prefix sums instead of the rung axis.
+        return np.where(transcoding, np.where(abr, np.cumsum(values)[top], values[top]), 0.0)
+
+    stored_original = keep_original | ~transcoding
+    # Photo originals are always kept; their thumbnails are the only derivatives.
+    original_gb = (np.where(stored_original, videos * video_mb, 0.0) + photos * as_float(photo_size_mb)) / MB_PER_GB
+
+    video_thumbs = as_float(poster_frames) + np.ceil(duration_s / as_float(sprite_interval_s))
+    thumbs_per_upload = np.where(
+        thumbnails, video_share * video_thumbs + (1 - video_share) * as_float(photo_thumbnails), 0.0
+    )
+    thumbnail_gb = uploads * thumbs_per_upload * as_float(thumbnail_kb) / KB_PER_MB / MB_PER_GB
+
+    # Core-seconds of work per upload: every rendition plus the photo resize.
+    video_cpu_s = duration_s * ladder_total(LADDER_CPU)
+    photo_work_s = np.where(thumbnails, as_float(photo_cpu_s), 0.0)
+    cpu_s_per_upload = video_share * video_cpu_s + (1 - video_share) * photo_work_s
+    peak_cores = peak_qps * cpu_s_per_upload
+    workers = np.ceil(peak_cores / (as_float(cores_per_worker) * as_float(max_utilization)))
+    # Rungs run in parallel on separate workers, so a video is ready after its slowest rung.
+    ready_after_s = duration_s * np.where(transcoding, LADDER_CPU[top], 0.0) / as_float(cores_per_worker)
+
+    weight_total = np.where(transcoding, ladder_total(PLAYBACK_WEIGHT), 1.0)
+    playback_mbps = np.where(
+        transcoding, scale * ladder_total(PLAYBACK_WEIGHT * LADDER_MBPS) / weight_total, source_mbps
+    )
+    views = uploads * as_float(views_per_upload)
+    video_view_gb = duration_s * as_float(watch_fraction) * playback_mbps / 8 / MB_PER_GB
+    cdn_gb = views * (video_share * video_view_gb + (1 - video_share) * as_float(photo_size_mb) / MB_PER_GB)
+    origin_gb = cdn_gb * (1 - assumptions["cdn_offload"])
+
+    rendition_total_gb = videos * duration_s * scale * ladder_total(LADDER_MBPS) / 8 / MB_PER_GB
+    storage_gb = rendition_total_gb + original_gb + thumbnail_gb
+    return {
+        "uploads_per_day": uploads,
+        "videos_per_day": videos,
+        "photos_per_day": photos,
+        "video_source_mb": video_mb,
+        "ingest_mb_per_sec": uploads * upload_mb / SECONDS_PER_DAY,
+        "peak_ingest_mb_per_sec": peak_qps * upload_mb,
+        "peak_ingest_gbps": peak_qps * upload_mb * 8 / 1000,
+        "rendition_mbps": bitrates,
+        "rendition_gb_per_day": rendition_gb,
+        "original_gb_per_day": original_gb,
+        "thumbnails_per_upload": thumbs_per_upload,
+        "thumbnails_per_day": uploads * thumbs_per_upload,
+        "peak_thumbnail_writes_per_sec": peak_qps * thumbs_per_upload,
+        "thumbnail_gb_per_day": thumbnail_gb,
+        "storage_gb_per_day": storage_gb,
+        "transcode_cpu_hours_per_day": uploads * cpu_s_per_upload / 3600,
+        "peak_transcode_cores": peak_cores,
+        "transcode_workers": workers,
+        "ready_after_s": ready_after_s,
+        "playback_mbps": playback_mbps,
+        "cdn_egress_gb_per_day": cdn_gb,
+        "cdn_egress_gbps": cdn_gb * MB_PER_GB * 8 / 1000 / SECONDS_PER_DAY,
+        "origin_egress_gb_per_day": origin_gb,
+        "cdn_monthly_cost": cdn_gb * DAYS_PER_MONTH * rates["cdn_egress_gb"],
+        "origin_monthly_cost": origin_gb * DAYS_PER_MONTH * rates["egress_gb"],
+        "transcode_monthly_cost": workers * rates["instance_month"],
+        "storage_added_monthly_cost": storage_gb * DAYS_PER_MONTH * rates["storage_gb_month"],
+    }
+
+
+def ladder_table(result, index=()):
+    """Per-rendition rows (name, Mbps, GB/day) for one scenario of ``media_pipeline``."""
+    mbps = result["rendition_mbps"][index]
+    gb = result["rendition_gb_per_day"][index]
+    return [
+        {"Rendition": name, "Bitrate (Mbps)": round(float(rate), 2), "Storage (GB/day)": round(float(size), 1)}
+        for name, rate, size in zip(LADDER_NAMES, mbps, gb)
+        if rate > 0
+    ]
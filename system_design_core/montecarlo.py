@@ -0,0 +1,122 @@
+"""Monte Carlo uncertainty mode for the capacity math.
+
+Any capacity input may be a :class:`Distribution` instead of a point value.
+Capacity inputs are never negative, and neither are the distributions' supports.
+:func:`simulate_capacity` draws the samples in fixed-size chunks, evaluates
+each chunk with :func:`estimate_capacity` and folds the outputs into one
+:class:`QuantileSketch` per metric, so memory stays flat at any sample count.
+"""
+import math
+
+import numpy as np
+
+from .capacity import CAPACITY_DEFAULTS, estimate_capacity
+from .sketch import QuantileSketch
+
+DEFAULT_SAMPLES = 1_000_000
+DEFAULT_CHUNK_SIZE = 1 << 18
+DEFAULT_METRICS = ("peak_qps", "storage_gb", "egress_mb_per_sec")
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+DISTRIBUTION_KINDS = ("range", "triangular", "lognormal")
+
+# z-score of the 95th percentile of a standard normal.
+_Z95 = 1.6448536269514722
+
+
+class Distribution:
+    """An uncertain input: ``range`` (uniform), ``triangular`` or ``lognormal``.
+
+    Build one with :func:`uniform_range`, :func:`triangular` or :func:`lognormal`.
+    """
+
+    __slots__ = ("kind", "params")
+
+    def __init__(self, kind, **params):
+        if kind not in DISTRIBUTION_KINDS:
+            raise ValueError(f"Unknown distribution kind {kind!r}; expected one of {DISTRIBUTION_KINDS}")
+        self.kind = kind
+        self.params = params
+
+    def sample(self, rng, size):
+        p = self.params
+        if self.kind == "range":
+            return rng.uniform(p["low"], p["high"], size)
+        if self.kind == "triangular":
+            if p["low"] == p["high"]:
+                return np.full(size, float(p["low"]))
+            return rng.triangular(p["low"], p["mode"], p["high"], size)
+        return rng.lognormal(math.log(p["median"]), p["sigma"], size)
+
+    def __eq__(self, other):
+        return isinstance(other, Distribution) and (self.kind, self.params) == (other.kind, other.params)
+
+    def __hash__(self):
+        return hash((self.kind, tuple(sorted(self.params.items()))))
+
+    def __repr__(self):
+        args = ", ".join(f"{key}={value!r}" for key, value in self.params.items())
+        return f"Distribution({self.kind!r}, {args})"
+
+
+def uniform_range(low, high):
+    if not 0 <= low <= high:
+        raise ValueError("range needs 0 <= low <= high")
+    return Distribution("range", low=low, high=high)
+
+
+def triangular(low, mode, high):
+    if not 0 <= low <= mode <= high:
+        raise ValueError("triangular needs 0 <= low <= mode <= high")
+    return Distribution("triangular", low=low, mode=mode, high=high)
+
+
+def lognormal(median, p95):
+    """Lognormal pinned by its median and 95th percentile (both positive)."""
+    if median <= 0 or p95 < median:
+        raise ValueError("lognormal needs 0 < median <= p95")
+    return Distribution("lognormal", median=median, sigma=math.log(p95 / median) / _Z95)
+
+
+def simulate_capacity(
+    inputs,
+    samples=DEFAULT_SAMPLES,
+    metrics=DEFAULT_METRICS,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    seed=0,
+    relative_accuracy=0.01,
+):
+    """Sample uncertain capacity inputs and return a quantile sketch per metric.
+
+    ``inputs`` maps capacity input names to point values or Distributions;
+    names left out use ``CAPACITY_DEFAULTS``. Cache hit rate draws are clipped
+    to 0-100%.
+    """
+    unknown = sorted(set(inputs) - set(CAPACITY_DEFAULTS))
+    if unknown:
+        raise KeyError(f"Unknown capacity inputs: {unknown}")
+    rng = np.random.default_rng(seed)
+    sketches = {metric: QuantileSketch(relative_accuracy) for metric in metrics}
+    remaining = int(samples)
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunk = {}
+        for name, value in inputs.items():
+            if isinstance(value, Distribution):
+                value = value.sample(rng, size)
+                if name in ("cache_hit_rate", "read_percent"):
+                    value = np.clip(value, 0, 100)
+            chunk[name] = value
+        results = estimate_capacity(**chunk)
+        for metric, sketch in sketches.items():
+            sketch.update(np.broadcast_to(results[metric], (size,)))
+        remaining -= size
+    return sketches
+
+
+def percentile_table(sketches, quantiles=DEFAULT_QUANTILES):
+    """``{metric: {"P50": value, ...}}`` from the sketches of :func:`simulate_capacity`."""
+    labels = [f"P{q * 100:g}" for q in quantiles]
+    return {
+        metric: dict(zip(labels, (float(v) for v in sketch.quantiles(quantiles))))
+        for metric, sketch in sketches.items()
+    }
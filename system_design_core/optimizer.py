@@ -0,0 +1,286 @@
+"""Cost-aware search over design toggles and parameters.
+
+The search space is the product of "outer" choices (toggles, consistency,
+replication factor) and "inner" numeric ranges (cache hit rate, fleet
+utilization ceiling). Everything that depends only on the outer choices —
+availability, storage cost, egress per unit of cache misses — is computed
+once per combination, and outer combinations that cannot meet the SLA,
+egress cap or budget even in their best case are pruned before the inner
+grid is expanded. Fleet sizing depends on only a few of the outer choices,
+so it is solved once per distinct queueing setup over the whole inner grid.
+The remaining points are evaluated by broadcasting in chunks, optionally
+spread over a process pool, and reduced to the Pareto front of monthly cost,
+P95 latency and availability.
+"""
+import itertools
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .capacity import CAPACITY_DEFAULTS, KB_PER_GB, MB_PER_GB, estimate_capacity
+from .costs import COST_RATES, MODEL_ASSUMPTIONS, SECONDS_PER_MONTH, parse_sla
+from .design import architecture_layers
+from .queueing import layer_profile, size_layers
+
+DEFAULT_CHUNK_POINTS = 1 << 20
+# P95 latencies closer than this are ties; below it they differ by quantile-solver noise only.
+LATENCY_RESOLUTION_MS = 0.01
+
+OUTER_DIMENSIONS = (
+    "use_cdn",
+    "enable_compression",
+    "disaster_recovery",
+    "region_locking",
+    "consistency",
+    "replication_factor",
+)
+INNER_DIMENSIONS = ("cache_hit_rate", "max_utilization")
+
+SEARCH_SPACE = {
+    "use_cdn": (False, True),
+    "enable_compression": (False, True),
+    "disaster_recovery": (False, True),
+    "region_locking": (False, True),
+    "consistency": ("Strong", "Quorum", "Eventual"),
+    "replication_factor": (1, 2, 3, 4, 5),
+    "cache_hit_rate": tuple(range(0, 100)),
+    "max_utilization": (0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9),
+}
+
+def replica_availability(replication_factor, consistency, node_availability):
+    """Chance enough replicas are up: a majority for Strong/Quorum, any one for Eventual."""
+    rf = np.asarray(replication_factor, dtype=np.int64)
+    needed = np.where(np.asarray(consistency, dtype=object) == "Eventual", 1, rf // 2 + 1)
+    a = node_availability
+    result = np.zeros(rf.shape)
+    for up in range(1, int(rf.max(initial=0)) + 1):
+        ways = np.array([math.comb(int(n), up) for n in rf.ravel()]).reshape(rf.shape)
+        result += np.where(up >= needed, ways * a ** up * (1 - a) ** np.maximum(rf - up, 0), 0.0)
+    return result
+
+
+def pareto_front(cost, latency, availability, latency_resolution=LATENCY_RESOLUTION_MS):
+    """Indices of the points no other point beats on cost, latency and availability.
+
+    Latencies are compared rounded to ``latency_resolution``. Availability
+    takes few distinct values, so levels are swept from the most available
+    down against a cost/latency staircase of everything kept so far.
+    """
+    cost, latency, availability = (np.asarray(a, dtype=np.float64) for a in (cost, latency, availability))
+    if latency_resolution:
+        latency = np.round(latency / latency_resolution)
+    kept = []
+    stair_cost, stair_latency = np.empty(0), np.empty(0)
+    for level in np.unique(availability)[::-1]:
+        idx = np.flatnonzero(availability == level)
+        idx = idx[np.lexsort((latency[idx], cost[idx]))]
+        c, p = cost[idx], latency[idx]
+        # Within a level, a point survives if it is faster than everything cheaper.
+        best_before = np.r_[np.inf, np.minimum.accumulate(p)[:-1]]
+        survive = p < best_before
+        # Against more available levels, any point at least as cheap and fast wins.
+        if stair_cost.size:
+            pos = np.searchsorted(stair_cost, c, side="right") - 1
+            survive &= (pos < 0) | (stair_latency[np.maximum(pos, 0)] > p)
+        idx, c, p = idx[survive], c[survive], p[survive]
+        kept.append(idx)
+        order = np.argsort(np.r_[stair_cost, c], kind="stable")
+        stair_cost = np.r_[stair_cost, c][order]
+        stair_latency = np.minimum.accumulate(np.r_[stair_latency, p][order])
+    return np.concatenate(kept) if kept else np.empty(0, dtype=np.int64)
+
+
+def _outer_grid(space):
+    combos = list(itertools.product(*(space[name] for name in OUTER_DIMENSIONS)))
+    return {
+        name: np.array([combo[i] for combo in combos], dtype=object if name == "consistency" else None)
+        for i, name in enumerate(OUTER_DIMENSIONS)
+    }
+
+
+def _fleet_tables(peak_qps, outer, hit, utilization, p95_target_ms, assumptions, rates):
+    """Instance cost, P95 bound and instance count per distinct queueing setup, over the inner grid."""
+    sync_rtt = outer["disaster_recovery"] & (outer["consistency"] == "Strong")
+    keys = list(zip(outer["region_locking"], outer["enable_compression"], outer["consistency"], sync_rtt))
+    distinct = list(dict.fromkeys(keys))
+    key_index = np.array([distinct.index(key) for key in keys])
+    tables = {}
+    # Setups that differ only in the cross-region RTT share their profiles, and so their idle-path
+    # floor: size them in one call with the latency target as an extra leading axis.
+    for region_locking, compression, consistency in dict.fromkeys(key[:3] for key in distinct):
+        rtts = [key[3] for key in distinct if key[:3] == (region_locking, compression, consistency)]
+        layers = architecture_layers(region_locking=bool(region_locking))
+        profiles = {}
+        for layer in layers:
+            profile = layer_profile(layer)
+            factor = 1.0
+            if layer == "App Server" and compression:
+                factor = assumptions["compression_cpu"]
+            elif "DB" in layer:
+                factor = assumptions["db_write_factor"][consistency]
+            profiles[layer] = {**profile, "service_ms": profile["service_ms"] * factor}
+        target = p95_target_ms - assumptions["cross_region_rtt_ms"] * np.array(rtts, dtype=np.float64)[:, None, None]
+        sizing = size_layers(peak_qps, layers, target, hit[:, None], max_utilization=utilization[None, :], profiles=profiles)
+        total = sum(np.maximum(layer["instances"], 0) for layer in sizing["layers"].values())
+        total = np.broadcast_to(total, sizing["feasible"].shape)
+        cost = np.where(sizing["feasible"], total * rates["instance_month"], np.inf)
+        for i, rtt in enumerate(rtts):
+            tables[region_locking, compression, consistency, rtt] = cost[i], sizing["p95_bound_ms"][i], total[i]
+    costs, bounds, instances = zip(*(tables[key] for key in distinct))
+    return key_index, np.array(costs), np.array(bounds), np.array(instances)
+
+
+# Set in each pool worker by _init_worker, so the tables are pickled once per process.
+_CONTEXT = None
+
+
+def _init_worker(context):
+    global _CONTEXT
+    _CONTEXT = context
+
+
+def _evaluate(outer_idx, context=None):
+    """Pareto-front points of one chunk of outer combinations, as flat grid coordinates."""
+    c = context if context is not None else _CONTEXT
+    key = c["key"][outer_idx]
+    miss = c["miss"][None, :, None]
+    cost = (
+        c["storage_cost"][outer_idx, None, None]
+        + c["compute_mult"][outer_idx, None, None] * (c["instance_cost"][key] + c["cache_cost"][None, :, None])
+        + c["egress_cost"][outer_idx, None, None] * miss
+    )
+    latency = c["p95_bound"][key] + c["rtt"][outer_idx, None, None]
+    egress = c["origin_egress"][outer_idx, None, None] * miss
+    ok = (cost <= c["budget"]) & (latency <= c["p95_target_ms"]) & (egress <= c["max_egress"])
+    o, h, u = np.nonzero(ok)
+    o = outer_idx[o]
+    availability = c["availability"][o]
+    front = pareto_front(cost[ok], latency[ok], availability)
+    return int(ok.sum()), o[front], h[front], u[front]
+
+
+def optimize_design(
+    sla="99.99%",
+    p95_target_ms=300,
+    max_egress_mb_per_sec=math.inf,
+    budget=math.inf,
+    retention_days=180,
+    space=None,
+    rates=None,
+    assumptions=None,
+    workers=None,
+    chunk_points=DEFAULT_CHUNK_POINTS,
+    **capacity_inputs,
+):
+    """Pareto front of the cheapest configurations meeting the targets.
+
+    ``space`` overrides entries of ``SEARCH_SPACE`` (a one-value tuple pins a
+    choice); ``rates`` and ``assumptions`` override ``COST_RATES`` and
+    ``MODEL_ASSUMPTIONS``. ``workers`` > 1 spreads the chunks over a process
+    pool. Returns ``{"front": {column: array}, "searched", "evaluated",
+    "feasible"}`` with the front sorted by monthly cost.
+    """
+    unknown = sorted(set(capacity_inputs) - set(CAPACITY_DEFAULTS))
+    searched = sorted(set(capacity_inputs) & set(SEARCH_SPACE))
+    if unknown or searched:
+        raise KeyError(f"Unknown or searched capacity inputs: {unknown + searched}")
+    space = {**SEARCH_SPACE, **(space or {})}
+    rates = {**COST_RATES, **(rates or {})}
+    assumptions = {**MODEL_ASSUMPTIONS, **(assumptions or {})}
+
+    base = estimate_capacity(**capacity_inputs, replication_factor=1, cache_hit_rate=0, read_percent=0)
+    outer = _outer_grid(space)
+    hit = np.asarray(space["cache_hit_rate"], dtype=np.float64)
+    utilization = np.asarray(space["max_utilization"], dtype=np.float64)
+    miss = 1 - hit / 100
+
+    dr = outer["disaster_recovery"].astype(bool)
+    cdn = outer["use_cdn"].astype(bool)
+    availability = (
+        assumptions["stateless_availability"]
+        * replica_availability(outer["replication_factor"], outer["consistency"], assumptions["node_availability"])
+        * np.where(dr, 1 - (1 - assumptions["region_availability"]) ** 2, assumptions["region_availability"])
+    )
+    retained_gb = float(base["storage_gb"]) * retention_days
+    storage_cost = (
+        retained_gb * outer["replication_factor"] * np.where(dr, 2, 1)
+        * np.where(outer["region_locking"].astype(bool), 1 + assumptions["geo_shard_overhead"], 1)
+        * rates["storage_gb_month"]
+    )
+    # Egress at a 0% hit rate; every grid point scales it by its miss fraction.
+    egress = float(base["egress_mb_per_sec"]) * np.where(
+        outer["enable_compression"].astype(bool), assumptions["compression_ratio"], 1
+    )
+    offload = np.where(cdn, assumptions["cdn_offload"], 0)
+    origin_egress = egress * (1 - offload)
+    egress_gb_month = egress * SECONDS_PER_MONTH / MB_PER_GB
+    egress_cost = egress_gb_month * ((1 - offload) * rates["egress_gb"] + offload * rates["cdn_egress_gb"])
+
+    # Zipf(1) popularity: caching the top k of N objects hits about ln k / ln N of reads.
+    objects = max(float(base["total_requests"]) * retention_days, 1.0)
+    object_kb = capacity_inputs.get("object_size_kb") or capacity_inputs.get(
+        "payload_size_kb", CAPACITY_DEFAULTS["payload_size_kb"]
+    )
+    cache_cost = objects ** (hit / 100) * object_kb / KB_PER_GB * rates["cache_gb_month"]
+
+    key, instance_cost, p95_bound, instances = _fleet_tables(
+        float(base["peak_qps"]), outer, hit, utilization, p95_target_ms, assumptions, rates
+    )
+    compute_mult = 1 + assumptions["standby_fraction"] * dr
+    rtt = np.where(dr & (outer["consistency"] == "Strong"), assumptions["cross_region_rtt_ms"], 0.0)
+
+    # Prune outer combinations that fail even with the best inner point.
+    best_inner = (instance_cost + cache_cost[None, :, None]).reshape(len(instance_cost), -1).min(axis=1)
+    lower_cost = storage_cost + compute_mult * best_inner[key] + egress_cost * miss.min()
+    alive = np.flatnonzero(
+        (availability >= parse_sla(sla))
+        & (origin_egress * miss.min() <= max_egress_mb_per_sec)
+        & (lower_cost <= budget)
+    )
+
+    context = {
+        "key": key, "miss": miss, "storage_cost": storage_cost, "compute_mult": compute_mult,
+        "instance_cost": instance_cost, "cache_cost": cache_cost, "egress_cost": egress_cost,
+        "p95_bound": p95_bound, "rtt": rtt, "origin_egress": origin_egress, "availability": availability,
+        "budget": budget, "p95_target_ms": p95_target_ms, "max_egress": max_egress_mb_per_sec,
+    }
+    per_outer = hit.size * utilization.size
+    step = max(chunk_points // per_outer, 1)
+    chunks = [alive[i:i + step] for i in range(0, alive.size, step)]
+    if workers and workers > 1 and len(chunks) > 1:
+        # Spawned, not forked: the caller may be a threaded server such as Streamlit.
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=spawn, initializer=_init_worker, initargs=(context,)) as pool:
+            results = list(pool.map(_evaluate, chunks))
+    else:
+        results = [_evaluate(chunk, context) for chunk in chunks]
+
+    feasible = sum(r[0] for r in results)
+    empty = np.empty(0, dtype=np.int64)
+    o, h, u = (np.concatenate([empty] + [r[i] for r in results]).astype(np.int64) for i in (1, 2, 3))
+    k = key[o]
+    cost = (
+        storage_cost[o] + compute_mult[o] * (instance_cost[k, h, u] + cache_cost[h]) + egress_cost[o] * miss[h]
+    )
+    latency = p95_bound[k, h, u] + rtt[o]
+    front = pareto_front(cost, latency, availability[o])
+    front = front[np.argsort(cost[front], kind="stable")]
+    o, h, u, k = o[front], h[front], u[front], k[front]
+    columns = {name: outer[name][o] for name in OUTER_DIMENSIONS}
+    columns.update({
+        "cache_hit_rate": hit[h],
+        "max_utilization": utilization[u],
+        "monthly_cost": cost[front],
+        "p95_ms": latency[front],
+        "availability": availability[o],
+        "origin_egress_mb_per_sec": origin_egress[o] * miss[h],
+        "instances": instances[k, h, u],
+    })
+    return {
+        "front": columns,
+        "searched": outer["use_cdn"].size * per_outer,
+        "evaluated": alive.size * per_outer,
+        "feasible": feasible,
+    }
@@ -0,0 +1,166 @@
+"""Opt-in per-section timing and allocation profiler for Streamlit reruns.
+
+The apps are flat scripts, so sections are delimited with checkpoints:
+``profiler.start()`` begins a rerun, ``profiler.mark("Capacity")`` closes the
+running section and opens the next, and ``profiler.finish()`` closes the last
+one and records the rerun. Streamlit interrupts a rerun (``st.rerun``, a
+widget change mid-run) by raising, so ``finish()`` may never run: ``start()``
+drops whatever such a rerun left open instead of charging it to the next. Each
+section's wall time and allocations (net and peak, via ``tracemalloc``) go
+into a rolling window per section for P50/P95 summaries, and every rerun can
+be appended to a JSON-lines file for offline analysis. A disabled profiler
+does nothing, so the checkpoints can stay in the scripts.
+
+``tracemalloc`` traces the whole process and slows every allocation, so it
+only runs while some profiled rerun is in progress: the first one starts it
+and the last ``finish()`` stops it. Its counters are process-wide too, so
+the memory figures include whatever other sessions allocated during the same
+section, and concurrent profiled sessions share (and reset) one peak.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+PROFILE_ENV = "SYSTEM_DESIGN_PROFILE"
+PROFILE_LOG_ENV = "SYSTEM_DESIGN_PROFILE_LOG"
+DEFAULT_WINDOW = 200
+
+
+# Profilers with a rerun in progress; tracemalloc runs while there is one.
+_TRACING_LOCK = threading.Lock()
+_tracing_users = 0
+_started_tracing = False
+
+
+def _acquire_tracing():
+    global _tracing_users, _started_tracing
+    with _TRACING_LOCK:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users, _started_tracing
+    with _TRACING_LOCK:
+        _tracing_users -= 1
+        # Tracing someone else started (e.g. python -X tracemalloc) is left running.
+        if _tracing_users == 0 and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+def profiling_requested(query_value=None):
+    """True when ``SYSTEM_DESIGN_PROFILE`` is set or the page was opened with ``?profile=1``."""
+    flag = query_value if query_value is not None else os.environ.get(PROFILE_ENV, "")
+    return str(flag).strip().lower() in ("1", "true", "yes", "on")
+
+
+class RerunProfiler:
+    """Rolling per-section timings for one app; keep it in ``st.session_state``."""
+
+    def __init__(self, app, enabled=True, log_path=None, window=DEFAULT_WINDOW, track_memory=True):
+        self.app = app
+        self.enabled = enabled
+        self.log_path = log_path if log_path is not None else os.environ.get(PROFILE_LOG_ENV)
+        self.track_memory = track_memory
+        self.reruns = 0
+        self._window = window
+        self._history = {}
+        self._current = None
+        self._rerun = {}
+        self._tracing = False
+
+    def start(self):
+        """Begin a rerun, discarding sections and tracing left by one that was interrupted."""
+        self._current = None
+        self._rerun = {}
+        self._stop_tracing()
+
+    def mark(self, section):
+        """End the running section (if any) and start timing ``section``."""
+        if not self.enabled:
+            return
+        self._close()
+        if self.track_memory:
+            if not self._tracing:
+                _acquire_tracing()
+                self._tracing = True
+            tracemalloc.reset_peak()
+            start_bytes = tracemalloc.get_traced_memory()[0]
+        else:
+            start_bytes = 0
+        self._current = (section, time.perf_counter(), start_bytes)
+
+    def _close(self):
+        if self._current is None:
+            return
+        section, started, start_bytes = self._current
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if self.track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            net_kb, peak_kb = (current - start_bytes) / 1024, (peak - start_bytes) / 1024
+        else:
+            net_kb = peak_kb = 0.0
+        sample = {"ms": elapsed_ms, "net_kb": net_kb, "peak_kb": peak_kb}
+        # A section marked twice in one rerun accumulates.
+        previous = self._rerun.get(section)
+        if previous:
+            sample = {
+                "ms": previous["ms"] + elapsed_ms,
+                "net_kb": previous["net_kb"] + net_kb,
+                "peak_kb": max(previous["peak_kb"], peak_kb),
+            }
+        self._rerun[section] = sample
+        self._current = None
+
+    def finish(self):
+        """Close the last section, fold this rerun into the history and log it."""
+        if not self.enabled:
+            self._stop_tracing()
+            return None
+        try:
+            self._close()
+        finally:
+            self._stop_tracing()
+        rerun, self._rerun = self._rerun, {}
+        if not rerun:
+            return None
+        self.reruns += 1
+        for section, sample in rerun.items():
+            self._history.setdefault(section, deque(maxlen=self._window)).append(sample)
+        total_ms = sum(sample["ms"] for sample in rerun.values())
+        record = {"ts": time.time(), "app": self.app, "rerun": self.reruns, "total_ms": total_ms, "sections": rerun}
+        if self.log_path:
+            with open(self.log_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record) + "\n")
+        return record
+
+    def _stop_tracing(self):
+        if self._tracing:
+            self._tracing = False
+            _release_tracing()
+
+    def summary(self):
+        """``{section: {runs, last_ms, p50_ms, p95_ms, p50_peak_kb, p95_peak_kb}}`` over the window."""
+        rows = {}
+        for section, samples in self._history.items():
+            ms = np.array([s["ms"] for s in samples])
+            peak = np.array([s["peak_kb"] for s in samples])
+            p50_ms, p95_ms = np.percentile(ms, [50, 95])
+            p50_kb, p95_kb = np.percentile(peak, [50, 95])
+            rows[section] = {
+                "runs": len(samples),
+                "last_ms": float(ms[-1]),
+                "p50_ms": float(p50_ms),
+                "p95_ms": float(p95_ms),
+                "p50_peak_kb": float(p50_kb),
+                "p95_peak_kb": float(p95_kb),
+            }
+        return rows
@@ -0,0 +1,216 @@
+"""Month-by-month growth and retention projection.
+
+Every daily series is a day-0 capacity metric scaled by one compounded growth
+curve, so the projection factors into three independent pieces:
+
+* the growth curve (monthly growth rate, horizon),
+* the retention window over that curve (live storage inside ``retention_days``),
+* the day-0 capacity metrics from :func:`estimate_capacity`.
+
+:class:`GrowthProjection` caches each piece (and its monthly reductions) and an
+``update`` only recomputes the pieces that read the changed inputs; changing a
+capacity input just rescales the cached monthly curves. Inputs may be arrays of scenarios;
+series then have shape ``(n_scenarios, horizon_days)``.
+"""
+import numpy as np
+
+from .capacity import CAPACITY_DEFAULTS, MB_PER_GB, SECONDS_PER_DAY, estimate_capacity
+
+DAYS_PER_YEAR = 365.25
+DAYS_PER_MONTH = DAYS_PER_YEAR / 12
+
+GROWTH_INPUTS = ("monthly_growth_pct", "horizon_years")
+RETENTION_INPUTS = ("retention_days",)
+
+
+def horizon_days(horizon_years):
+    return int(round(horizon_years * DAYS_PER_YEAR))
+
+
+def growth_curve(monthly_growth_pct, days):
+    """Compounded growth factor for each day, 1.0 on day 0."""
+    rate = np.asarray(monthly_growth_pct, dtype=np.float64)[..., np.newaxis]
+    daily_log = np.log1p(rate / 100) / DAYS_PER_MONTH
+    return np.exp(daily_log * np.arange(days))
+
+
+def retention_window(curve, retention_days):
+    """Sum of the growth curve over the trailing ``retention_days`` days.
+
+    Uses one cumulative sum and a shifted difference, so the cost is linear in
+    the horizon whatever the retention period.
+    """
+    cumulative = np.cumsum(curve, axis=-1)
+    days = cumulative.shape[-1]
+    retention = np.asarray(retention_days, dtype=np.int64)[..., np.newaxis]
+    shifted_idx = np.arange(days) - np.maximum(retention, 1)
+    shape = np.broadcast_shapes(cumulative.shape, shifted_idx.shape)
+    cumulative = np.broadcast_to(cumulative, shape)
+    shifted_idx = np.broadcast_to(shifted_idx, shape)
+    expired = np.take_along_axis(cumulative, np.maximum(shifted_idx, 0), axis=-1)
+    return cumulative - np.where(shifted_idx >= 0, expired, 0.0)
+
+
+def month_starts(days):
+    """Index of the first day of each month inside a ``days`` long horizon."""
+    starts = np.ceil(np.arange(0, days, DAYS_PER_MONTH)).astype(np.int64)
+    return starts[starts < days]
+
+
+class GrowthProjection:
+    """Daily and monthly projection that recomputes only what an update touched."""
+
+    def __init__(self, monthly_growth_pct=10, horizon_years=1, retention_days=180, **capacity_inputs):
+        self.monthly_growth_pct = monthly_growth_pct
+        self.horizon_years = horizon_years
+        self.retention_days = retention_days
+        self.capacity_inputs = {**CAPACITY_DEFAULTS, **capacity_inputs}
+        self._curve = None
+        self._window = None
+        self._base = None
+        self._series = {}
+        self._curve_months = None
+        self._window_months = None
+
+    def update(self, **changes):
+        """Apply input changes and invalidate only the dependent pieces."""
+        growth_changed = retention_changed = capacity_changed = False
+        for name, value in changes.items():
+            if name in GROWTH_INPUTS:
+                growth_changed |= not _same(getattr(self, name), value)
+                setattr(self, name, value)
+            elif name in RETENTION_INPUTS:
+                retention_changed |= not _same(getattr(self, name), value)
+                setattr(self, name, value)
+            elif name in CAPACITY_DEFAULTS:
+                capacity_changed |= not _same(self.capacity_inputs[name], value)
+                self.capacity_inputs[name] = value
+            else:
+                raise TypeError(f"Unknown projection input: {name}")
+
+        if growth_changed:
+            self._curve = None
+            self._curve_months = None
+        if growth_changed or retention_changed:
+            self._window = None
+            self._window_months = None
+        if capacity_changed:
+            self._base = None
+        if growth_changed or retention_changed or capacity_changed:
+            self._series = {}
+        return self
+
+    @property
+    def days(self):
+        return horizon_days(self.horizon_years)
+
+    @property
+    def curve(self):
+        if self._curve is None:
+            self._curve = growth_curve(self.monthly_growth_pct, self.days)
+        return self._curve
+
+    @property
+    def window(self):
+        if self._window is None:
+            self._window = retention_window(self.curve, self.retention_days)
+        return self._window
+
+    @property
+    def base(self):
+        if self._base is None:
+            self._base = estimate_capacity(**self.capacity_inputs)
+        return self._base
+
+    def series(self, name):
+        """Daily series for ``dau``, ``qps``, ``peak_qps``, ``daily_ingest_gb``, ``storage_gb`` or ``egress_gb``."""
+        if name not in self._series:
+            self._series[name] = self._build_series(name)
+        return self._series[name]
+
+    def _build_series(self, name):
+        base = self.base
+        if name == "dau":
+            start = np.asarray(self.capacity_inputs["dau"], dtype=np.float64)
+            return start[..., np.newaxis] * self.curve
+        if name in ("qps", "peak_qps"):
+            return base[name][..., np.newaxis] * self.curve
+        if name == "daily_ingest_gb":
+            return base["storage_gb"][..., np.newaxis] * self.curve
+        if name == "storage_gb":
+            # Live bytes are every day's ingest still inside the retention window.
+            return base["storage_gb"][..., np.newaxis] * self.window
+        if name == "egress_gb":
+            egress_gb_per_day = base["egress_mb_per_sec"] * SECONDS_PER_DAY / MB_PER_GB
+            return egress_gb_per_day[..., np.newaxis] * self.curve
+        raise KeyError(f"Unknown projection series: {name}")
+
+    def daily(self):
+        return {
+            name: self.series(name)
+            for name in ("dau", "qps", "peak_qps", "daily_ingest_gb", "storage_gb", "egress_gb")
+        }
+
+    def _month_bounds(self):
+        starts = month_starts(self.days)
+        ends = np.append(starts[1:], self.days) - 1
+        return starts, ends
+
+    @property
+    def curve_months(self):
+        """Per-month max, sum and last value of the growth curve."""
+        if self._curve_months is None:
+            starts, ends = self._month_bounds()
+            self._curve_months = {
+                "max": np.maximum.reduceat(self.curve, starts, axis=-1),
+                "sum": np.add.reduceat(self.curve, starts, axis=-1),
+                "end": self.curve[..., ends],
+            }
+        return self._curve_months
+
+    @property
+    def window_months(self):
+        """Retention window value on the last day of each month."""
+        if self._window_months is None:
+            _, ends = self._month_bounds()
+            self._window_months = self.window[..., ends]
+        return self._window_months
+
+    def monthly(self):
+        """Per-month sizing: peak of the daily peaks, end-of-month storage, total egress.
+
+        Every series is a non-negative day-0 value times the growth curve, so
+        the monthly reductions of the curve are computed once and rescaled.
+        """
+        base = self.base
+        curve = self.curve_months
+        dau = np.asarray(self.capacity_inputs["dau"], dtype=np.float64)
+        egress_gb_per_day = base["egress_mb_per_sec"] * SECONDS_PER_DAY / MB_PER_GB
+        return {
+            "month": np.arange(1, curve["max"].shape[-1] + 1),
+            "dau": dau[..., np.newaxis] * curve["end"],
+            "qps": base["qps"][..., np.newaxis] * curve["max"],
+            "peak_qps": base["peak_qps"][..., np.newaxis] * curve["max"],
+            "storage_gb": base["storage_gb"][..., np.newaxis] * self.window_months,
+            "egress_gb": egress_gb_per_day[..., np.newaxis] * curve["sum"],
+        }
+
+    def at_month(self, month):
+        """Sizing figures for 1-based ``month``, e.g. ``at_month(18)``."""
+        monthly = self.monthly()
+        index = min(max(int(month), 1), len(monthly["month"])) - 1
+        return {name: values[..., index] for name, values in monthly.items() if name != "month"}
+
+
+def project_growth(monthly_growth_pct=10, horizon_years=1, retention_days=180, **capacity_inputs):
+    """One-shot monthly projection; use :class:`GrowthProjection` to update incrementally."""
+    return GrowthProjection(monthly_growth_pct, horizon_years, retention_days, **capacity_inputs).monthly()
+
+
+def _same(old, new):
+    if old is new:
+        return True
+    try:
+        return bool(np.array_equal(old, new))
+    except TypeError:
+        return False
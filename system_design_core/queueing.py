@@ -0,0 +1,508 @@
+"""Queueing-model latency and fleet sizing against a P95 latency target.
+
+Each synchronous layer is an M/M/c queue: ``c`` servers (instances x
+per-instance concurrency) fed by Poisson arrivals at the layer's share of peak
+QPS, with exponential service times. Layers behind the cache only see cache
+misses. For an M/M/c queue the response time is ``W + S`` where the wait ``W``
+is 0 with probability ``1 - C`` (Erlang C) and exponential at rate
+``c*mu - lambda`` otherwise, which gives the exact tail used here.
+
+The latency budget comes from the end-to-end path: its idle P95 (the sum of
+every layer's service time, with the behind-cache layers only on a miss) is
+the floor, and every layer may take the same multiple of its own service-time
+quantile that the target is of that floor.
+
+The smallest ``c`` meeting a layer's latency budget is found with one pass of
+the Erlang B recurrence ``1/B(k) = 1 + (k/a) / B(k-1)``, advanced in lockstep
+for every layer and scenario at once. It starts ``8*sqrt(a)`` below the
+offered load ``a`` (the start-up error decays by about ``e**-32`` before it
+matters), so the cost tracks ``sqrt(a)`` plus headroom rather than ``a``, and
+``size_layers`` carries it on from the search to the provisioned capacity.
+"""
+import math
+
+import numpy as np
+
+DEFAULT_QUANTILE = 0.95
+DEFAULT_MAX_UTILIZATION = 0.85
+MAX_RECURRENCE_STEPS = 200_000
+# Bracketed Newton steps per quantile: on these smooth tails 8 reach about 1e-13 relative.
+QUANTILE_STEPS = 8
+
+# Keyword in a layer name -> profile; first match wins, so order matters.
+# "sync" layers sit on the request path; "async" ones are sized elsewhere.
+LAYER_PROFILES = (
+    ("CDN", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Observability", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Queue", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Standby", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Audit", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Notification", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Push", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Data Lake", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Warehouse", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Training", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Stream Processor", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    # Sized by the LLM serving model against time to first token (llm.py).
+    ("LLM", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Batch", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Workers", {"service_ms": 0.0, "concurrency": 1, "path": "async", "behind_cache": False}),
+    ("Cache", {"service_ms": 1.0, "concurrency": 64, "path": "sync", "behind_cache": False}),
+    ("Gateway", {"service_ms": 2.0, "concurrency": 256, "path": "sync", "behind_cache": False}),
+    ("Load Balancer", {"service_ms": 1.0, "concurrency": 512, "path": "sync", "behind_cache": False}),
+    ("Frontend", {"service_ms": 5.0, "concurrency": 128, "path": "sync", "behind_cache": False}),
+    ("Ingest", {"service_ms": 5.0, "concurrency": 128, "path": "sync", "behind_cache": False}),
+    ("Presence", {"service_ms": 2.0, "concurrency": 256, "path": "sync", "behind_cache": False}),
+    ("Log", {"service_ms": 5.0, "concurrency": 64, "path": "sync", "behind_cache": False}),
+    ("Vault", {"service_ms": 5.0, "concurrency": 32, "path": "async", "behind_cache": False}),
+    ("Object Store", {"service_ms": 30.0, "concurrency": 64, "path": "sync", "behind_cache": True}),
+    ("DB", {"service_ms": 10.0, "concurrency": 16, "path": "sync", "behind_cache": True}),
+    ("Store", {"service_ms": 10.0, "concurrency": 16, "path": "sync", "behind_cache": True}),
+    ("Index", {"service_ms": 10.0, "concurrency": 16, "path": "sync", "behind_cache": True}),
+)
+DEFAULT_PROFILE = {"service_ms": 20.0, "concurrency": 32, "path": "sync", "behind_cache": False}
+
+
+def layer_profile(layer, overrides=None):
+    """Service time, concurrency, path and cache placement for a layer name."""
+    if overrides and layer in overrides:
+        return {**DEFAULT_PROFILE, **overrides[layer]}
+    for keyword, profile in LAYER_PROFILES:
+        if keyword in layer:
+            return profile
+    return DEFAULT_PROFILE
+
+
+def response_time_tail(t, servers, arrival_rate, service_rate, erlang_c):
+    """``P(T > t)`` for an M/M/c queue, given its Erlang C probability."""
+    mu = service_rate
+    theta = servers * mu - arrival_rate
+    with np.errstate(over="ignore"):
+        return _tail_from_exps(t, mu, theta, np.exp(-mu * t), np.exp(-theta * t), erlang_c)
+
+
+def _tail_from_exps(t, mu, theta, exp_mu, exp_theta, erlang_c):
+    """:func:`response_time_tail` from ``exp(-mu*t)`` and ``exp(-theta*t)``, ``theta = c*mu - lambda``."""
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        gap = theta - mu
+        mixed = (theta * exp_mu - mu * exp_theta) / gap
+        near = np.abs(gap) <= 1e-9 * mu
+        mixed = np.where(near, (1 + mu * t) * exp_mu, mixed)
+    return (1 - erlang_c) * exp_mu + erlang_c * mixed
+
+
+def _slope_from_exps(t, mu, theta, exp_mu, exp_theta, erlang_c):
+    """``d/dt P(T > t)`` for an M/M/c queue (minus the response-time density), like :func:`_tail_from_exps`."""
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        gap = theta - mu
+        mixed = theta * mu * (exp_theta - exp_mu) / gap
+        near = np.abs(gap) <= 1e-9 * mu
+        mixed = np.where(near, -mu * mu * t * exp_mu, mixed)
+    return -(1 - erlang_c) * mu * exp_mu + erlang_c * mixed
+
+
+def _newton_quantile(tail_and_slope, tail_limit, high, steps):
+    """Where a decreasing tail crosses ``tail_limit`` in ``(0, high)``, elementwise.
+
+    Newton steps on the log of the tail, which is nearly linear for these
+    exponential-type tails, kept inside a bracket that every evaluation
+    narrows; a step that would leave the bracket halves it instead.
+    """
+    low = np.zeros(high.shape)
+    t = high / 2
+    for _ in range(steps):
+        tail, slope = tail_and_slope(t)
+        above = tail > tail_limit
+        low = np.where(above, t, low)
+        high = np.where(above, high, t)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            step = t - np.log(tail / tail_limit) * tail / slope
+        t = np.where((step > 0) & (step >= low) & (step <= high), step, (low + high) / 2)
+    return t
+
+
+def erlang_c(servers, offered_load):
+    """Probability an arrival waits in M/M/c (1.0 when the queue is unstable)."""
+    servers = np.asarray(servers, dtype=np.float64)
+    load = np.asarray(offered_load, dtype=np.float64)
+    servers, load = np.broadcast_arrays(servers, load)
+    inv_b = _inverse_erlang_b(servers, load)
+    b = 1 / inv_b
+    rho = np.where(servers > 0, load / np.maximum(servers, 1), np.inf)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c = b / (1 - rho * (1 - b))
+    return np.where(rho < 1, c, 1.0)
+
+
+def _start_state(load):
+    """Recurrence start ``k0`` and an estimate of ``1/B(k0)`` that washes out."""
+    k0 = np.maximum(np.floor(load - 8 * np.sqrt(load)), 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inv_b = np.where(k0 > 0, load / np.maximum(load - k0, 1e-12), 1.0)
+    return k0, inv_b
+
+
+def _advance_inverse_b(k, inv_b, load, until):
+    """``(k, 1/B(k))`` stepped up to ``until`` (where ``k`` is below it), elementwise.
+
+    Each element's step count is known up front, so elements are ordered by
+    it and every step updates a shrinking prefix in place: no masks or copies.
+    """
+    steps = np.maximum(until - k, 0).astype(np.int64)
+    order = np.argsort(-steps, kind="stable")
+    remaining = -steps[order]
+    k, inv_b, load = k[order].astype(np.float64), inv_b[order].astype(np.float64), load[order]
+    scratch = np.empty(k.shape)
+    with np.errstate(divide="ignore", over="ignore", invalid="ignore"):
+        for step in range(-int(remaining[0]) if remaining.size else 0):
+            n = np.searchsorted(remaining, -step)
+            k[:n] += 1
+            np.divide(k[:n], load[:n], out=scratch[:n])
+            inv_b[:n] *= scratch[:n]
+            inv_b[:n] += 1
+    unsorted = np.empty_like(order)
+    unsorted[order] = np.arange(order.size)
+    return k[unsorted], inv_b[unsorted]
+
+
+def _inverse_erlang_b(servers, load):
+    shape = load.shape
+    servers, load = servers.ravel(), load.ravel()
+    k, inv_b = _start_state(load)
+    # Once 1/B overflows it stays inf: B (and so C) is zero for every larger k too.
+    inv_b = _advance_inverse_b(k, inv_b, load, servers)[1]
+    return np.where(load > 0, inv_b, 1.0).reshape(shape)
+
+
+def _smallest_servers(lam, mu, target, eligible, tail_limit, tail):
+    """Smallest stable server count whose ``tail`` at ``target`` is within ``tail_limit``.
+
+    ``tail(c, theta, mu, t, exp_mu, exp_theta)`` gets the Erlang C probability,
+    ``theta = c*mu - lambda`` and both exponentials at ``t``. One Erlang B
+    recurrence serves the whole search: it runs unchecked up to the offered
+    load, then checks each stable count, stepping ``exp(-theta*t)`` by the
+    constant factor ``exp(-mu*t)`` instead of recomputing it. Returns the
+    counts (0 where there are no arrivals, -1 where not ``eligible``) and
+    ``1/B`` at each count, so callers can carry the recurrence further.
+    """
+    lam, mu, target = np.broadcast_arrays(
+        np.asarray(lam, dtype=np.float64),
+        np.asarray(mu, dtype=np.float64),
+        np.asarray(target, dtype=np.float64),
+    )
+    shape = lam.shape
+    lam, mu, target = lam.ravel(), mu.ravel(), target.ravel()
+    eligible = np.broadcast_to(eligible, shape).ravel()
+    result = np.full(lam.shape, -1, dtype=np.int64)
+    result[lam <= 0] = 0
+    state = np.ones(lam.shape)
+
+    idx = np.flatnonzero((lam > 0) & eligible)
+    lam, mu, target = lam[idx], mu[idx], target[idx]
+    load = lam / mu
+    k, inv_b = _advance_inverse_b(*_start_state(load), load, np.floor(load))
+    k = k + 1
+    inv_b = 1 + k / load * inv_b
+    theta = k * mu - lam
+    exp_mu = np.exp(-mu * target)
+    exp_theta = np.exp(-theta * target)
+    steps = 0
+    while idx.size and steps < MAX_RECURRENCE_STEPS:
+        steps += 1
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            b = 1 / inv_b
+            c = b / (1 - load / k * (1 - b))
+            done = tail(c, theta, mu, target, exp_mu, exp_theta) <= tail_limit
+        if done.any():
+            result[idx[done]] = k[done]
+            state[idx[done]] = inv_b[done]
+            keep = ~done
+            idx, k, inv_b, theta, exp_theta = idx[keep], k[keep], inv_b[keep], theta[keep], exp_theta[keep]
+            lam, mu, target, load, exp_mu = lam[keep], mu[keep], target[keep], load[keep], exp_mu[keep]
+        k = k + 1
+        with np.errstate(over="ignore"):
+            inv_b = 1 + k / load * inv_b
+        theta = theta + mu
+        exp_theta = exp_theta * exp_mu
+    return result.reshape(shape), state.reshape(shape)
+
+
+def min_servers(arrival_rate, service_rate, target_s, quantile=DEFAULT_QUANTILE):
+    """Smallest server count whose response-time ``quantile`` is within ``target_s``.
+
+    Returns -1 where the target is below what even an idle server can do.
+    """
+    return _min_servers_state(arrival_rate, service_rate, target_s, quantile)[0]
+
+
+def _min_servers_state(arrival_rate, service_rate, target_s, quantile):
+    mu, target = np.asarray(service_rate, dtype=np.float64), np.asarray(target_s, dtype=np.float64)
+    # Even with no queueing the service time alone must meet the target.
+    eligible = np.exp(-mu * target) < 1 - quantile
+    return _smallest_servers(
+        arrival_rate,
+        mu,
+        target,
+        eligible,
+        1 - quantile,
+        lambda c, theta, mu, t, exp_mu, exp_theta: _tail_from_exps(t, mu, theta, exp_mu, exp_theta, c),
+    )
+
+
+def min_servers_for_wait(arrival_rate, service_rate, target_s, quantile=DEFAULT_QUANTILE):
+    """Smallest server count whose queueing-delay ``quantile`` is within ``target_s``.
+
+    The wait tail is ``P(W > t) = C * exp(-(c*mu - lambda) * t)``. Returns -1
+    where ``target_s`` is negative.
+    """
+    target = np.asarray(target_s, dtype=np.float64)
+    return _smallest_servers(
+        arrival_rate,
+        service_rate,
+        target,
+        target >= 0,
+        1 - quantile,
+        lambda c, theta, mu, t, exp_mu, exp_theta: c * exp_theta,
+    )[0]
+
+
+def response_time_quantile(servers, arrival_rate, service_rate, quantile=DEFAULT_QUANTILE):
+    """Response-time ``quantile`` in seconds for M/M/c (inf when unstable), by bracketed Newton."""
+    servers, lam, mu = np.broadcast_arrays(
+        np.asarray(servers, dtype=np.float64),
+        np.asarray(arrival_rate, dtype=np.float64),
+        np.asarray(service_rate, dtype=np.float64),
+    )
+    return _response_time_quantile(servers, lam, mu, erlang_c(servers, lam / mu), quantile)
+
+
+def _response_time_quantile(servers, lam, mu, c, quantile):
+    stable = servers * mu > lam
+    theta = np.where(stable, servers * mu - lam, 1.0)
+    # (1 + x) e^-x bounds the tail at the slower of the two rates; this x is past it.
+    high = (2 - 2 * math.log(1 - quantile)) / np.minimum(mu, theta)
+
+    def tail_and_slope(t):
+        with np.errstate(over="ignore"):
+            exp_mu, exp_theta = np.exp(-mu * t), np.exp(-theta * t)
+        return _tail_from_exps(t, mu, theta, exp_mu, exp_theta, c), _slope_from_exps(t, mu, theta, exp_mu, exp_theta, c)
+
+    quantile_s = _newton_quantile(tail_and_slope, 1 - quantile, high, QUANTILE_STEPS)
+    return np.where(stable, quantile_s, np.inf)
+
+
+def on_unique(func, *arrays):
+    """``func(*arrays)`` evaluated once per distinct combination of broadcast values.
+
+    ``func`` gets 1-D arrays of the distinct combinations and returns one
+    array (or a tuple of arrays) over them; results come back in the
+    broadcast shape of ``arrays``.
+    """
+    arrays, first, inverse = _distinct(*arrays)
+    result = func(*(array.ravel()[first] for array in arrays))
+    if isinstance(result, tuple):
+        return tuple(part[inverse].reshape(arrays[0].shape) for part in result)
+    return result[inverse].reshape(arrays[0].shape)
+
+
+def _distinct(*arrays):
+    """The broadcast ``arrays``, the flat index of each distinct combination and every point's combination."""
+    originals = [np.asarray(a, dtype=np.float64) for a in arrays]
+    arrays = np.broadcast_arrays(*originals)
+    # Inputs broadcast from a single value cannot tell points apart, so only the others are sorted.
+    varying = [array for array, original in zip(arrays, originals) if original.size > 1]
+    if len(varying) == 1:
+        code = varying[0].ravel()
+    else:
+        code = np.zeros(arrays[0].size, dtype=np.int64)
+        for array in varying:
+            values, inverse = np.unique(array, return_inverse=True)
+            code = code * values.size + inverse.ravel()
+    first, inverse = np.unique(code, return_index=True, return_inverse=True)[1:]
+    return arrays, first, inverse
+
+
+def _path_survival(rates, uniform_rate, steps):
+    """``P(not through every phase after k jumps)`` for ``k = 0..steps`` of a uniformized phase chain.
+
+    Each phase takes a geometric number of jumps, so the jumps to get through
+    all of them are the convolution of those distributions: a product of their
+    (closed-form) spectra. The transform wraps mass from ``size`` jumps on;
+    four times the horizon puts that below double precision here.
+    """
+    size = 1 << (4 * (steps + 1)).bit_length()
+    omega = np.exp(-2j * np.pi * np.arange(size // 2 + 1) / size)
+    spectrum = np.ones(size // 2 + 1, dtype=complex)
+    for rate in rates:
+        advance = rate / uniform_rate
+        stay = 1 - advance
+        spectrum *= advance * (omega - stay ** (size - 1)) / (1 - stay * omega)
+    return 1 - np.cumsum(np.fft.irfft(spectrum, size)[: steps + 1])
+
+
+def idle_path_quantile(front_rates, back_rates, miss, quantile=DEFAULT_QUANTILE):
+    """Latency ``quantile`` in seconds of a request path with no queueing.
+
+    Every request takes an exponential service time at each of ``front_rates``
+    (per second); cache misses, a ``miss`` fraction, also take ``back_rates``.
+    The path sums are phase-type, so the tail is exact by uniformization;
+    ``miss`` may be an array.
+    """
+    miss = np.asarray(miss, dtype=np.float64)
+    rates = list(front_rates) + list(back_rates)
+    if not rates:
+        return np.zeros(miss.shape)
+    uniform_rate = max(rates)
+    # An Erlang of n phases at the slowest rate dominates the path; this is past its quantile.
+    slowest = min(rates)
+    high = (len(rates) + 3 * math.sqrt(len(rates)) - math.log(1 - quantile)) / slowest
+    mean_jumps = uniform_rate * high
+    steps = int(mean_jumps + 10 * math.sqrt(mean_jumps) + 20)
+    front = _path_survival(front_rates, uniform_rate, steps + 1)
+    full = _path_survival(rates, uniform_rate, steps + 1)
+    # The tail is sum_k w_k(t) S_k over Poisson weights w_k; its slope is rate * sum_k w_k(t) (S_{k+1} - S_k).
+    columns = np.column_stack([front[:-1], full[:-1], np.diff(front) * uniform_rate, np.diff(full) * uniform_rate])
+    jumps = np.arange(steps + 1)
+    log_factorial = np.r_[0.0, np.cumsum(np.log(jumps[1:]))]
+    flat_miss = miss.ravel()
+
+    def tail_and_slope(t):
+        mean = uniform_rate * t[:, None]
+        front_tail, full_tail, front_slope, full_slope = (np.exp(jumps * np.log(mean) - mean - log_factorial) @ columns).T
+        return (
+            (1 - flat_miss) * front_tail + flat_miss * full_tail,
+            (1 - flat_miss) * front_slope + flat_miss * full_slope,
+        )
+
+    quantile_s = _newton_quantile(tail_and_slope, 1 - quantile, np.full(flat_miss.shape, high), QUANTILE_STEPS)
+    # Where the chain may skip every phase often enough (no front layers, few misses), the quantile is 0.
+    at_zero = (1 - flat_miss) * front[0] + flat_miss * full[0]
+    return np.where(at_zero <= 1 - quantile, 0.0, quantile_s).reshape(miss.shape)
+
+
+def size_layers(
+    peak_qps,
+    layers,
+    p95_target_ms,
+    cache_hit_rate=0,
+    quantile=DEFAULT_QUANTILE,
+    max_utilization=DEFAULT_MAX_UTILIZATION,
+    profiles=None,
+):
+    """Instance count per synchronous layer so the chain meets the latency target.
+
+    The floor is the request path's idle ``quantile`` (no queueing; layers
+    behind the cache only on a miss). Each layer's budget is its own
+    service-time quantile times ``target / floor``, so if every layer's
+    response time stays within that multiple of its service time, the whole
+    path stays within the target. ``p95_bound_ms`` is the floor times the
+    largest multiple a sized layer actually uses.
+    ``peak_qps``, ``p95_target_ms``, ``cache_hit_rate`` and ``max_utilization``
+    may be arrays; each queue is solved once per distinct arrival rate and budget.
+    Returns ``{"layers": {name: {...}}, "p95_bound_ms": ..., "p95_floor_ms": ...,
+    "feasible": ...}``; instance counts are -1 where the target is at or below the floor.
+    """
+    peak_qps = np.asarray(peak_qps, dtype=np.float64)
+    target_s = np.asarray(p95_target_ms, dtype=np.float64) / 1000
+    miss = 1 - np.asarray(cache_hit_rate, dtype=np.float64) / 100
+    max_utilization = np.asarray(max_utilization, dtype=np.float64)
+    floor_factor = -math.log(1 - quantile)
+
+    sync = [(layer, layer_profile(layer, profiles)) for layer in layers]
+    sync = [(layer, p) for layer, p in sync if p["path"] == "sync" and p["service_ms"] > 0]
+    floor_s = on_unique(
+        lambda miss: idle_path_quantile(
+            [1000 / p["service_ms"] for _, p in sync if not p["behind_cache"]],
+            [1000 / p["service_ms"] for _, p in sync if p["behind_cache"]],
+            miss,
+            quantile,
+        ),
+        miss,
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(floor_s > 0, target_s / floor_s, np.inf)
+
+    sized = {}
+    shape = np.broadcast_shapes(peak_qps.shape, target_s.shape, miss.shape, max_utilization.shape)
+    used_scale = np.zeros(shape)
+    feasible = np.ones(shape, dtype=bool)
+    for layer, profile in sync:
+        mu = 1000 / profile["service_ms"]
+        lam = peak_qps * (miss if profile["behind_cache"] else 1)
+        budget = scale * floor_factor / mu
+        servers, inv_b = on_unique(lambda lam, budget: _min_servers_state(lam, mu, budget, quantile), lam, budget)
+        concurrency = profile["concurrency"]
+        instances = np.ceil(servers / concurrency)
+        headroom = np.ceil(lam / mu / (concurrency * max_utilization))
+        instances = np.where(servers < 0, -1, np.maximum(np.maximum(instances, headroom), np.where(lam > 0, 1, 0)))
+        capacity = np.maximum(instances, 0) * concurrency
+        layer_p95 = _provisioned_p95(servers, inv_b, capacity, lam, mu, quantile)
+        used_scale = np.maximum(used_scale, layer_p95 * mu / floor_factor)
+        feasible &= instances >= 0
+        sized[layer] = {
+            "arrival_qps": lam,
+            "instances": instances.astype(np.int64),
+            "servers": capacity,
+            "utilization": np.where(capacity > 0, lam / mu / np.maximum(capacity, 1), 0.0),
+            "p95_ms": layer_p95 * 1000,
+            "service_ms": profile["service_ms"],
+            "behind_cache": profile["behind_cache"],
+        }
+    feasible = np.broadcast_to(feasible & (scale > 1), shape)
+    return {
+        "layers": sized,
+        "p95_bound_ms": np.where(feasible, floor_s * np.maximum(used_scale, 1) * 1000, np.inf),
+        "p95_floor_ms": np.broadcast_to(floor_s * 1000, shape),
+        "feasible": feasible,
+    }
+
+
+def _provisioned_p95(servers, inv_b, capacity, lam, mu, quantile):
+    """Response-time quantile at ``capacity``, stepping on from ``1/B(servers)`` (0 where unprovisioned).
+
+    Solved once per distinct capacity and arrival rate. Any point's search
+    state will do for the others: ``1/B`` at a count depends only on the load.
+    """
+    (capacity, lam), first, inverse = _distinct(capacity, lam)
+    shape = lam.shape
+    servers = np.broadcast_to(servers, shape).ravel()[first]
+    inv_b = np.broadcast_to(inv_b, shape).ravel()[first]
+    capacity, lam = capacity.ravel()[first], lam.ravel()[first]
+    live = np.flatnonzero(capacity > 0)
+    start = servers[live].astype(np.float64)
+    capacity, lam = capacity[live], lam[live]
+    load = lam / mu
+    inv_b = _advance_inverse_b(start, inv_b[live], load, capacity)[1]
+    b = 1 / inv_b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        c = np.where(load < capacity, b / (1 - load / capacity * (1 - b)), 1.0)
+    p95 = np.zeros(first.size)
+    p95[live] = _response_time_quantile(capacity, lam, mu, c, quantile)
+    return p95[inverse].reshape(shape)
+
+
+def end_to_end_p95_ms(sizing, cache_hit_rate=0, quantile=DEFAULT_QUANTILE, samples=200_000, seed=0):
+    """Simulated end-to-end latency quantile for one sized scenario.
+
+    Samples each layer's M/M/c response time and skips behind-cache layers on
+    a hit, so it checks the scaled bound from :func:`size_layers`.
+    """
+    rng = np.random.default_rng(seed)
+    hit = rng.random(samples) < cache_hit_rate / 100
+    total = np.zeros(samples)
+    for layer in sizing["layers"].values():
+        servers = float(layer["servers"])
+        if servers <= 0:
+            return math.inf
+        mu = 1000 / layer["service_ms"]
+        lam = float(layer["arrival_qps"])
+        if lam >= servers * mu:
+            return math.inf
+        wait_prob = float(erlang_c(servers, lam / mu))
+        latency = rng.exponential(1 / mu, samples)
+        waits = rng.random(samples) < wait_prob
+        latency[waits] += rng.exponential(1 / (servers * mu - lam), int(waits.sum()))
+        if layer["behind_cache"]:
+            latency[hit] = 0
+        total += latency
+    return float(np.quantile(total, quantile) * 1000)
@@ -0,0 +1,496 @@
+"""Local HTTP/JSON API over the v3.1 design calculations.
+
+    python -m system_design_core.server --port 8765 --workers 4
+
+Endpoints (every POST body is a JSON object):
+
+``GET /health``
+    ``{"status": "ok"}``.
+``GET /defaults``
+    ``DESIGN_DEFAULTS`` and the known problem types.
+``GET /stats``
+    Request counters, worker pool load and the shared result cache's stats.
+``POST /capacity``
+    One scenario's capacity metrics.
+``POST /design``
+    Capacity, architecture layers, trade-offs and the export summary row.
+    ``"include": ["fleet", "availability"]`` adds the queueing fleet sizing and
+    the availability assessment, which run in the worker pool. Availability is
+    ``null`` when the fleet cannot meet the P95 target.
+``POST /batch``
+    ``{"scenarios": [...]}`` returns the export summary row of each scenario,
+    evaluated as arrays like ``python -m system_design_core.batch``.
+
+A scenario uses the input names from ``DESIGN_DEFAULTS`` or the export
+headers ("DAU", ...). Missing inputs come from its ``problem_type`` catalog
+entry when given, else from the defaults. Unknown inputs get a 422.
+
+The server is one asyncio event loop. Responses go through the shared
+:class:`~system_design_core.cache.ResultCache` keyed by path and body, so a
+repeated request is a hash and a lookup. Fleet sizing, availability and large
+batches run in a process pool. Identical requests in flight share one
+computation. At most ``max_concurrency`` pool jobs run at once, and past
+``max_queue`` waiting jobs the server answers 503 instead of queueing more.
+Only the standard library and NumPy are used.
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+from .batch import COLUMN_ALIASES, TOGGLE_INPUTS, _as_bool, export_columns, records_inputs
+from .cache import canonical_key, shared_cache
+from .capacity import estimate_capacity
+from .catalog import load_catalog
+from .design import (
+    ARCHITECTURE_INPUTS,
+    CAPACITY_INPUTS,
+    DESIGN_DEFAULTS,
+    SUMMARY_INPUTS,
+    TRADEOFF_INPUTS,
+    architecture_layers,
+    availability_assessment,
+    design_tradeoffs,
+    fleet_sizing,
+    summary_row,
+)
+
+SERVER_DEFAULTS = {
+    "host": "127.0.0.1",
+    "port": 8765,
+    "workers": 2,             # worker processes; 0 runs jobs in one thread instead
+    "max_concurrency": 8,     # jobs running in the pool at once
+    "max_queue": 256,         # jobs waiting for a slot before requests get 503
+    "max_body_mb": 8,
+    "max_batch": 100_000,     # scenarios per /batch request
+    "inline_batch": 256,      # batches up to this size run on the event loop
+}
+DESIGN_EXTRAS = ("fleet", "availability")
+
+_MAX_HEADER_BYTES = 16 * 1024
+
+
+class RequestError(Exception):
+    """A request the API rejects; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = HTTPStatus(status)
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _finite(value):
+    """``value`` with every NaN or infinite float replaced by None."""
+    if isinstance(value, (np.generic, np.ndarray)):
+        value = value.tolist()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def encode_json(payload):
+    """Compact UTF-8 JSON; NumPy scalars and arrays become plain numbers and lists.
+
+    NaN and infinity are not JSON, so non-finite outputs (an infeasible
+    fleet's P95 bound, say) are encoded as null.
+    """
+    try:
+        return json.dumps(payload, default=_json_default, separators=(",", ":"), allow_nan=False).encode()
+    except ValueError:
+        return json.dumps(_finite(payload), default=_json_default, separators=(",", ":"), allow_nan=False).encode()
+
+
+def scenario_inputs(scenario):
+    """Full v3.1 inputs of one scenario dict, as plain Python values.
+
+    The one-row form of :func:`~system_design_core.batch.records_inputs`,
+    without building arrays.
+    """
+    if not isinstance(scenario, dict):
+        raise RequestError(422, "A scenario must be a JSON object")
+    scenario = {COLUMN_ALIASES.get(key, key): value for key, value in scenario.items()}
+    problem_type = scenario.pop("problem_type", None)
+    unknown = sorted(set(scenario) - set(DESIGN_DEFAULTS))
+    if unknown:
+        raise RequestError(422, f"Unknown scenario inputs: {unknown}")
+    defaults = DESIGN_DEFAULTS
+    if problem_type is not None:
+        catalog = load_catalog()
+        # A list or object is unhashable, so check the type before the catalog lookup.
+        if not isinstance(problem_type, str) or problem_type not in catalog:
+            raise RequestError(422, f"Unknown problem types: {[problem_type]}")
+        defaults = {**DESIGN_DEFAULTS, **catalog.design_inputs(problem_type)}
+    inputs = {}
+    for name, default in DESIGN_DEFAULTS.items():
+        value = scenario.get(name)
+        if value is None:
+            value = defaults[name]
+        try:
+            if name in TOGGLE_INPUTS:
+                value = value if isinstance(value, bool) else bool(_as_bool(value))
+            elif isinstance(default, str):
+                if not isinstance(value, str):
+                    raise TypeError(f"must be a string, got {value!r}")
+            else:
+                value = float(value)
+                if not math.isfinite(value):
+                    raise ValueError(f"must be a finite number, got {value}")
+        except (TypeError, ValueError) as exc:
+            raise RequestError(422, f"{name}: {exc}") from exc
+        inputs[name] = value
+    return inputs
+
+
+def design_payload(inputs):
+    """Capacity, layers, trade-offs and export row of one resolved scenario."""
+    capacity = {name: float(value) for name, value in estimate_capacity(**{n: inputs[n] for n in CAPACITY_INPUTS}).items()}
+    layers = architecture_layers(*(inputs[name] for name in ARCHITECTURE_INPUTS))
+    tradeoffs = design_tradeoffs(*(inputs[name] for name in TRADEOFF_INPUTS))
+    return {
+        "inputs": inputs,
+        "capacity": capacity,
+        "architecture": layers,
+        "tradeoffs": tradeoffs,
+        "summary": summary_row(capacity, layers, tradeoffs, *(inputs[name] for name in SUMMARY_INPUTS)),
+    }
+
+
+def design_extras(inputs, capacity, layers, include):
+    """Fleet sizing and/or availability of one design; CPU-bound, so run in the pool."""
+    fleet = fleet_sizing(capacity, None, layers, inputs["p95_target_ms"], inputs["cache_hit_rate"])
+    extras = {"fleet": fleet} if "fleet" in include else {}
+    if "availability" in include:
+        extras["availability"] = availability_assessment(
+            fleet, layers, inputs["sla"], inputs["rpo"], inputs["rto"], inputs["zone_failure_correlation"]
+        )
+    # Encoded here so the parent process receives plain JSON types.
+    return json.loads(encode_json(extras))
+
+
+def batch_rows(scenarios):
+    """Export summary rows for a list of scenario dicts, evaluated as arrays."""
+    inputs = records_inputs(scenarios)
+    capacity = estimate_capacity(**{name: inputs[name] for name in CAPACITY_INPUTS})
+    columns = {name: np.asarray(values).tolist() for name, values in export_columns(inputs, capacity).items()}
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def batch_payload(scenarios):
+    """The encoded ``/batch`` response body."""
+    return encode_json({"count": len(scenarios), "results": batch_rows(scenarios)})
+
+
+class EstimationServer:
+    """The asyncio HTTP/1.1 server; create it inside a running event loop, or use :func:`serve_in_thread`."""
+
+    def __init__(self, cache=None, **options):
+        unknown = sorted(set(options) - set(SERVER_DEFAULTS))
+        if unknown:
+            raise TypeError(f"Unknown server options: {unknown}")
+        self.options = {**SERVER_DEFAULTS, **options}
+        self.cache = cache if cache is not None else shared_cache()
+        self.counters = {"requests": 0, "errors": 0, "rejected": 0, "jobs": 0}
+        self._routes = {
+            "/health": ("GET", self._health),
+            "/defaults": ("GET", self._defaults),
+            "/stats": ("GET", self._stats),
+            "/capacity": ("POST", self._capacity),
+            "/design": ("POST", self._design),
+            "/batch": ("POST", self._batch),
+        }
+        self._pool = None
+        self._slots = None
+        self._waiting = 0
+        self._in_flight = {}
+        self._connections = {}
+        self._server = None
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        workers = self.options["workers"]
+        self._pool = ProcessPoolExecutor(workers) if workers > 0 else ThreadPoolExecutor(1)
+        # The first job forks every worker; do it now, before other threads are busy serving.
+        await asyncio.get_running_loop().run_in_executor(self._pool, int)
+        self._slots = asyncio.Semaphore(self.options["max_concurrency"])
+        self._server = await asyncio.start_server(
+            self._connection, self.options["host"], self.options["port"], limit=_MAX_HEADER_BYTES
+        )
+        return self
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        # Idle keep-alive connections would otherwise hold the server open.
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._pool.shutdown(cancel_futures=True)
+
+    # --- HTTP ---
+
+    async def _connection(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, None, False)
+                    return
+                keep_alive = await self._request(head, reader, writer)
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+
+    async def _request(self, head, reader, writer):
+        """Answer one request; returns whether the connection stays open."""
+        self.counters["requests"] += 1
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ")
+        except ValueError:
+            await self._respond(writer, HTTPStatus.BAD_REQUEST, None, False)
+            return False
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+        length = headers.get("content-length", "0")
+        if "transfer-encoding" in headers or not length.isdigit():
+            await self._respond(writer, HTTPStatus.LENGTH_REQUIRED, None, False)
+            return False
+        if int(length) > self.options["max_body_mb"] * 1024 * 1024:
+            await self._respond(writer, HTTPStatus.REQUEST_ENTITY_TOO_LARGE, None, False)
+            return False
+        body = await reader.readexactly(int(length)) if int(length) else b""
+
+        path = target.split("?", 1)[0]
+        try:
+            status, payload = await self._dispatch(method, path, body)
+        except RequestError as exc:
+            self.counters["errors"] += 1
+            status, payload = exc.status, encode_json({"error": str(exc)})
+        except Exception as exc:  # a bug, not a bad request: answer 500 and keep serving
+            self.counters["errors"] += 1
+            traceback.print_exc(file=sys.stderr)
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, encode_json({"error": repr(exc)})
+        await self._respond(writer, status, payload, keep_alive)
+        return keep_alive
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        if payload is None:
+            payload = encode_json({"error": status.phrase})
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        )
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode() + b"\r\n" + payload)
+        await writer.drain()
+
+    async def _dispatch(self, method, path, body):
+        route = self._routes.get(path)
+        if route is None:
+            raise RequestError(404, f"No endpoint {path}")
+        expected, handler = route
+        if method != expected:
+            raise RequestError(405, f"{path} takes {expected}")
+        if method == "GET":
+            return HTTPStatus.OK, encode_json(handler())
+        # Identical bodies get the cached response bytes without being parsed,
+        # and identical requests in flight share one computation.
+        key = canonical_key(__name__, path, body)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return HTTPStatus.OK, cached
+        pending = self._in_flight.get(key)
+        if pending is None:
+            pending = self._in_flight[key] = asyncio.ensure_future(self._compute(key, handler, body))
+        return HTTPStatus.OK, await asyncio.shield(pending)
+
+    async def _compute(self, key, handler, body):
+        try:
+            try:
+                request = json.loads(body)
+            except ValueError as exc:
+                raise RequestError(400, f"Invalid JSON: {exc}") from exc
+            if not isinstance(request, dict):
+                raise RequestError(400, "The request body must be a JSON object")
+            return self.cache.put(key, await handler(request))
+        finally:
+            del self._in_flight[key]
+
+    # --- Worker pool ---
+
+    async def _run_job(self, func, *args):
+        """Run ``func(*args)`` in the pool, waiting for one of ``max_concurrency`` slots."""
+        if self._waiting >= self.options["max_queue"]:
+            self.counters["rejected"] += 1
+            raise RequestError(503, "Too many queued jobs; retry shortly")
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            self.counters["jobs"] += 1
+            return await asyncio.get_running_loop().run_in_executor(self._pool, func, *args)
+        finally:
+            self._slots.release()
+
+    # --- Endpoints ---
+
+    def _health(self):
+        return {"status": "ok"}
+
+    def _defaults(self):
+        return {"inputs": DESIGN_DEFAULTS, "problem_types": load_catalog().names()}
+
+    def _stats(self):
+        return {
+            **self.counters,
+            "waiting_jobs": self._waiting,
+            "in_flight_requests": len(self._in_flight),
+            "cache": self.cache.stats(),
+        }
+
+    async def _capacity(self, request):
+        inputs = scenario_inputs(request)
+        capacity = estimate_capacity(**{name: inputs[name] for name in CAPACITY_INPUTS})
+        return encode_json({"inputs": inputs, "capacity": capacity})
+
+    async def _design(self, request):
+        include = request.pop("include", [])
+        if not isinstance(include, list) or any(name not in DESIGN_EXTRAS for name in include):
+            raise RequestError(422, f"include must be a list drawn from {list(DESIGN_EXTRAS)}")
+        payload = design_payload(scenario_inputs(request))
+        if include:
+            payload.update(await self._run_job(
+                design_extras, payload["inputs"], payload["capacity"], payload["architecture"], sorted(include)
+            ))
+        return encode_json(payload)
+
+    async def _batch(self, request):
+        scenarios = request.get("scenarios")
+        if not isinstance(scenarios, list) or not all(isinstance(s, dict) for s in scenarios):
+            raise RequestError(422, "scenarios must be a list of JSON objects")
+        if len(scenarios) > self.options["max_batch"]:
+            raise RequestError(413, f"At most {self.options['max_batch']:,} scenarios per batch")
+        if not scenarios:
+            return encode_json({"count": 0, "results": []})
+        try:
+            if len(scenarios) <= self.options["inline_batch"]:
+                return batch_payload(scenarios)
+            return await self._run_job(batch_payload, scenarios)
+        except (ValueError, TypeError) as exc:
+            raise RequestError(422, str(exc)) from exc
+
+
+def serve_in_thread(**options):
+    """Start an :class:`EstimationServer` on a background thread's event loop and return it.
+
+    Meant for tests and local clients: ``port=0`` picks a free port (read it
+    from ``server.port``), and ``server.stop()`` shuts it down.
+    """
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    holder = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        try:
+            holder["server"] = loop.run_until_complete(EstimationServer(**options).start())
+        except BaseException as exc:  # reported to the caller below
+            holder["error"] = exc
+            return
+        finally:
+            started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, name="estimation-server", daemon=True)
+    thread.start()
+    started.wait()
+    if "error" in holder:
+        raise holder["error"]
+    server = holder["server"]
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    server.stop = stop
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m system_design_core.server",
+        description="Serve the design calculations as a local HTTP/JSON API.",
+    )
+    parser.add_argument("--host", default=SERVER_DEFAULTS["host"])
+    parser.add_argument("--port", type=int, default=SERVER_DEFAULTS["port"])
+    parser.add_argument("--workers", type=int, default=SERVER_DEFAULTS["workers"],
+                        help="worker processes for fleet sizing and large batches (0 = one thread)")
+    parser.add_argument("--max-concurrency", type=int, default=SERVER_DEFAULTS["max_concurrency"],
+                        help="pool jobs running at once")
+    parser.add_argument("--max-queue", type=int, default=SERVER_DEFAULTS["max_queue"],
+                        help="pool jobs waiting before requests get 503")
+    args = parser.parse_args(argv)
+
+    async def serve():
+        server = await EstimationServer(**vars(args)).start()
+        print(f"Serving on http://{args.host}:{server.port}", file=sys.stderr)
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Shard count, consistent-hashing balance and rebalance traffic under growth.
+
+A node holds ``node_storage_gb`` and serves ``node_qps`` up to
+``max_utilization``, so the shard count is whichever of storage or QPS needs
+more nodes. Keys are placed on a consistent-hashing ring where every node
+owns ``vnodes`` tokens (splitmix64 of the node and vnode ids). A key belongs
+to the first token at or after its hash, so a node's share of the hash space
+is the sum of the arcs ending at its tokens. That share is exact. The
+synthetic keys (hashed the same way, with optional Zipf request popularity)
+measure the key and request load per node. Nodes only ever join, and a
+joining node only takes keys, so the bytes a step moves are the live data
+times the arcs the new nodes win. Modulo placement (``hash % nodes``) is
+reported alongside for comparison: going from ``a`` to ``b`` nodes keeps a
+key in place only when ``hash % lcm(a, b) < a``, so it moves
+``1 - gcd(a, b) / b`` of the data.
+"""
+import numpy as np
+
+from .cachesim import splitmix64
+from .capacity import MB_PER_GB
+
+SHARD_DEFAULTS = {
+    "node_storage_gb": 1_000,
+    "node_qps": 10_000,
+    "max_utilization": 0.7,
+    "vnodes": 256,
+    "keys": 2_000_000,
+    "skew": 0.0,                 # Zipf exponent of key popularity; 0 = uniform requests
+    "rebalance_mb_per_sec": 100,  # streaming rate into each joining node
+}
+VNODE_SWEEP = (1, 8, 32, 128, 256, 512)
+
+_HASH_SPACE = 2.0 ** 64
+
+
+def shard_count(
+    storage_gb,
+    peak_qps,
+    node_storage_gb=SHARD_DEFAULTS["node_storage_gb"],
+    node_qps=SHARD_DEFAULTS["node_qps"],
+    max_utilization=SHARD_DEFAULTS["max_utilization"],
+):
+    """Nodes needed by storage, by QPS and overall (at least one); inputs broadcast."""
+    usable = np.asarray(max_utilization, dtype=np.float64)
+    by_storage = np.ceil(np.asarray(storage_gb, dtype=np.float64) / (np.asarray(node_storage_gb) * usable))
+    by_qps = np.ceil(np.asarray(peak_qps, dtype=np.float64) / (np.asarray(node_qps) * usable))
+    shards = np.maximum(np.maximum(by_storage, by_qps), 1).astype(np.int64)
+    return {"by_storage": by_storage.astype(np.int64), "by_qps": by_qps.astype(np.int64), "shards": shards}
+
+
+def ring_tokens(nodes, vnodes=SHARD_DEFAULTS["vnodes"], seed=0):
+    """Sorted ring tokens (uint64) and the node owning each, for nodes ``0..nodes-1``.
+
+    Node ``i``'s tokens do not depend on ``nodes``, so the ring for fewer nodes
+    is this one restricted to ``owners < n``, already in order.
+    """
+    node_ids = np.repeat(np.arange(nodes, dtype=np.uint64), vnodes)
+    vnode_ids = np.tile(np.arange(vnodes, dtype=np.uint64), nodes)
+    # The node id is shifted past any key id, so tokens never hash a key's input.
+    tokens = splitmix64((((node_ids + np.uint64(1)) << np.uint64(32)) | vnode_ids) ^ np.uint64(seed))
+    order = np.argsort(tokens, kind="stable")
+    return tokens[order], node_ids[order].astype(np.int64)
+
+
+def ownership(tokens, owners, nodes):
+    """Share of the hash space owned by each of the first ``nodes`` nodes."""
+    keep = owners < nodes
+    tokens, owners = tokens[keep], owners[keep]
+    # uint64 subtraction wraps, so the first arc comes round from the last token.
+    arcs = tokens - np.roll(tokens, 1)
+    arcs = arcs.astype(np.float64) / _HASH_SPACE if len(tokens) > 1 else np.ones(1)
+    return np.bincount(owners, weights=arcs, minlength=nodes)
+
+
+def key_hashes(keys=SHARD_DEFAULTS["keys"], seed=0):
+    """Hashes of the synthetic keys ``0..keys-1``."""
+    return splitmix64(np.arange(keys, dtype=np.uint64) ^ np.uint64(seed))
+
+
+def simulate_ring(
+    nodes,
+    vnodes=SHARD_DEFAULTS["vnodes"],
+    keys=SHARD_DEFAULTS["keys"],
+    skew=SHARD_DEFAULTS["skew"],
+    seed=0,
+):
+    """Keys, requests and hash-space share per node, and each one's max/mean skew.
+
+    Key ``k`` gets request weight ``(k + 1) ** -skew``. Its rank and its hash
+    are unrelated, so the hot keys land on random nodes.
+    """
+    tokens, owners = ring_tokens(nodes, vnodes, seed)
+    hashes = key_hashes(keys, seed)
+    owner = owners[np.searchsorted(tokens, hashes) % len(tokens)]
+    weights = np.arange(1, keys + 1, dtype=np.float64) ** -float(skew)
+    per_node = {
+        "keys": np.bincount(owner, minlength=nodes).astype(np.float64),
+        "requests": np.bincount(owner, weights=weights / weights.sum(), minlength=nodes),
+        "ownership": ownership(tokens, owners, nodes),
+    }
+    return {
+        "per_node": per_node,
+        "skew": {name: float(values.max() / values.mean()) for name, values in per_node.items()},
+    }
+
+
+def vnode_skew(nodes, vnode_counts=VNODE_SWEEP, seed=0):
+    """Exact hash-space skew (max/mean share) of a ``nodes`` ring for each vnode count."""
+    return np.array([ownership(*ring_tokens(nodes, v, seed), nodes).max() * nodes for v in vnode_counts])
+
+
+def plan_shards(
+    storage_gb,
+    peak_qps,
+    node_storage_gb=SHARD_DEFAULTS["node_storage_gb"],
+    node_qps=SHARD_DEFAULTS["node_qps"],
+    max_utilization=SHARD_DEFAULTS["max_utilization"],
+    vnodes=SHARD_DEFAULTS["vnodes"],
+    keys=SHARD_DEFAULTS["keys"],
+    skew=SHARD_DEFAULTS["skew"],
+    rebalance_mb_per_sec=SHARD_DEFAULTS["rebalance_mb_per_sec"],
+    seed=0,
+):
+    """Node count, skew and rebalance traffic for each period of a growth series.
+
+    ``storage_gb`` (live data, replicas included) and ``peak_qps`` are 1-D
+    series, e.g. ``GrowthProjection.monthly()``. Scalars are broadcast
+    against each other. The cluster never shrinks. Each period that adds
+    nodes moves its live data times the share the new nodes take. The move
+    takes ``rebalance_hours``, with every joining node streaming at
+    ``rebalance_mb_per_sec``. The hottest node holds the mean data times the
+    ring's hash-space skew. With ``skew > 0`` it also serves the mean QPS times
+    the request skew that ``simulate_ring`` measures on the final ring.
+    """
+    storage, qps = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(storage_gb, dtype=np.float64)), np.atleast_1d(np.asarray(peak_qps, dtype=np.float64))
+    )
+    sizing = shard_count(storage, qps, node_storage_gb, node_qps, max_utilization)
+    nodes = np.maximum.accumulate(sizing["shards"])
+    previous = np.concatenate([nodes[:1], nodes[:-1]])
+
+    tokens, owners = ring_tokens(int(nodes[-1]), vnodes, seed)
+    shares = {count: ownership(tokens, owners, count) for count in np.unique(nodes)}
+    moved = np.array([shares[new][old:].sum() for old, new in zip(previous, nodes)])
+    modulo_moved = 1 - np.gcd(previous, nodes) / nodes
+
+    ring = simulate_ring(int(nodes[-1]), vnodes, keys, skew, seed)
+    ownership_skew = np.array([shares[count].max() * count for count in nodes])
+    # With uniform popularity the request skew is the ring's, less the key sampling noise.
+    request_skew = np.maximum(ownership_skew, ring["skew"]["requests"]) if skew > 0 else ownership_skew
+    hottest = np.maximum(
+        storage / (nodes * node_storage_gb) * ownership_skew, qps / (nodes * node_qps) * request_skew
+    )
+    moved_gb = moved * storage
+    added = nodes - previous
+    with np.errstate(divide="ignore", invalid="ignore"):
+        hours = np.where(added > 0, moved_gb * MB_PER_GB / (added * rebalance_mb_per_sec) / 3600, 0.0)
+    return {
+        "by_storage": sizing["by_storage"],
+        "by_qps": sizing["by_qps"],
+        "nodes": nodes,
+        "nodes_added": added,
+        "moved_fraction": moved,
+        "moved_gb": moved_gb,
+        "modulo_moved_gb": modulo_moved * storage,
+        "rebalance_hours": hours,
+        "ownership_skew": ownership_skew,
+        "hottest_utilization": hottest,
+        "ring": ring,
+    }
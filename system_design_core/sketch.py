@@ -0,0 +1,115 @@
+"""Streaming quantile sketch with bounded relative error.
+
+Values are counted in logarithmic buckets (the DDSketch scheme): bucket ``i``
+covers ``(gamma**(i-1), gamma**i]`` with ``gamma = (1 + a) / (1 - a)``, so any
+reported quantile is within relative accuracy ``a`` of the true value. Memory
+grows with the log of the value range, not with the number of samples, and a
+whole NumPy chunk is folded in with one ``bincount``.
+"""
+import math
+
+import numpy as np
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch for non-negative values."""
+
+    def __init__(self, relative_accuracy=0.01):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self._counts = np.zeros(0, dtype=np.int64)
+        self._offset = 0
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        """Fold a chunk of values into the sketch; NaNs are ignored."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        if values.min() < 0:
+            raise ValueError("QuantileSketch only accepts non-negative values")
+        positive = values[values > 0]
+        self.zero_count += values.size - positive.size
+        if positive.size:
+            index = np.ceil(np.log(positive) / self._log_gamma).astype(np.int64)
+            low, high = int(index.min()), int(index.max())
+            self._grow(low, high)
+            self._counts[low - self._offset: high - self._offset + 1] += np.bincount(index - low)
+        self.count += values.size
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        return self
+
+    def _grow(self, low, high):
+        if self._counts.size == 0:
+            self._counts = np.zeros(high - low + 1, dtype=np.int64)
+            self._offset = low
+            return
+        current_high = self._offset + self._counts.size - 1
+        new_low, new_high = min(low, self._offset), max(high, current_high)
+        if new_low == self._offset and new_high == current_high:
+            return
+        counts = np.zeros(new_high - new_low + 1, dtype=np.int64)
+        counts[self._offset - new_low: self._offset - new_low + self._counts.size] = self._counts
+        self._counts, self._offset = counts, new_low
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Can only merge sketches with the same relative accuracy")
+        if other._counts.size:
+            self._grow(other._offset, other._offset + other._counts.size - 1)
+            start = other._offset - self._offset
+            self._counts[start: start + other._counts.size] += other._counts
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _bucket_values(self):
+        index = np.arange(self._offset, self._offset + self._counts.size)
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantiles(self, qs):
+        """Estimated values at each quantile in ``qs`` (fractions in [0, 1])."""
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.count == 0:
+            return np.full(qs.shape, np.nan)
+        ranks = qs * (self.count - 1)
+        cumulative = self.zero_count + np.cumsum(self._counts)
+        bucket = np.searchsorted(cumulative, ranks, side="right")
+        values = self._bucket_values()
+        estimates = np.where(
+            ranks < self.zero_count,
+            0.0,
+            values[np.minimum(bucket, max(values.size - 1, 0))] if values.size else 0.0,
+        )
+        return np.clip(estimates, self.min, self.max)
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def histogram(self, bins=40):
+        """Log-spaced histogram as ``(bin_centers, counts)``, regrouped from the buckets."""
+        if self._counts.size == 0:
+            return np.array([self.min if self.count else 0.0]), np.array([self.zero_count])
+        groups = np.linspace(0, self._counts.size, min(bins, self._counts.size) + 1).astype(np.int64)
+        counts = np.add.reduceat(self._counts, groups[:-1])
+        values = self._bucket_values()
+        centers = np.sqrt(values[groups[:-1]] * values[groups[1:] - 1])
+        counts[0] += self.zero_count
+        return centers, counts
@@ -0,0 +1,360 @@
+"""File-backed scenario store: every design's inputs and outputs in one SQLite table.
+
+    python -m system_design_core.store designs.db add scenarios.csv
+    python -m system_design_core.store designs.db find --store-pii --min-peak-qps 50000
+    python -m system_design_core.store designs.db refresh
+
+A row holds the fully resolved v3.1 inputs (``DESIGN_DEFAULTS``, so a
+problem type's fallbacks are baked in), the capacity metrics, the
+architecture and trade-offs columns, and the ``model_version`` that computed
+them. Problem type, every toggle and the key metrics are indexed. Each toggle
+index leads on the toggle and then peak QPS, so a search like "PII and peak
+QPS above 50k" is an index range. The same holds for problem type.
+
+``model_version`` fingerprints the source of the calculation modules. After
+an edit to them every row is stale, and :meth:`ScenarioStore.refresh`
+re-evaluates the stale rows from their stored inputs in vectorized chunks.
+Inputs added to ``DESIGN_DEFAULTS`` later become new columns, and existing
+rows take the default for them.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from .batch import COLUMN_ALIASES, DEFAULT_CHUNK_SIZE, TOGGLE_INPUTS, iter_scenario_chunks, records_inputs
+from .capacity import CAPACITY_METRICS
+from .design import DESIGN_DEFAULTS, evaluate_inputs
+
+STORE_PATH_ENV = "SYSTEM_DESIGN_STORE"
+DEFAULT_STORE_PATH = "scenarios.db"
+
+INPUT_COLUMNS = tuple(DESIGN_DEFAULTS)
+OUTPUT_COLUMNS = CAPACITY_METRICS + ("architecture", "tradeoffs")
+META_COLUMNS = ("id", "name", "problem_type", "saved_at", "model_version")
+# Metrics searchable by range; each has its own index.
+KEY_METRICS = ("peak_qps", "storage_gb", "egress_mb_per_sec")
+# Modules whose source decides the outputs (evaluate_inputs and what it calls);
+# editing one makes every row stale.
+MODEL_MODULES = ("capacity.py", "design.py")
+
+_TABLE = "scenarios"
+
+
+def default_store_path():
+    """``SYSTEM_DESIGN_STORE``, else ``scenarios.db`` in the working directory."""
+    return os.environ.get(STORE_PATH_ENV, DEFAULT_STORE_PATH)
+
+
+def model_version():
+    """Short hash of the calculation modules' source."""
+    digest = hashlib.sha256()
+    for module in MODEL_MODULES:
+        digest.update((Path(__file__).parent / module).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _column_type(name):
+    if name in TOGGLE_INPUTS:
+        return "INTEGER"
+    default = DESIGN_DEFAULTS.get(name)
+    return "TEXT" if isinstance(default, str) or name in ("architecture", "tradeoffs") else "REAL"
+
+
+def _sql_literal(value):
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return str(int(value) if isinstance(value, bool) else float(value))
+
+
+def _sql_values(columns):
+    """Row tuples of plain Python values from ``{name: array}`` columns."""
+    lists = [
+        np.asarray(values, dtype=np.int64).tolist() if values.dtype == bool else np.asarray(values).tolist()
+        for values in columns.values()
+    ]
+    return list(zip(*lists))
+
+
+class ScenarioStore:
+    """One SQLite file of scenarios; use as a context manager or call :meth:`close`.
+
+    Writes go through one transaction per call, so saving tens of thousands
+    of scenarios is a single commit. WAL mode lets readers run while a save
+    or refresh is writing.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path if path is not None else default_store_path())
+        self.model_version = model_version()
+        self._db = sqlite3.connect(self.path, timeout=30)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._ensure_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def _ensure_schema(self):
+        with self._db:
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {_TABLE} ("
+                "id INTEGER PRIMARY KEY, name TEXT, problem_type TEXT, saved_at REAL, model_version TEXT)"
+            )
+            existing = {row["name"] for row in self._db.execute(f"PRAGMA table_info({_TABLE})")}
+            for name in INPUT_COLUMNS + OUTPUT_COLUMNS:
+                if name not in existing:
+                    # Rows saved before an input existed get its default.
+                    default = DESIGN_DEFAULTS.get(name)
+                    clause = "" if default is None else f" DEFAULT {_sql_literal(default)}"
+                    self._db.execute(f'ALTER TABLE {_TABLE} ADD COLUMN "{name}" {_column_type(name)}{clause}')
+            indexes = {
+                "problem_type": ("problem_type", "peak_qps"),
+                "model_version": ("model_version",),
+                **{metric: (metric,) for metric in KEY_METRICS},
+                **{toggle: (toggle, "peak_qps") for toggle in TOGGLE_INPUTS},
+            }
+            for index, columns in indexes.items():
+                quoted = ", ".join(f'"{column}"' for column in columns)
+                self._db.execute(f"CREATE INDEX IF NOT EXISTS idx_{_TABLE}_{index} ON {_TABLE} ({quoted})")
+
+    # --- Writing ---
+
+    def save(self, scenarios):
+        """Resolve, evaluate and insert scenario dicts; returns their new ids.
+
+        Scenarios take the same keys as ``records_inputs`` (input names,
+        export headers, ``problem_type``), plus an optional ``name``.
+        """
+        scenarios = [dict(scenario) for scenario in scenarios]
+        if not scenarios:
+            return []
+        names = [scenario.pop("name", None) for scenario in scenarios]
+        problem_types = [scenario.get("problem_type") for scenario in scenarios]
+        inputs = records_inputs(scenarios)
+        columns = {
+            "name": np.array(names, dtype=object),
+            "problem_type": np.array(problem_types, dtype=object),
+            **inputs,
+            **evaluate_inputs(inputs),
+        }
+        saved_at = time.time()
+        rows = [row + (saved_at, self.model_version) for row in _sql_values(columns)]
+        names_sql = ", ".join(f'"{name}"' for name in columns) + ", saved_at, model_version"
+        placeholders = ", ".join("?" * (len(columns) + 2))
+        with self._db:
+            self._db.executemany(f"INSERT INTO {_TABLE} ({names_sql}) VALUES ({placeholders})", rows)
+            # The transaction holds the write lock, so the new ids are consecutive.
+            last = self._db.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return list(range(last - len(rows) + 1, last + 1))
+
+    def save_file(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Save every scenario in a CSV/JSONL/Parquet file (as read by batch mode); returns the row count.
+
+        A ``name`` column names the designs. Columns that are not inputs are ignored.
+        """
+        known = set(INPUT_COLUMNS) | set(COLUMN_ALIASES) | {"name", "problem_type"}
+        saved = 0
+        for chunk in iter_scenario_chunks(path, chunk_size):
+            chunk = chunk[[column for column in chunk.columns if column in known]]
+            records = [
+                {key: value for key, value in record.items() if value == value}  # drop NaN cells
+                for record in chunk.to_dict(orient="records")
+            ]
+            saved += len(self.save(records))
+        return saved
+
+    def delete(self, ids):
+        with self._db:
+            self._db.executemany(f"DELETE FROM {_TABLE} WHERE id = ?", [(int(i),) for i in ids])
+
+    # --- Re-evaluation ---
+
+    def _stale_clause(self):
+        # Two index ranges instead of "!=", which SQLite can only answer with a scan.
+        return "(model_version IS NULL OR model_version < ? OR model_version > ?)", [self.model_version] * 2
+
+    def stale_count(self):
+        clause, params = self._stale_clause()
+        return self._db.execute(f"SELECT COUNT(*) FROM {_TABLE} WHERE {clause}", params).fetchone()[0]
+
+    def refresh(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Re-evaluate the rows computed by another model version; returns how many.
+
+        Rows whose outputs come out the same only get the new version, so
+        their metric indexes are left alone.
+        """
+        clause, params = self._stale_clause()
+        select = ", ".join(f'"{name}"' for name in ("id",) + INPUT_COLUMNS + OUTPUT_COLUMNS)
+        assignments = ", ".join(f'"{name}" = ?' for name in OUTPUT_COLUMNS)
+        cursor = self._db.cursor()
+        cursor.row_factory = None  # plain tuples; sqlite3.Row costs more than the evaluation
+        refreshed = 0
+        while True:
+            rows = cursor.execute(
+                f"SELECT {select} FROM {_TABLE} WHERE {clause} LIMIT ?", params + [chunk_size]
+            ).fetchall()
+            if not rows:
+                return refreshed
+            columns = dict(zip(("id",) + INPUT_COLUMNS + OUTPUT_COLUMNS, zip(*rows)))
+            inputs = {}
+            for name in INPUT_COLUMNS:
+                if name in TOGGLE_INPUTS:
+                    inputs[name] = np.array(columns[name], dtype=bool)
+                elif isinstance(DESIGN_DEFAULTS[name], str):
+                    inputs[name] = np.array(columns[name], dtype=object)
+                else:
+                    inputs[name] = np.array(columns[name], dtype=np.float64)
+            outputs = evaluate_inputs(inputs)
+            changed = np.zeros(len(rows), dtype=bool)
+            for name, values in outputs.items():
+                if values.dtype == object:
+                    changed |= values != np.array(columns[name], dtype=object)
+                else:
+                    old = np.array(columns[name], dtype=np.float64)  # NULL -> NaN
+                    changed |= ~((values == old) | (np.isnan(values) & np.isnan(old)))
+            ids = np.array(columns["id"])
+            updates = _sql_values({name: values[changed] for name, values in outputs.items()})
+            with self._db:
+                self._db.executemany(
+                    f"UPDATE {_TABLE} SET {assignments}, model_version = ? WHERE id = ?",
+                    [row + (self.model_version, row_id) for row, row_id in zip(updates, ids[changed].tolist())],
+                )
+                self._db.execute(
+                    f"UPDATE {_TABLE} SET model_version = ? WHERE id IN (SELECT value FROM json_each(?))",
+                    (self.model_version, json.dumps(ids[~changed].tolist())),
+                )
+            refreshed += len(rows)
+
+    # --- Reading ---
+
+    def _where(self, problem_type=None, ranges=None, toggles=None):
+        clauses, params = [], []
+        if problem_type is not None:
+            clauses.append("problem_type = ?")
+            params.append(problem_type)
+        for name, value in (toggles or {}).items():
+            if name not in TOGGLE_INPUTS:
+                raise KeyError(f"Unknown toggle: {name!r}")
+            clauses.append(f'"{name}" = ?')
+            params.append(int(bool(value)))
+        for name, (low, high) in (ranges or {}).items():
+            if name not in INPUT_COLUMNS + CAPACITY_METRICS or _column_type(name) != "REAL":
+                raise KeyError(f"Unknown numeric column: {name!r}")
+            if low is not None:
+                clauses.append(f'"{name}" >= ?')
+                params.append(float(low))
+            if high is not None:
+                clauses.append(f'"{name}" <= ?')
+                params.append(float(high))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def search(self, problem_type=None, ranges=None, limit=None, order_by="id", **toggles):
+        """Matching rows as dicts.
+
+        ``ranges`` maps numeric inputs or metrics to inclusive ``(low, high)``
+        bounds, either of which may be None. Keyword arguments filter toggles::
+
+            store.search(ranges={"peak_qps": (50_000, None)}, store_pii=True)
+        """
+        where, params = self._where(problem_type, ranges, toggles)
+        descending = order_by.startswith("-")
+        column = order_by.lstrip("-")
+        if column not in META_COLUMNS + INPUT_COLUMNS + OUTPUT_COLUMNS:
+            raise KeyError(f"Unknown column: {column!r}")
+        sql = f'SELECT * FROM {_TABLE}{where} ORDER BY "{column}"{" DESC" if descending else ""}'
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        cursor = self._db.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(sql, params).fetchall()
+        names = [column[0] for column in cursor.description]
+        toggles = [i for i, name in enumerate(names) if name in TOGGLE_INPUTS]
+        result = []
+        for row in rows:
+            row = list(row)
+            for i in toggles:
+                row[i] = bool(row[i])
+            result.append(dict(zip(names, row)))
+        return result
+
+    def count(self, problem_type=None, ranges=None, **toggles):
+        where, params = self._where(problem_type, ranges, toggles)
+        return self._db.execute(f"SELECT COUNT(*) FROM {_TABLE}{where}", params).fetchone()[0]
+
+    def query_plan(self, problem_type=None, ranges=None, **toggles):
+        """SQLite's plan for a :meth:`search`, to check that it uses an index."""
+        where, params = self._where(problem_type, ranges, toggles)
+        return [row[-1] for row in self._db.execute(f"EXPLAIN QUERY PLAN SELECT * FROM {_TABLE}{where}", params)]
+
+    def get(self, row_id):
+        """One row as a dict, toggles as bools like :meth:`search`; None if there is no such id."""
+        row = self._db.execute(f"SELECT * FROM {_TABLE} WHERE id = ?", (int(row_id),)).fetchone()
+        if row is None:
+            return None
+        row = dict(row)
+        for name in TOGGLE_INPUTS:
+            row[name] = bool(row[name])
+        return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m system_design_core.store",
+        description="Save, search and re-evaluate designs in a SQLite scenario store.",
+    )
+    parser.add_argument("db", help="store file (created if missing)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add = commands.add_parser("add", help="save every scenario in a CSV/JSONL/Parquet file")
+    add.add_argument("input")
+    add.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    commands.add_parser("refresh", help="re-evaluate rows computed by an older model version")
+    find = commands.add_parser("find", help="print matching designs as JSON lines")
+    find.add_argument("--problem-type")
+    for toggle in TOGGLE_INPUTS:
+        flag = toggle.replace("_", "-")
+        find.add_argument(f"--{flag}", dest=toggle, action="store_const", const=True)
+        find.add_argument(f"--no-{flag}", dest=toggle, action="store_const", const=False)
+    for metric in KEY_METRICS:
+        find.add_argument(f"--min-{metric.replace('_', '-')}", type=float)
+        find.add_argument(f"--max-{metric.replace('_', '-')}", type=float)
+    find.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        with ScenarioStore(args.db) as store:
+            if args.command == "add":
+                rows = store.save_file(args.input, args.chunk_size)
+                print(f"Saved {rows:,} scenarios in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+            elif args.command == "refresh":
+                rows = store.refresh()
+                print(f"Re-evaluated {rows:,} stale scenarios in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+            else:
+                toggles = {name: getattr(args, name) for name in TOGGLE_INPUTS if getattr(args, name) is not None}
+                ranges = {
+                    metric: (getattr(args, f"min_{metric}"), getattr(args, f"max_{metric}")) for metric in KEY_METRICS
+                }
+                for row in store.search(args.problem_type, ranges, args.limit, **toggles):
+                    print(json.dumps(row))
+    except (OSError, ValueError, KeyError, ImportError, sqlite3.Error) as exc:
+        parser.exit(1, f"error: {exc}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
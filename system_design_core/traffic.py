@@ -0,0 +1,138 @@
+"""Discrete-event traffic simulation from session length and think time.
+
+A simulated day is built from sessions rather than a flat peak multiplier.
+Session starts follow a diurnal rate with bursty (lognormal) noise per burst
+window; each session lasts an exponential time with the average session
+length, sends one request when it starts and then one per exponential think
+time. Given the sessions in flight, the think-time requests in any second are
+Poisson with mean ``session-seconds / think_time``, so only sessions are
+sampled, never individual requests, and they are handled in fixed-size
+batches with ``bincount`` — no per-event Python objects.
+"""
+import math
+
+import numpy as np
+
+SECONDS_PER_DAY = 86_400
+DEFAULT_CHUNK_SIZE = 1 << 20
+QPS_QUANTILES = (0.5, 0.95, 0.99, 0.999)
+
+TRAFFIC_DEFAULTS = {
+    "session_length_min": 15,
+    "think_time_s": 5,
+    "diurnal_amplitude": 0.5,
+    "peak_hour": 20,
+    "burstiness": 0.3,
+    "burst_window_s": 60,
+}
+
+
+def sessions_per_day(dau, requests_per_user, session_length_min, think_time_s):
+    """Expected sessions a day, so sessions x requests per session = DAU x requests/user."""
+    requests_per_session = 1 + session_length_min * 60 / think_time_s
+    return dau * requests_per_user / requests_per_session
+
+
+def start_rate(diurnal_amplitude, peak_hour, burstiness, burst_window_s, rng):
+    """Per-second share of the day's session starts (sums to 1)."""
+    seconds = np.arange(SECONDS_PER_DAY)
+    phase = 2 * np.pi * (seconds / SECONDS_PER_DAY - peak_hour / 24)
+    rate = 1 + diurnal_amplitude * np.cos(phase)
+    if burstiness > 0:
+        windows = -(-SECONDS_PER_DAY // burst_window_s)
+        # Mean-one lognormal noise, constant within each burst window.
+        noise = rng.lognormal(-burstiness ** 2 / 2, burstiness, windows)
+        rate = rate * np.repeat(noise, burst_window_s)[:SECONDS_PER_DAY]
+    return rate / rate.sum()
+
+
+def _session_seconds(starts, start_sums, end_counts, end_sums, overnight):
+    """Session-seconds in each one-second bin, from per-bin event counts and time sums.
+
+    With ``A(u)`` the sessions in flight, the integral of ``A`` up to ``k`` is
+    ``k * N(k) - S(k)`` for the signed event count ``N`` and signed sum of
+    event times ``S`` before ``k``; each bin holds the difference across it.
+    Sessions still running at midnight (``overnight``) count from the start.
+    """
+    k = np.arange(SECONDS_PER_DAY + 1)
+    count = np.r_[0, np.cumsum(starts - end_counts)] + overnight
+    total = np.r_[0.0, np.cumsum(start_sums - end_sums)]
+    # Clipped because the running sums leave float rounding on empty bins.
+    return np.maximum(np.diff(k * count - total), 0)
+
+
+def simulate_traffic(
+    dau,
+    requests_per_user,
+    session_length_min=TRAFFIC_DEFAULTS["session_length_min"],
+    think_time_s=TRAFFIC_DEFAULTS["think_time_s"],
+    diurnal_amplitude=TRAFFIC_DEFAULTS["diurnal_amplitude"],
+    peak_hour=TRAFFIC_DEFAULTS["peak_hour"],
+    burstiness=TRAFFIC_DEFAULTS["burstiness"],
+    burst_window_s=TRAFFIC_DEFAULTS["burst_window_s"],
+    seed=0,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+):
+    """Simulate one steady-state day and return per-second series plus summary stats.
+
+    ``diurnal_amplitude`` is the day's swing around the mean start rate (0-1),
+    ``burstiness`` the sigma of the per-window lognormal noise. The day wraps,
+    so sessions running past midnight count at the start of the same day.
+    """
+    if think_time_s <= 0 or session_length_min < 0:
+        raise ValueError("think_time_s must be positive and session_length_min non-negative")
+    if not 0 <= diurnal_amplitude <= 1:
+        raise ValueError("diurnal_amplitude must be between 0 and 1")
+    rng = np.random.default_rng(seed)
+    rate = start_rate(diurnal_amplitude, peak_hour, burstiness, int(burst_window_s), rng)
+    starts = rng.poisson(sessions_per_day(dau, requests_per_user, session_length_min, think_time_s) * rate)
+
+    mean_length_s = session_length_min * 60
+    start_sums = np.zeros(SECONDS_PER_DAY)
+    end_counts = np.zeros(SECONDS_PER_DAY, dtype=np.int64)
+    end_sums = np.zeros(SECONDS_PER_DAY)
+    overnight = 0
+    # Split the day at second boundaries so each batch holds about chunk_size sessions.
+    bounds = np.searchsorted(np.cumsum(starts), np.arange(chunk_size, starts.sum(), chunk_size))
+    for begin, end in zip(np.r_[0, bounds], np.r_[bounds, SECONDS_PER_DAY]):
+        counts = starts[begin:end]
+        n = int(counts.sum())
+        if n == 0:
+            continue
+        offsets = rng.random(n)
+        start_sums[begin:end] += np.arange(begin, end) * counts + np.bincount(
+            np.repeat(np.arange(end - begin), counts), offsets, minlength=end - begin
+        )
+        start = np.repeat(np.arange(begin, end), counts) + offsets
+        finish = start + rng.exponential(mean_length_s, n) if mean_length_s else start
+        # The day wraps: a session ending after midnight ends that far into the same day.
+        wraps = np.floor(finish / SECONDS_PER_DAY)
+        overnight += int(wraps.sum())
+        finish -= wraps * SECONDS_PER_DAY
+        second = finish.astype(np.int64)
+        end_counts += np.bincount(second, minlength=SECONDS_PER_DAY)
+        end_sums += np.bincount(second, finish, minlength=SECONDS_PER_DAY)
+    session_seconds = _session_seconds(starts, start_sums, end_counts, end_sums, overnight)
+
+    qps = starts + rng.poisson(session_seconds / think_time_s)
+    average_qps = qps.mean()
+    percentiles = np.quantile(qps, QPS_QUANTILES)
+    return {
+        "qps": qps,
+        "concurrency": session_seconds,
+        "sessions": int(starts.sum()),
+        "average_qps": float(average_qps),
+        "peak_qps": float(qps.max()),
+        "peak_multiplier": float(qps.max() / average_qps) if average_qps else math.nan,
+        "qps_percentiles": {f"P{q * 100:g}": float(v) for q, v in zip(QPS_QUANTILES, percentiles)},
+        "average_concurrency": float(session_seconds.mean()),
+        "peak_concurrency": float(session_seconds.max()),
+    }
+
+
+def burst_distribution(qps, bins=40):
+    """Histogram of per-second QPS as a multiple of the day's average: ``(centers, seconds)``."""
+    qps = np.asarray(qps, dtype=np.float64)
+    ratio = qps / qps.mean() if qps.mean() else qps
+    counts, edges = np.histogram(ratio, bins=bins)
+    return (edges[:-1] + edges[1:]) / 2, counts
@@ -1,75 +1,27 @@
 
 import streamlit as st
 
+from system_design_core import (
+    estimate_capacity,
+    feed_model,
+    load_catalog,
+    load_degree_histogram,
+    memoize,
+    power_law_histogram,
+    simulate_lifecycle,
+)
+
 # --- SETUP ---
 st.set_page_config(page_title="System Design Tool", layout="wide")
 st.title("System Design Assistant")
 
 # --- PROBLEM TYPE SELECTION ---
-problem_types = {
-    "Social Media Feed": {
-        "toggles": {
-            "Use CDN": True,
-            "Multi-Region": False,
-            "Compression": False,
-            "Adaptive Bitrate": False,
-            "Lifecycle Policies": False,
-            "Stores PII": False,
-            "Region Locking": False
-        },
-        "params": {
-            "Data Retention (days)": 180,
-            "Target Uptime (%)": 99.9,
-            "P95 Latency Target (ms)": 300,
-            "Cache Hit Rate (%)": 90
-        },
-        "db": "Cassandra, Redis, Postgres",
-        "reason": "Feeds need fast reads/writes, large fan-out, and simple indexing"
-    },
-    "Real-Time Chat": {
-        "toggles": {
-            "Use CDN": False,
-            "Multi-Region": True,
-            "Compression": True,
-            "Adaptive Bitrate": False,
-            "Lifecycle Policies": False,
-            "Stores PII": True,
-            "Region Locking": True
-        },
-        "params": {
-            "Data Retention (days)": 30,
-            "Target Uptime (%)": 99.99,
-            "P95 Latency Target (ms)": 100,
-            "Cache Hit Rate (%)": 10
-        },
-        "db": "MongoDB, Redis, Postgres",
-        "reason": "Messages are semi-structured with ordering and fast access"
-    },
-    "Video Streaming Platform": {
-        "toggles": {
-            "Use CDN": True,
-            "Multi-Region": True,
-            "Compression": True,
-            "Adaptive Bitrate": True,
-            "Lifecycle Policies": False,
-            "Stores PII": False,
-            "Region Locking": False
-        },
-        "params": {
-            "Data Retention (days)": 365,
-            "Target Uptime (%)": 99.9,
-            "P95 Latency Target (ms)": 400,
-            "Cache Hit Rate (%)": 80
-        },
-        "db": "Postgres, S3, GCS",
-        "reason": "Metadata in RDBMS, media in replicated object storage"
-    }
-}
+problem_types = load_catalog()
 
 # --- SIDEBAR ---
 with st.sidebar:
     st.header("Configuration")
-    problem = st.selectbox("Select Problem Type", list(problem_types.keys()))
+    problem = st.selectbox("Select Problem Type", problem_types.names())
     st.markdown("---")
     st.subheader("Auto-Filled Toggles")
     for k, v in problem_types[problem]["toggles"].items():
@@ -93,13 +45,20 @@ with col2:
     peak_multiplier = st.number_input("Peak Traffic Multiplier", value=2.0)
 
 # --- CALCULATIONS ---
-total_daily_requests = dau * reqs_per_user
-read_ratio = problem_types[problem]["params"]["Cache Hit Rate (%)"] / 100
-read_qps = (total_daily_requests / 86400) * read_ratio
-write_qps = (total_daily_requests / 86400) * (1 - read_ratio)
-peak_qps = (total_daily_requests / 86400) * peak_multiplier
-total_storage_kb = dau * reqs_per_user * avg_obj_size_kb * replication
-total_storage_gb = total_storage_kb / 1024 / 1024
+# The problem type's cache hit rate doubles as the read share of traffic.
+capacity = estimate_capacity(
+    dau=dau,
+    requests_per_user=reqs_per_user,
+    peak_multiplier=peak_multiplier,
+    object_size_kb=avg_obj_size_kb,
+    replication_factor=replication,
+    read_percent=problem_types[problem]["params"]["Cache Hit Rate (%)"],
+)
+total_daily_requests = capacity["total_requests"]
+read_qps = capacity["read_qps"]
+write_qps = capacity["write_qps"]
+peak_qps = capacity["peak_qps"]
+total_storage_gb = capacity["storage_gb"]
 
 # --- RESULTS ---
 st.subheader("2. Estimated System Load")
@@ -115,6 +74,98 @@ st.markdown(f"**Problem Type:** {problem}")
 st.markdown(f"**Recommended DBs:** {problem_types[problem]['db']}")
 st.markdown(f"**Why:** {problem_types[problem]['reason']}")
 
+# --- STORAGE LIFECYCLE ---
+next_section = 4
+if problem_types[problem]["toggles"].get("Lifecycle Policies"):
+    st.subheader(f"{next_section}. Storage Lifecycle")
+    next_section += 1
+    retention = max(int(problem_types[problem]["params"]["Data Retention (days)"]), 0)
+    # Everything hot until deletion vs hot for 30 days, warm until 90, then cold.
+    lifecycle = simulate_lifecycle(
+        total_storage_gb / max(replication, 1),
+        warm_after_days=[retention, min(30, retention)],
+        cold_after_days=[retention, min(90, retention)],
+        delete_after_days=retention,
+        tiers={"hot": {"replication": replication}},
+    )
+    steady = lifecycle["steady_state"]
+    for tier in ("hot", "warm", "cold"):
+        st.metric(f"{tier.title()} Tier (GB, replicated)", f"{steady['stored_gb'][tier][1]:,.2f}")
+    st.metric(
+        "Steady-State Storage Cost ($/month)",
+        f"{steady['monthly_cost'][1]:,.2f}",
+        f"{steady['monthly_cost'][1] - steady['monthly_cost'][0]:+,.2f} vs all hot",
+        delta_color="inverse",
+    )
+
+# --- FEED FAN-OUT ---
+if "fan-out" in problem_types[problem]["tags"]:
+    # Only this section needs pandas; importing it here keeps it off the other problem types' cold start.
+    import numpy as np
+    import pandas as pd
+
+    st.subheader(f"{next_section}. Feed Fan-out")
+    next_section += 1
+    feed_col1, feed_col2 = st.columns(2)
+    with feed_col1:
+        alpha = st.number_input("Follower Power-Law Exponent", min_value=1.1, value=2.1, step=0.1)
+        min_followers = st.number_input("Minimum Followers", min_value=0, value=10)
+        degree_file = st.file_uploader("Follower Histogram (CSV: followers,users)", type=["csv", "txt"])
+    with feed_col2:
+        posts_per_user = st.number_input("Posts per Active User per Day", min_value=0.0, value=0.5, step=0.1)
+        reads_per_user = st.number_input("Feed Loads per Active User per Day", min_value=0.0, value=20.0)
+        fanout_deadline = st.number_input("Fan-out Deadline (sec)", min_value=1, value=30)
+    if degree_file is not None:
+        degrees, counts = memoize(load_degree_histogram)(degree_file.getvalue())
+    else:
+        # One follower count per user, drawn for the whole user base.
+        degrees, counts = memoize(power_law_histogram)(users, alpha, min_followers)
+    feed = feed_model(
+        degrees,
+        counts,
+        active_users=dau,
+        posts_per_user=posts_per_user,
+        reads_per_user=reads_per_user,
+        peak_multiplier=peak_multiplier,
+        fanout_deadline_s=fanout_deadline,
+    )
+    strategies = feed["strategies"]
+    st.caption(
+        f"{feed['users']:,.0f} users, {feed['mean_followers']:,.1f} followers on average, "
+        f"{feed['max_followers']:,.0f} at most."
+    )
+    st.metric(
+        "Cheapest Celebrity Threshold (followers)",
+        f"{feed['best_threshold']:,.0f}",
+        f"{strategies['hybrid']['celebrities']:,.0f} authors pulled",
+        delta_color="off",
+    )
+    st.metric(
+        "Hybrid Fan-out Cost ($/month)",
+        f"{strategies['hybrid']['monthly_cost']:,.2f}",
+        f"{strategies['hybrid']['monthly_cost'] - strategies['push']['monthly_cost']:+,.2f} vs push",
+        delta_color="inverse",
+    )
+    labels = {
+        "write_amplification": "Write Amplification (inserts/post)",
+        "timeline_writes_per_s": "Timeline Inserts/sec",
+        "max_push_fanout": "Largest Pushed Post (inserts)",
+        "read_fetches_per_s": "Read Fetches/sec",
+        "timeline_memory_gb": "Timeline Cache (GB)",
+        "fanout_workers": "Fan-out Workers",
+        "feed_servers": "Feed Servers",
+        "monthly_cost": "Cost ($/month)",
+    }
+    st.table(pd.DataFrame(
+        {name.title(): {label: strategies[name][metric] for metric, label in labels.items()} for name in strategies}
+    ).style.format("{:,.1f}"))
+    sweep = feed["sweep"]
+    finite = np.isfinite(sweep["threshold"]) & (sweep["threshold"] > 0)
+    st.line_chart(pd.DataFrame(
+        {"Cost ($/month)": sweep["monthly_cost"][finite]},
+        index=pd.Index(np.log10(sweep["threshold"][finite]).round(2), name="Celebrity Threshold (log10 followers)"),
+    ))
+
 # --- FOOTER ---
 st.markdown("---")
 st.caption("Built with Streamlit by your System Design Assistant")
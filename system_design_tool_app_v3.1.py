@@ -1,10 +1,45 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 
+from system_design_core import (
+    COST_RATES,
+    DESIGN_DEFAULTS,
+    GrowthProjection,
+    MODEL_ASSUMPTIONS,
+    RerunProfiler,
+    ScenarioStore,
+    build_design_graph,
+    burst_distribution,
+    end_to_end_p95_ms,
+    hit_rate_at,
+    load_trace,
+    lognormal,
+    memoize,
+    memory_for_hit_rate,
+    model_hit_curve,
+    optimize_design,
+    percentile_table,
+    plan_shards,
+    profiling_requested,
+    shared_cache,
+    simulate_lifecycle,
+    trace_hit_curve,
+    triangular,
+    uniform_range,
+    vnode_skew,
+)
+
 st.set_page_config(page_title="System Design Assistant", layout="wide")
 st.title("System Design Assistant — Version 3.1")
 
+# --- Profiler (opt-in: open with ?profile=1 or set SYSTEM_DESIGN_PROFILE=1) ---
+profiler = st.session_state.setdefault("profiler", RerunProfiler("v3.1"))
+profiler.enabled = profiling_requested(st.query_params.get("profile"))
+profiler.start()
+
 # --- Sidebar Grouped Inputs ---
+profiler.mark("Sidebar")
 st.sidebar.header("System Assumptions")
 
 with st.sidebar.expander("User & Traffic"):
@@ -19,17 +54,55 @@ with st.sidebar.expander("Payload & Storage"):
     object_size_kb = st.number_input("Avg Object Size (KB)", value=10)
     retention_days = st.number_input("Retention Period (days)", value=180)
     replication_factor = st.number_input("Replication Factor", value=3)
+    tiering = st.checkbox("Tiered Lifecycle (hot/warm/cold)", True)
+    warm_after = st.number_input("Move to Warm After (days)", min_value=0, value=30)
+    cold_after = st.number_input("Move to Cold After (days)", min_value=0, value=90)
 
 with st.sidebar.expander("Network & Bandwidth"):
-    cache_hit_rate = st.slider("Cache Hit Rate (%)", 0, 100, 80)
+    hit_rate_source = st.radio("Cache Hit Rate From", ["Slider", "Cache Simulation"], horizontal=True)
+    if hit_rate_source == "Slider":
+        cache_hit_rate = st.slider("Cache Hit Rate (%)", 0, 100, 80)
     ingress_overhead = st.number_input("Ingress Overhead Factor", value=1.0)
     egress_overhead = st.number_input("Egress Overhead Factor", value=1.0)
 
+with st.sidebar.expander("Cache Simulation"):
+    cache_memory_gb = st.number_input("Cache Memory (GB)", min_value=0.0, value=16.0, step=1.0)
+    cache_policy = st.selectbox("Eviction Policy", ["LRU", "LFU", "TTL"])
+    working_set = st.number_input("Working Set (distinct keys)", min_value=1, value=10_000_000, step=1_000_000)
+    zipf_skew = st.number_input("Zipf Skew", min_value=0.0, value=0.9, step=0.05)
+    cache_ttl = st.number_input("TTL (sec, 0 = none)", min_value=0, value=0)
+    trace_file = st.file_uploader("Key Trace (CSV: key[,timestamp])", type=["csv", "txt"])
+
+# Hit-rate-vs-memory curve: replayed from the uploaded trace, else Che's approximation over Zipf keys.
+# Only the Cache Simulation mode reads it, so the slider mode skips the build.
+if hit_rate_source == "Cache Simulation":
+    request_rate = dau * requests_per_user / 86_400
+    if trace_file is not None:
+        trace_keys, trace_times = memoize(load_trace)(trace_file.getvalue())
+        cache_curve = memoize(trace_hit_curve)(
+            trace_keys,
+            timestamps=trace_times,
+            request_rate=request_rate,
+            ttl_s=cache_ttl or None,
+            object_size_kb=object_size_kb,
+        )
+    else:
+        cache_curve = memoize(model_hit_curve)(
+            keys=working_set,
+            skew=zipf_skew,
+            request_rate=request_rate,
+            ttl_s=cache_ttl or None,
+            object_size_kb=object_size_kb,
+        )
+    cache_hit_rate = float(hit_rate_at(cache_curve, cache_memory_gb, cache_policy.lower())) * 100
+
 with st.sidebar.expander("Reliability & Availability"):
-    sla = st.selectbox("Availability Target", ["99.0%", "99.9%", "99.99%", "99.999%"], index=2)
+    sla = st.selectbox("Availability Target", ["99.0%", "99.5%", "99.9%", "99.95%", "99.99%", "99.999%"], index=4)
     consistency = st.selectbox("Consistency Model", ["Strong", "Eventual", "Quorum"], index=0)
     rpo = st.number_input("Recovery Point Objective (min)", value=5)
     rto = st.number_input("Recovery Time Objective (min)", value=10)
+    p95_target_ms = st.number_input("P95 Latency Target (ms)", min_value=1, value=300)
+    zone_correlation = st.slider("Correlated Zone Failures (%)", 0, 50, 0)
 
 with st.sidebar.expander("Toggles"):
     use_cdn = st.checkbox("Use CDN", True)
@@ -38,54 +111,421 @@ with st.sidebar.expander("Toggles"):
     region_locking = st.checkbox("Region Locking Required", False)
     disaster_recovery = st.checkbox("Disaster Recovery Setup", True)
 
+with st.sidebar.expander("Sharding"):
+    plan_sharding = st.checkbox("Plan Shards (always on with Region Locking)", False)
+    node_storage_gb = st.number_input("Storage per Node (GB)", min_value=1, value=1_000, step=100)
+    node_qps = st.number_input("QPS per Node", min_value=1, value=10_000, step=1_000)
+    node_utilization = st.slider("Max Node Utilization (%)", 10, 100, 70)
+    vnode_choices = [1, 8, 32, 128, 256, 512]
+    vnodes = st.select_slider("Virtual Nodes per Node", vnode_choices, value=256)
+    hot_key_skew = st.number_input("Key Popularity Skew (Zipf, 0 = uniform)", min_value=0.0, value=0.0, step=0.1)
+    rebalance_rate = st.number_input("Rebalance Stream per Node (MB/sec)", min_value=1, value=100)
+
+with st.sidebar.expander("Traffic Simulation"):
+    simulate = st.checkbox("Simulate a Day of Traffic", False)
+    diurnal_swing = st.slider("Diurnal Swing (%)", 0, 100, 50)
+    peak_hour = st.slider("Busiest Hour", 0, 23, 20)
+    burstiness = st.number_input("Burstiness (lognormal sigma per minute)", min_value=0.0, value=0.3, step=0.05)
+
+with st.sidebar.expander("Optimizer Targets"):
+    budget = st.number_input("Monthly Budget ($, 0 = none)", min_value=0, value=0, step=1000)
+    max_egress = st.number_input("Max Origin Egress (MB/sec, 0 = none)", min_value=0.0, value=0.0)
+    optimizer_workers = st.number_input("Worker Processes", min_value=1, max_value=64, value=1)
+
+with st.sidebar.expander("Uncertainty (Monte Carlo)"):
+    monte_carlo = st.checkbox("Enable Monte Carlo", False)
+    mc_samples = st.select_slider("Samples", [10_000, 100_000, 1_000_000, 2_000_000], value=1_000_000)
+    uncertainty = {}
+    uncertainty_error = None
+    for name, label, point in (
+        ("dau", "DAU", dau),
+        ("requests_per_user", "Requests/User", requests_per_user),
+        ("peak_multiplier", "Peak Multiplier", peak_multiplier),
+        ("cache_hit_rate", "Cache Hit Rate (%)", cache_hit_rate),
+    ):
+        kind = st.selectbox(f"{label} Distribution", ["Point", "Range", "Triangular", "Lognormal"], key=f"mc_kind_{name}")
+        try:
+            if kind in ("Range", "Triangular"):
+                low = st.number_input(f"{label} Low", min_value=0.0, value=float(point) * 0.5, key=f"mc_low_{name}")
+                high = st.number_input(f"{label} High", min_value=0.0, value=float(point) * 1.5, key=f"mc_high_{name}")
+                uncertainty[name] = uniform_range(low, high) if kind == "Range" else triangular(low, point, high)
+            elif kind == "Lognormal":
+                p95 = st.number_input(f"{label} P95", value=float(point) * 2, key=f"mc_p95_{name}")
+                uncertainty[name] = lognormal(point, p95)
+        except ValueError as exc:
+            uncertainty_error = f"{label}: {exc}"
+
 # --- Core Calculations ---
+profiler.mark("Capacity")
 st.header("Capacity Estimation")
 
-total_requests = dau * requests_per_user
-qps = total_requests / 86400
-peak_qps = qps * peak_multiplier
-total_object_storage = dau * requests_per_user * object_size_kb * replication_factor
-storage_gb = total_object_storage / 1024 / 1024
-egress_mb_per_sec = ((qps * payload_size_kb * (1 - cache_hit_rate / 100)) / 1024) * egress_overhead
+capacity_inputs = {
+    "dau": dau,
+    "requests_per_user": requests_per_user,
+    "peak_multiplier": peak_multiplier,
+    "payload_size_kb": payload_size_kb,
+    "object_size_kb": object_size_kb,
+    "replication_factor": replication_factor,
+    "cache_hit_rate": cache_hit_rate,
+    "ingress_overhead": ingress_overhead,
+    "egress_overhead": egress_overhead,
+}
+# Built once per session; a rerun only re-evaluates the outputs whose inputs changed.
+design = st.session_state.setdefault("design_graph", build_design_graph())
+design.set(
+    **capacity_inputs,
+    session_length_min=session_length,
+    think_time_s=think_time,
+    retention_days=retention_days,
+    sla=sla,
+    consistency=consistency,
+    rpo=rpo,
+    rto=rto,
+    p95_target_ms=p95_target_ms,
+    zone_failure_correlation=zone_correlation / 100,
+    use_cdn=use_cdn,
+    enable_compression=enable_compression,
+    store_pii=store_pii,
+    region_locking=region_locking,
+    disaster_recovery=disaster_recovery,
+    uncertainty=uncertainty if monte_carlo and not uncertainty_error else None,
+    monte_carlo_samples=mc_samples,
+    traffic_model={"diurnal_amplitude": diurnal_swing / 100, "peak_hour": peak_hour, "burstiness": burstiness}
+    if simulate
+    else None,
+)
+capacity = design["capacity"]
+qps = capacity["qps"]
+peak_qps = capacity["peak_qps"]
+storage_gb = capacity["storage_gb"]
+egress_mb_per_sec = capacity["egress_mb_per_sec"]
 
 st.metric("Average QPS", f"{qps:,.0f}")
 st.metric("Peak QPS", f"{peak_qps:,.0f}")
 st.metric("Estimated Storage (GB)", f"{storage_gb:,.2f}")
 st.metric("Egress (MB/sec)", f"{egress_mb_per_sec:,.2f}")
 
+# --- Cache Simulation ---
+profiler.mark("Cache Simulation")
+if hit_rate_source == "Cache Simulation":
+    st.header("Cache Simulation")
+    if cache_curve["source"] == "trace":
+        sampling = f"sampled at {cache_curve['sample_rate']:.2%}" if cache_curve["sample_rate"] < 1 else "exact"
+        st.caption(f"Replayed a {cache_curve['requests']:,}-request trace ({sampling}), cold-start misses included.")
+    else:
+        st.caption(f"Zipf({zipf_skew}) popularity over {working_set:,} keys, steady state (Che's approximation).")
+    st.metric(f"{cache_policy} Hit Rate at {cache_memory_gb:,.0f} GB", f"{cache_hit_rate:.1f}%")
+    st.metric("Cache Memory Cost ($/month)", f"{cache_memory_gb * COST_RATES['cache_gb_month']:,.2f}")
+    st.table(pd.DataFrame(
+        {
+            f"{target:.0%}": {
+                policy.upper(): memory_for_hit_rate(cache_curve, target, policy) for policy in ("lru", "lfu", "ttl")
+            }
+            for target in (0.5, 0.8, 0.9, 0.95, 0.99)
+        }
+    ).style.format("{:,.2f}").set_caption("Cache memory (GB) needed per target hit rate"))
+    st.line_chart(pd.DataFrame(
+        {policy.upper(): cache_curve["hit_rate"][policy] * 100 for policy in ("lru", "lfu", "ttl")},
+        index=pd.Index(cache_curve["memory_gb"].round(3), name="Cache Memory (GB)"),
+    ))
+
+# --- Traffic Simulation ---
+profiler.mark("Traffic Simulation")
+if simulate:
+    st.header("Traffic Simulation")
+    traffic = design["traffic"]
+    st.metric("Simulated Peak-Second QPS", f"{traffic['peak_qps']:,.0f}")
+    st.metric(
+        "Effective Peak Multiplier",
+        f"{traffic['peak_multiplier']:.2f}x",
+        f"{traffic['peak_multiplier'] - peak_multiplier:+.2f} vs flat {peak_multiplier}x",
+    )
+    st.metric("Peak Concurrent Sessions", f"{traffic['peak_concurrency']:,.0f}")
+    st.table(pd.DataFrame({"Per-Second QPS": traffic["qps_percentiles"]}).T.style.format("{:,.0f}"))
+    centers, seconds = burst_distribution(traffic["qps"])
+    st.bar_chart(pd.DataFrame({"Seconds": seconds}, index=pd.Index(centers.round(2), name="QPS / Average")))
+    by_minute = pd.DataFrame(
+        {
+            "Peak-Second QPS": traffic["qps"].reshape(-1, 60).max(axis=1),
+            "Sessions In Flight": traffic["concurrency"].reshape(-1, 60).mean(axis=1),
+        },
+        index=pd.Index(np.arange(24 * 60) / 60, name="Hour"),
+    )
+    st.line_chart(by_minute[["Peak-Second QPS"]])
+    st.line_chart(by_minute[["Sessions In Flight"]])
+
+# --- Monte Carlo ---
+profiler.mark("Monte Carlo")
+if monte_carlo:
+    st.header("Uncertainty (Monte Carlo)")
+    sketches = design["monte_carlo"]
+    if uncertainty_error:
+        st.error(uncertainty_error)
+    elif sketches is None:
+        st.info("Pick a distribution for at least one input in the sidebar.")
+    else:
+        labels = {"peak_qps": "Peak QPS", "storage_gb": "Storage (GB)", "egress_mb_per_sec": "Egress (MB/sec)"}
+        table = pd.DataFrame(percentile_table(sketches)).T.rename(index=labels)
+        st.table(table.style.format("{:,.2f}"))
+        centers, counts = sketches["peak_qps"].histogram()
+        st.bar_chart(pd.DataFrame({"Samples": counts}, index=pd.Index(centers.round(), name="Peak QPS")))
+
+# --- Growth Projection ---
+profiler.mark("Growth Projection")
+st.header("Growth Projection")
+proj_col1, proj_col2, proj_col3 = st.columns(3)
+with proj_col1:
+    growth_rate = st.number_input("Growth Rate (%/mo)", value=10.0)
+with proj_col2:
+    horizon_years = st.slider("Projection Horizon (years)", 1, 5, 2)
+with proj_col3:
+    sizing_month = st.number_input("Sizing Month", min_value=1, max_value=horizon_years * 12, value=min(18, horizon_years * 12))
+
+# Kept across reruns so an edit only recomputes the pieces it affects.
+projection = st.session_state.setdefault("projection", GrowthProjection())
+projection.update(
+    monthly_growth_pct=growth_rate,
+    horizon_years=horizon_years,
+    retention_days=retention_days,
+    **capacity_inputs,
+)
+monthly = projection.monthly()
+sized = projection.at_month(sizing_month)
+
+st.metric(f"Peak QPS (month {sizing_month})", f"{sized['peak_qps']:,.0f}")
+st.metric(f"Live Storage (GB, month {sizing_month})", f"{sized['storage_gb']:,.2f}")
+st.metric(f"Egress (GB/month, month {sizing_month})", f"{sized['egress_gb']:,.2f}")
+monthly_df = pd.DataFrame(
+    {
+        "Peak QPS": monthly["peak_qps"],
+        "Live Storage (GB)": monthly["storage_gb"],
+        "Egress (GB/month)": monthly["egress_gb"],
+    },
+    index=pd.Index(monthly["month"], name="Month"),
+)
+st.line_chart(monthly_df[["Peak QPS"]])
+st.line_chart(monthly_df[["Live Storage (GB)", "Egress (GB/month)"]])
+
+# --- Storage Lifecycle ---
+profiler.mark("Storage Lifecycle")
+st.header("Storage Lifecycle")
+# Two policies in one call: everything hot until deletion, and the tiered policy.
+hot_only_age = max(retention_days, 0)
+warm_age = min(warm_after, cold_after, hot_only_age)
+lifecycle = memoize(simulate_lifecycle)(
+    storage_gb / max(replication_factor, 1),
+    warm_after_days=[hot_only_age, warm_age],
+    cold_after_days=[hot_only_age, max(min(cold_after, hot_only_age), warm_age)],
+    delete_after_days=hot_only_age,
+    monthly_growth_pct=growth_rate,
+    horizon_years=horizon_years,
+    tiers={"hot": {"replication": replication_factor}},
+)
+policy = 1 if tiering else 0
+lifecycle_month = min(sizing_month, len(lifecycle["monthly"]["month"])) - 1
+lifecycle_cost = lifecycle["monthly"]["total_cost"][:, lifecycle_month]
+st.metric(
+    f"Storage Cost ($/month, month {sizing_month})",
+    f"{lifecycle_cost[policy]:,.2f}",
+    f"{lifecycle_cost[1] - lifecycle_cost[0]:+,.2f} vs all hot" if tiering else None,
+    delta_color="inverse",
+)
+steady = lifecycle["steady_state"]
+st.table(pd.DataFrame(
+    {
+        tier.title(): {
+            "Resident (GB)": float(steady["resident_gb"][tier][policy]),
+            "Stored (GB, with copies)": float(steady["stored_gb"][tier][policy]),
+            "Moved In (GB/month)": float(lifecycle["monthly"]["transition_gb"][tier][policy, lifecycle_month]),
+        }
+        for tier in ("hot", "warm", "cold")
+    }
+).T.style.format("{:,.2f}"))
+st.caption(f"Steady state at today's ingest: ${float(steady['monthly_cost'][policy]):,.2f}/month.")
+if tiering:
+    st.area_chart(pd.DataFrame(
+        {f"{tier.title()} (GB)": lifecycle["monthly"]["stored_gb"][tier][policy] for tier in ("hot", "warm", "cold")},
+        index=pd.Index(lifecycle["monthly"]["month"], name="Month"),
+    ))
+
+# --- Sharding Plan ---
+profiler.mark("Sharding Plan")
+if plan_sharding or region_locking:
+    st.header("Sharding Plan")
+    # Geo-partitioned copies add storage on top of the replicas.
+    geo_factor = 1 + MODEL_ASSUMPTIONS["geo_shard_overhead"] if region_locking else 1
+    shard_plan = memoize(plan_shards)(
+        monthly["storage_gb"] * geo_factor,
+        monthly["peak_qps"],
+        node_storage_gb=node_storage_gb,
+        node_qps=node_qps,
+        max_utilization=node_utilization / 100,
+        vnodes=vnodes,
+        skew=hot_key_skew,
+        rebalance_mb_per_sec=rebalance_rate,
+    )
+    shard_month = sizing_month - 1
+    st.metric(
+        f"Shards (month {sizing_month})",
+        f"{shard_plan['nodes'][shard_month]:,}",
+        f"{shard_plan['by_storage'][shard_month]:,} by storage, {shard_plan['by_qps'][shard_month]:,} by QPS",
+        delta_color="off",
+    )
+    st.metric(
+        f"Hottest Node Utilization (month {sizing_month})",
+        f"{shard_plan['hottest_utilization'][shard_month]:.0%}",
+        f"{shard_plan['hottest_utilization'][shard_month] - node_utilization / 100:+.0%} vs target",
+        delta_color="inverse",
+    )
+    st.metric(
+        "Data Moved by Rebalancing (GB, whole horizon)",
+        f"{shard_plan['moved_gb'].sum():,.0f}",
+        f"{shard_plan['modulo_moved_gb'].sum():,.0f} with hash % N",
+        delta_color="off",
+    )
+    ring_skew = shard_plan["ring"]["skew"]
+    st.caption(
+        f"{shard_plan['nodes'][-1]:,} nodes x {vnodes} vnodes, "
+        f"{shard_plan['ring']['per_node']['keys'].sum():,.0f} synthetic keys: max/mean keys {ring_skew['keys']:.2f}, requests {ring_skew['requests']:.2f}. "
+        f"Longest rebalance: {shard_plan['rebalance_hours'].max():,.1f} h."
+    )
+    st.table(pd.DataFrame(
+        {"Hash-Space Skew (max/mean)": memoize(vnode_skew)(int(shard_plan["nodes"][shard_month]), vnode_choices)},
+        index=pd.Index(vnode_choices, name="Virtual Nodes"),
+    ).T.style.format("{:.2f}"))
+    shard_df = pd.DataFrame(
+        {
+            "Nodes": shard_plan["nodes"],
+            "Moved, Consistent Hashing (GB)": shard_plan["moved_gb"],
+            "Moved, hash % N (GB)": shard_plan["modulo_moved_gb"],
+        },
+        index=pd.Index(monthly["month"], name="Month"),
+    )
+    st.line_chart(shard_df[["Nodes"]])
+    st.bar_chart(shard_df[["Moved, Consistent Hashing (GB)", "Moved, hash % N (GB)"]], stack=False)
+
 # --- Architecture Suggestions ---
+profiler.mark("Architecture & Trade-offs")
 st.header("Architecture & Trade-offs")
-arch_layers = ["API Gateway", "App Server", "Cache", "Primary DB", "Object Store", "Async Queue", "Observability"]
-
-if use_cdn:
-    arch_layers.insert(0, "CDN")
-if region_locking:
-    arch_layers.append("Geo-Sharded DB")
-if disaster_recovery:
-    arch_layers.append("Hot Standby Cluster")
-if store_pii:
-    arch_layers.append("Vault/KMS")
+arch_layers = design["arch_layers"]
 
 st.subheader("Suggested Architecture Layers")
 st.write(", ".join(arch_layers))
 
-tradeoffs = []
-if consistency == "Strong":
-    tradeoffs.append("Lower availability under partition")
-if enable_compression:
-    tradeoffs.append("Saves bandwidth, increases CPU usage")
-if store_pii:
-    tradeoffs.append("Must implement strict access controls and audit logging")
-if region_locking:
-    tradeoffs.append("Increased complexity due to geo-partitioning")
-if disaster_recovery:
-    tradeoffs.append("Higher infra cost but faster recovery")
+tradeoffs = design["tradeoffs"]
 
 st.subheader("Design Trade-offs")
 for t in tradeoffs:
     st.markdown(f"- {t}")
 
+# --- Latency & Fleet Sizing ---
+profiler.mark("Fleet Sizing")
+st.header("Latency & Fleet Sizing")
+fleet = design["fleet"]
+if not fleet["feasible"]:
+    st.error(f"A P95 of {p95_target_ms} ms is below what the synchronous layers can serve even when idle.")
+else:
+    fleet_df = pd.DataFrame(
+        {
+            layer: {
+                "Arrival QPS": float(row["arrival_qps"]),
+                "Instances": int(row["instances"]),
+                "Utilization (%)": float(row["utilization"]) * 100,
+                "P95 (ms)": float(row["p95_ms"]),
+            }
+            for layer, row in fleet["layers"].items()
+        }
+    ).T
+    st.table(fleet_df.style.format({"Arrival QPS": "{:,.0f}", "Instances": "{:,.0f}", "Utilization (%)": "{:.1f}", "P95 (ms)": "{:.1f}"}))
+    st.metric("End-to-End P95 Bound (ms)", f"{float(fleet['p95_bound_ms']):,.1f}")
+    st.metric("Simulated End-to-End P95 (ms)", f"{end_to_end_p95_ms(fleet, cache_hit_rate):,.1f}")
+
+# --- Availability ---
+profiler.mark("Availability")
+st.header("Availability & Redundancy")
+assessment = design["availability"]
+if assessment is None:
+    st.info("Availability needs a feasible fleet; raise the P95 latency target first.")
+else:
+    current = assessment["current"]
+    st.metric("End-to-End Availability", f"{current['availability'] * 100:.4f}%")
+    st.metric("Expected Downtime (min/year)", f"{current['downtime_min_per_year']:,.1f}")
+    st.metric("Expected Data Loss (min of writes/year)", f"{current['data_loss_min_per_year']:,.2f}")
+    if assessment["meets_sla"]:
+        st.success(f"The sized fleet (N+1 over two zones) meets the {sla} SLA.")
+    else:
+        st.error(f"The sized fleet (N+1 over two zones) misses the {sla} SLA.")
+    if not current["meets_rto"]:
+        st.warning(f"Recovery takes ~{current['recovery_min']:,.0f} min, beyond the {rto} min RTO.")
+    if not current["meets_rpo"]:
+        st.warning(f"Restoring from backups can lose more than the {rpo} min RPO.")
+    st.table(pd.DataFrame(
+        {"Availability (%)": {layer: a * 100 for layer, a in current["layer_availability"].items()}}
+    ).style.format("{:.5f}"))
+
+    cheapest = assessment["cheapest"]
+    st.subheader("Cheapest Redundancy Meeting the SLA")
+    if cheapest is None:
+        st.warning("No combination of spares, zones and regions meets the SLA, RTO and RPO together.")
+    else:
+        st.write(
+            f"{cheapest['region_mode'].replace('-', '/').title()} region setup, {cheapest['zones']} zone(s), "
+            f"{cheapest['instances']} instances (~${cheapest['monthly_cost']:,.0f}/month): "
+            f"{cheapest['availability'] * 100:.4f}% availability, "
+            f"{cheapest['downtime_min_per_year']:,.1f} min/year downtime "
+            f"(best of {cheapest['candidates']:,} candidates)."
+        )
+        st.table(pd.DataFrame({"Spares (N+k)": cheapest["spares"]}))
+
+# --- Configuration Optimizer ---
+profiler.mark("Optimizer")
+st.header("Configuration Optimizer")
+st.caption("Searches CDN, compression, DR, region locking, consistency, replication, cache hit rate and fleet utilization for the cheapest configurations meeting the SLA, P95 target, egress cap and budget.")
+if st.button("Find Cheapest Configurations"):
+    # Shared across sessions: the same targets and scenario reuse the last search,
+    # whatever the worker count.
+    optimized = memoize(optimize_design, ignore=("workers",))(
+        sla=sla,
+        p95_target_ms=p95_target_ms,
+        max_egress_mb_per_sec=max_egress or float("inf"),
+        budget=budget or float("inf"),
+        retention_days=retention_days,
+        workers=optimizer_workers,
+        dau=dau,
+        requests_per_user=requests_per_user,
+        peak_multiplier=peak_multiplier,
+        payload_size_kb=payload_size_kb,
+        object_size_kb=object_size_kb,
+        ingress_overhead=ingress_overhead,
+        egress_overhead=egress_overhead,
+    )
+    front = pd.DataFrame(optimized["front"])
+    st.write(
+        f"Searched {optimized['searched']:,} configurations, evaluated {optimized['evaluated']:,} after pruning, "
+        f"{optimized['feasible']:,} feasible, {len(front):,} on the Pareto front."
+    )
+    if front.empty:
+        st.warning("No configuration meets every target; relax the SLA, latency, egress or budget.")
+    else:
+        st.dataframe(front.rename(columns={
+            "use_cdn": "CDN",
+            "enable_compression": "Compression",
+            "disaster_recovery": "DR",
+            "region_locking": "Region Locking",
+            "consistency": "Consistency",
+            "replication_factor": "Replication",
+            "cache_hit_rate": "Cache Hit Rate (%)",
+            "max_utilization": "Max Utilization",
+            "monthly_cost": "Monthly Cost ($)",
+            "p95_ms": "P95 (ms)",
+            "availability": "Availability",
+            "origin_egress_mb_per_sec": "Origin Egress (MB/sec)",
+            "instances": "Instances",
+        }))
+        st.scatter_chart(front, x="monthly_cost", y="p95_ms")
+
 # --- Walkthrough Generator ---
+profiler.mark("Walkthrough")
 st.header("Interview Walkthrough")
 if st.button("Generate Summary"):
     st.markdown(f"""
@@ -102,21 +542,32 @@ if st.button("Generate Summary"):
     """)
 
 # --- Download Section ---
+profiler.mark("Export")
 st.header("Export Design Summary")
-summary_dict = {
-    "DAU": dau,
-    "Requests/User/Day": requests_per_user,
-    "Payload Size (KB)": payload_size_kb,
-    "Object Size (KB)": object_size_kb,
-    "Replication": replication_factor,
-    "Retention (days)": retention_days,
-    "Peak QPS": peak_qps,
-    "Storage Estimate (GB)": storage_gb,
-    "Egress MB/sec": egress_mb_per_sec,
-    "SLA": sla,
-    "Consistency": consistency,
-    "Architecture": ", ".join(arch_layers),
-    "Trade-offs": "; ".join(tradeoffs)
-}
-df = pd.DataFrame([summary_dict])
-st.download_button("Download CSV", df.to_csv(index=False).encode("utf-8"), "system_design_summary.csv", "text/csv")
+st.download_button("Download CSV", design["summary_csv"], "system_design_summary.csv", "text/csv")
+design_name = st.text_input("Design name", key="store_design_name")
+if st.button("Save to Scenario Store"):
+    with ScenarioStore() as store:
+        design_id = store.save([{"name": design_name or None, **{name: design[name] for name in DESIGN_DEFAULTS}}])[0]
+        stored = store.count()
+    st.success(f"Saved design #{design_id} to {store.path} (store size: {stored:,}).")
+
+# --- Profiler Panel ---
+profiler.finish()
+if profiler.enabled:
+    with st.expander("Rerun Profiler (rolling P50/P95)"):
+        profile_df = pd.DataFrame(profiler.summary()).T.rename(columns={
+            "runs": "Reruns",
+            "last_ms": "Last (ms)",
+            "p50_ms": "P50 (ms)",
+            "p95_ms": "P95 (ms)",
+            "p50_peak_kb": "P50 Peak Alloc (KB)",
+            "p95_peak_kb": "P95 Peak Alloc (KB)",
+        })
+        st.table(profile_df.style.format("{:,.1f}"))
+
+cache_stats = shared_cache().stats()
+st.sidebar.caption(
+    f"Shared result cache: {cache_stats['entries']} entries, {cache_stats['bytes'] / 2**20:,.1f} MB, "
+    f"{cache_stats['hit_rate']:.0%} hit rate"
+)
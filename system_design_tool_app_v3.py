@@ -1,61 +1,39 @@
 import streamlit as st
 import pandas as pd
 
+from system_design_core import (
+    GrowthProjection,
+    MODEL_PRESETS,
+    RerunProfiler,
+    estimate_capacity,
+    llm_serving,
+    load_catalog,
+    memoize,
+    memory_for_hit_rate,
+    model_hit_curve,
+    profiling_requested,
+    simulate_lifecycle,
+    size_layers,
+    summary_csv,
+)
+
 st.set_page_config(page_title="System Design Assistant", layout="wide")
 st.title("System Design Assistant — Version 3")
 
+# --- Profiler (opt-in: open with ?profile=1 or set SYSTEM_DESIGN_PROFILE=1) ---
+profiler = st.session_state.setdefault("profiler", RerunProfiler("v3"))
+profiler.enabled = profiling_requested(st.query_params.get("profile"))
+profiler.start()
+
 # --- Problem Types ---
-problem_types = {
-    "General": {
-        "toggles": {
-            "Use CDN": False,
-            "Multi-Region": False,
-            "Compression": False,
-            "Adaptive Bitrate": False,
-            "Lifecycle Policies": False,
-            "Stores PII": False,
-            "Region Locking": False
-        },
-        "params": {
-            "Data Retention (days)": 180,
-            "Target Uptime (%)": 99.9,
-            "P95 Latency Target (ms)": 300,
-            "Cache Hit Rate (%)": 80,
-            "Growth Rate (%/mo)": 10,
-            "Payload Size (KB)": 10
-        },
-        "layers": ["API Gateway", "Load Balancer", "App Layer", "Cache", "DB", "Object Store", "Queue", "Observability"],
-        "tradeoffs": "Default CAP trade-off: CP. PACELC: PA/EL.",
-        "failure_modeling": "Describe component failures and fallback strategies."
-    },
-    "LLM Chat Assistant": {
-        "toggles": {
-            "Use CDN": True,
-            "Multi-Region": True,
-            "Compression": True,
-            "Adaptive Bitrate": False,
-            "Lifecycle Policies": False,
-            "Stores PII": True,
-            "Region Locking": True
-        },
-        "params": {
-            "Data Retention (days)": 30,
-            "Target Uptime (%)": 99.99,
-            "P95 Latency Target (ms)": 150,
-            "Cache Hit Rate (%)": 90,
-            "Growth Rate (%/mo)": 25,
-            "Payload Size (KB)": 2
-        },
-        "layers": ["Frontend", "Inference Gateway", "Prompt Engine", "Embedding Cache", "Vector DB", "LLM API", "Observability"],
-        "tradeoffs": "Focus on low latency over strong consistency. CAP: PA/EC. Use aggressive caching.",
-        "failure_modeling": "LLM timeout, prompt injection, API throttling."
-    }
-}
+profiler.mark("Catalog")
+problem_types = load_catalog()
 
 # --- Sidebar Config ---
+profiler.mark("Sidebar")
 with st.sidebar:
     st.header("Configuration")
-    selected_type = st.selectbox("Problem Type", list(problem_types.keys()), index=0)
+    selected_type = st.selectbox("Problem Type", problem_types.names(), index=0)
 
     st.subheader("Toggles (Editable)")
     toggles = {}
@@ -69,6 +47,7 @@ with st.sidebar:
         params[k] = st.number_input(k, value=v, step=step)
 
 # --- Capacity Estimation ---
+profiler.mark("Capacity")
 st.subheader("Capacity Estimation")
 users = st.number_input("Total Users", value=10_000_000, step=100_000)
 dau = st.number_input("Daily Active Users (DAU)", value=1_000_000)
@@ -76,21 +55,179 @@ reqs_per_user = st.number_input("Requests per User per Day", value=20)
 replication = st.number_input("Replication Factor", value=3)
 peak_multiplier = st.number_input("Peak Traffic Multiplier", value=2.0)
 
-total_daily_requests = dau * reqs_per_user
-qps = total_daily_requests / 86400
-peak_qps = qps * peak_multiplier
-storage_kb = dau * reqs_per_user * params["Payload Size (KB)"] * replication
-storage_gb = storage_kb / 1024 / 1024
+capacity_inputs = {
+    "dau": dau,
+    "requests_per_user": reqs_per_user,
+    "peak_multiplier": peak_multiplier,
+    "payload_size_kb": params["Payload Size (KB)"],
+    "replication_factor": replication,
+    "cache_hit_rate": params["Cache Hit Rate (%)"],
+}
+capacity = estimate_capacity(**capacity_inputs)
+qps = capacity["qps"]
+peak_qps = capacity["peak_qps"]
+storage_gb = capacity["storage_gb"]
 
 st.metric("QPS (avg)", f"{qps:,.0f}")
 st.metric("Peak QPS", f"{peak_qps:,.0f}")
 st.metric("Storage (GB)", f"{storage_gb:,.2f}")
 
+# --- Cache Sizing ---
+profiler.mark("Cache Sizing")
+st.subheader("Cache Sizing")
+cache_col1, cache_col2 = st.columns(2)
+working_set = cache_col1.number_input("Working Set (distinct keys)", min_value=1, value=10_000_000, step=1_000_000)
+zipf_skew = cache_col2.number_input("Zipf Skew", min_value=0.0, value=0.9, step=0.05)
+# Steady-state LRU/LFU hit rates under Zipf popularity (Che's approximation).
+cache_curve = memoize(model_hit_curve)(keys=working_set, skew=zipf_skew, object_size_kb=params["Payload Size (KB)"])
+target_hit_rate = params["Cache Hit Rate (%)"] / 100
+st.metric(
+    f"Cache Memory for a {params['Cache Hit Rate (%)']}% Hit Rate (GB, LRU)",
+    f"{memory_for_hit_rate(cache_curve, target_hit_rate, 'lru'):,.2f}",
+)
+st.line_chart(pd.DataFrame(
+    {"LRU Hit Rate (%)": cache_curve["hit_rate"]["lru"] * 100, "LFU Hit Rate (%)": cache_curve["hit_rate"]["lfu"] * 100},
+    index=pd.Index(cache_curve["memory_gb"].round(3), name="Cache Memory (GB)"),
+))
+
+# --- Growth Projection ---
+profiler.mark("Growth Projection")
+st.subheader("Growth Projection")
+horizon_years = st.slider("Projection Horizon (years)", 1, 5, 2)
+sizing_month = st.number_input("Sizing Month", min_value=1, max_value=horizon_years * 12, value=min(18, horizon_years * 12))
+
+# Kept across reruns so an edit only recomputes the pieces it affects.
+projection = st.session_state.setdefault("projection", GrowthProjection())
+projection.update(
+    monthly_growth_pct=params["Growth Rate (%/mo)"],
+    horizon_years=horizon_years,
+    retention_days=params["Data Retention (days)"],
+    **capacity_inputs,
+)
+monthly = projection.monthly()
+sized = projection.at_month(sizing_month)
+
+st.metric(f"Peak QPS (month {sizing_month})", f"{sized['peak_qps']:,.0f}")
+st.metric(f"Live Storage (GB, month {sizing_month})", f"{sized['storage_gb']:,.2f}")
+st.line_chart(pd.DataFrame(
+    {"Peak QPS": monthly["peak_qps"], "Live Storage (GB)": monthly["storage_gb"]},
+    index=pd.Index(monthly["month"], name="Month"),
+))
+
+# --- Storage Lifecycle ---
+profiler.mark("Storage Lifecycle")
+st.subheader("Storage Lifecycle")
+retention = max(int(params["Data Retention (days)"]), 0)
+if toggles.get("Lifecycle Policies"):
+    life_col1, life_col2 = st.columns(2)
+    warm_after = life_col1.number_input("Move to Warm After (days)", min_value=0, value=min(30, retention))
+    cold_after = life_col2.number_input("Move to Cold After (days)", min_value=0, value=min(90, retention))
+    warm_age = min(warm_after, cold_after, retention)
+    cold_age = max(min(cold_after, retention), warm_age)
+else:
+    warm_age = cold_age = retention
+lifecycle = memoize(simulate_lifecycle)(
+    storage_gb / max(replication, 1),
+    warm_after_days=warm_age,
+    cold_after_days=cold_age,
+    delete_after_days=retention,
+    monthly_growth_pct=params["Growth Rate (%/mo)"],
+    horizon_years=horizon_years,
+    tiers={"hot": {"replication": replication}},
+)
+lifecycle_month = min(sizing_month, len(lifecycle["monthly"]["month"])) - 1
+st.metric(
+    f"Storage Cost ($/month, month {sizing_month})",
+    f"{lifecycle['monthly']['total_cost'][lifecycle_month]:,.2f}",
+)
+# With everything hot the tier chart is a single series; it is not worth a chart build on every rerun.
+if toggles.get("Lifecycle Policies"):
+    st.area_chart(pd.DataFrame(
+        {f"{tier.title()} (GB)": lifecycle["monthly"]["stored_gb"][tier] for tier in ("hot", "warm", "cold")},
+        index=pd.Index(lifecycle["monthly"]["month"], name="Month"),
+    ))
+else:
+    st.caption("Lifecycle Policies is off: everything stays hot until retention deletes it.")
+
+# --- LLM Serving ---
+profiler.mark("LLM Serving")
+if any("LLM" in layer for layer in problem_types[selected_type]["layers"]):
+    st.subheader("LLM Serving")
+    llm_col1, llm_col2, llm_col3 = st.columns(3)
+    model_size = llm_col1.selectbox("Model Size", list(MODEL_PRESETS), index=1)
+    prompt_tokens = llm_col1.number_input("Prompt Tokens", min_value=1, value=1_500, step=100)
+    completion_tokens = llm_col1.number_input("Completion Tokens", min_value=1, value=400, step=50)
+    batch_size = llm_col2.number_input("Max Batch Size", min_value=1, value=32)
+    prefill_rate = llm_col2.number_input("Prefill Tokens/sec per Replica", min_value=1, value=10_000, step=1_000)
+    decode_step = llm_col2.number_input("Decode Step at Batch 1 (ms)", min_value=1.0, value=30.0)
+    embedding_hit = llm_col3.slider("Embedding Cache Hit Rate (%)", 0, 100, 50)
+    corpus_docs = llm_col3.number_input("Corpus Documents", min_value=0, value=1_000_000, step=100_000)
+    embedding_dim = llm_col3.selectbox("Embedding Dimension", [384, 768, 1024, 1536, 3072], index=2)
+    # The problem type's P95 latency target applies to the time to first token.
+    serving = llm_serving(
+        dau=dau,
+        requests_per_user=reqs_per_user,
+        peak_multiplier=peak_multiplier,
+        prompt_tokens=prompt_tokens,
+        completion_tokens=completion_tokens,
+        batch_size=batch_size,
+        prefill_tokens_per_s=prefill_rate,
+        decode_step_ms=decode_step,
+        p95_ttft_ms=params["P95 Latency Target (ms)"],
+        embedding_hit_rate=embedding_hit / 100,
+        corpus_docs=corpus_docs,
+        embedding_dim=embedding_dim,
+        **MODEL_PRESETS[model_size],
+    )
+    st.metric("Peak Tokens/sec", f"{serving['tokens_per_s']:,.0f}")
+    st.metric("KV Cache per Request (GB)", f"{serving['kv_gb_per_request']:,.3f}")
+    if serving["feasible"]:
+        st.metric(
+            "Accelerators",
+            f"{serving['accelerators']:,.0f}",
+            f"{serving['replicas']:,.0f} replicas x {serving['accelerators_per_replica']:,.0f}, batch {serving['batch_size']:,.0f}",
+            delta_color="off",
+        )
+        st.metric("Inference Cost ($/month)", f"{serving['accelerator_monthly_cost']:,.0f}")
+    else:
+        st.error(
+            f"Prefilling {prompt_tokens:,} tokens takes {serving['prefill_ms']:,.0f} ms, or the KV cache does not fit: "
+            f"no fleet meets a {params['P95 Latency Target (ms)']} ms P95 time to first token."
+        )
+    st.metric("Embedding Cache Savings ($/month)", f"{serving['embedding_cache_savings']:,.2f}")
+    st.metric("Vector Index Memory (GB)", f"{serving['vector_index_gb']:,.1f}")
+    st.caption(
+        f"{serving['ms_per_output_token']:.0f} ms per output token; a full answer takes "
+        f"{serving['completion_s']:.1f} s. {serving['concurrent_requests']:,.0f} requests in flight at peak."
+    )
+
 # --- Architecture & Tradeoffs ---
+profiler.mark("Architecture & Trade-offs")
 st.subheader("Architecture Layers")
 for layer in problem_types[selected_type]["layers"]:
     st.markdown(f"- {layer}")
 
+st.subheader("Fleet Sizing (P95 Target)")
+fleet = size_layers(
+    peak_qps,
+    problem_types[selected_type]["layers"],
+    params["P95 Latency Target (ms)"],
+    params["Cache Hit Rate (%)"],
+)
+if fleet["feasible"]:
+    st.table(pd.DataFrame(
+        {
+            layer: {"Instances": int(row["instances"]), "P95 (ms)": round(float(row["p95_ms"]), 1)}
+            for layer, row in fleet["layers"].items()
+        }
+    ).T)
+    st.metric("End-to-End P95 Bound (ms)", f"{float(fleet['p95_bound_ms']):,.1f}")
+else:
+    st.error(
+        f"The P95 latency target is below the request path's idle P95 of "
+        f"{float(fleet['p95_floor_ms']):,.1f} ms (service times alone, no queueing)."
+    )
+
 st.subheader("Trade-off Reasoning")
 st.text_area("Trade-offs", problem_types[selected_type]["tradeoffs"])
 
@@ -98,6 +235,7 @@ st.subheader("Failure Modeling")
 st.text_area("Failure Points & Mitigations", problem_types[selected_type]["failure_modeling"])
 
 # --- Walkthrough Generator ---
+profiler.mark("Walkthrough")
 st.subheader("Interview Walkthrough Summary")
 if st.button("Generate Walkthrough"):
     st.markdown(f"""
@@ -118,6 +256,7 @@ if st.button("Generate Walkthrough"):
     """)
 
 # --- Download Design Summary ---
+profiler.mark("Export")
 st.subheader("Download Design Summary")
 summary_dict = {
     "Problem Type": selected_type,
@@ -128,6 +267,19 @@ summary_dict = {
     "Trade-offs": problem_types[selected_type]["tradeoffs"],
     "Failure Model": problem_types[selected_type]["failure_modeling"]
 }
-summary_df = pd.DataFrame([summary_dict])
-csv = summary_df.to_csv(index=False).encode("utf-8")
+csv = summary_csv([summary_dict])
 st.download_button("Download CSV", data=csv, file_name="design_summary.csv", mime="text/csv")
+
+# --- Profiler Panel ---
+profiler.finish()
+if profiler.enabled:
+    with st.expander("Rerun Profiler (rolling P50/P95)"):
+        profile_df = pd.DataFrame(profiler.summary()).T.rename(columns={
+            "runs": "Reruns",
+            "last_ms": "Last (ms)",
+            "p50_ms": "P50 (ms)",
+            "p95_ms": "P95 (ms)",
+            "p50_peak_kb": "P50 Peak Alloc (KB)",
+            "p95_peak_kb": "P95 Peak Alloc (KB)",
+        })
+        st.table(profile_df.style.format("{:,.1f}"))
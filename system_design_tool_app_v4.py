@@ -1,77 +1,56 @@
 
 import streamlit as st
-import pandas as pd
+
+from system_design_core import estimate_capacity, llm_serving, load_catalog, summary_csv
 
 st.set_page_config(page_title="System Design Assistant v4", layout="wide")
 st.title("System Design Assistant — Version 4.0")
 
-# Problem type selector
-problem_type = st.selectbox("Problem Type", [
-    "General",
-    "LLM Chat Assistant",
-    "Financial App",
-    "Autonomous Vehicle Platform",
-    "Reservation System",
-    "Scheduling App",
-    "Proximity App",
-    "Communication App",
-    "Collaborative App",
-    "Data Processing"
-])
+problem_types = load_catalog()
 
-# Example prefill dictionary
-defaults = {
-    "General": {
-        "dau": 100000,
-        "req_per_user": 10,
-        "object_size_kb": 10,
-        "retention_days": 30
-    },
-    "LLM Chat Assistant": {
-        "dau": 500000,
-        "req_per_user": 20,
-        "object_size_kb": 150,
-        "retention_days": 7
-    }
-    # Add the rest later
-}
+# Problem type selector
+problem_type = st.selectbox("Problem Type", problem_types.names())
 
 # Load default for the problem type
 use_defaults = st.checkbox("Use problem-type defaults", value=True)
 
 def get_default(key, fallback=0):
-    if use_defaults and problem_type in defaults and key in defaults[problem_type]:
-        return defaults[problem_type][key]
+    if use_defaults:
+        return problem_types[problem_type]["defaults"].get(key, fallback)
     return fallback
 
 # Inputs (simplified)
 dau = st.number_input("Daily Active Users (DAU)", value=get_default("dau", 100000))
-req_per_user = st.number_input("Requests per User per Day", value=get_default("req_per_user", 10))
+req_per_user = st.number_input("Requests per User per Day", value=get_default("requests_per_user", 10))
 object_size_kb = st.number_input("Average Object Size (KB)", value=get_default("object_size_kb", 10))
 retention_days = st.number_input("Retention (days)", value=get_default("retention_days", 30))
 
 # Estimation
-total_objects = dau * req_per_user
-storage_gb = (total_objects * object_size_kb) / (1024 * 1024)
+# v4 sizes a single copy, so replication is left at 1.
+storage_gb = estimate_capacity(
+    dau=dau,
+    requests_per_user=req_per_user,
+    object_size_kb=object_size_kb,
+    replication_factor=1,
+)["storage_gb"]
 st.metric("Total Storage Estimate (GB)", f"{storage_gb:.2f}")
 
+# Inference sizing (70B model, default token lengths) for problem types that call an LLM
+if any("LLM" in layer for layer in problem_types[problem_type]["layers"]):
+    serving = llm_serving(dau=dau, requests_per_user=req_per_user)
+    st.metric("Inference Accelerators (70B model)", f"{serving['accelerators']:,.0f}")
+    st.metric("Inference Cost ($/month)", f"{serving['accelerator_monthly_cost']:,.0f}")
+
 # Architecture + Tradeoffs (simplified)
 st.subheader("Suggested Architecture Components")
-arch = ["API Gateway", "App Server", "Database", "Object Store"]
-if problem_type == "LLM Chat Assistant":
-    arch.append("Vector Store")
-if problem_type == "Data Processing":
-    arch.append("Stream Processor")
+arch = problem_types[problem_type]["layers"]
 st.write(", ".join(arch))
 
 st.subheader("Trade-offs")
-if problem_type == "LLM Chat Assistant":
-    st.write("- High memory cost for embeddings and inference")
-if problem_type == "Financial App":
-    st.write("- Prioritize strong consistency; lower availability during partition")
+st.write(f"- {problem_types[problem_type]['tradeoffs']}")
 
 # Export
-df = pd.DataFrame([{
+csv = summary_csv([{
     "DAU": dau,
     "Requests/User/Day": req_per_user,
     "Object Size (KB)": object_size_kb,
@@ -80,4 +59,4 @@ df = pd.DataFrame([{
     "Architecture": ", ".join(arch),
     "Problem Type": problem_type
 }])
-st.download_button("Download Summary CSV", df.to_csv(index=False).encode("utf-8"), "system_design_v4_summary.csv", "text/csv")
+st.download_button("Download Summary CSV", csv, "system_design_v4_summary.csv", "text/csv")